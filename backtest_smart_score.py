@@ -0,0 +1,107 @@
+"""
+Backtest the Smart Score over stored daily history (logic/smart_score_backtest.py).
+Runs fully offline from the price_history table — fill it first (e.g. by
+running scans or build_price_panel.py over a longer HISTORY period):
+
+    python backtest_smart_score.py --market US                 # default weights
+    python backtest_smart_score.py --market KR --all --years 5 # every stored KR ticker
+    python backtest_smart_score.py --market US --sweep         # parameter sweep
+    python backtest_smart_score.py --market US --walk-forward 4
+"""
+
+import logging
+import sys
+
+from logic.smart_score import DEFAULT_UNIVERSE
+from logic.smart_score_backtest import (
+    cached_shares,
+    default_weights,
+    load_backtest_panel,
+    market_tickers,
+    run_backtest,
+    sweep,
+    walk_forward,
+)
+
+# Default sweep: weights (starting from the configured registry weights),
+# anomaly bonus and the institutional volume cutoff
+SWEEP_GRID = {
+    "weights": list(dict.fromkeys([
+        default_weights(),
+        (0.4, 0.3, 0.3),
+        (0.5, 0.25, 0.25),
+        (0.3, 0.4, 0.3),
+        (0.3, 0.3, 0.4),
+        (0.2, 0.4, 0.4),
+    ])),
+    "anomaly_bonus": [0.0, 10.0, 20.0],
+    "inst_volume_cutoff": [1.0, 1.2, 1.5],
+    "surge_thresholds": [
+        (5.0, 3.0, 2.0, 1.5, 1.0, 0.5),
+        (4.0, 2.5, 1.8, 1.3, 1.0, 0.6),
+    ],
+}
+
+
+def _arg(name, default=None):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+def _pct(value):
+    return "   -   " if value is None or value != value else f"{value * 100:+6.2f}%"
+
+
+def _print_result(result):
+    print(f"  {result.start} ~ {result.end}: {result.observations} obs, "
+          f"spread {_pct(result.spread)}, IC {result.ic:.4f} (IR {result.ic_ir:.2f}), "
+          f"anomalies {result.anomaly_count} @ {_pct(result.anomaly_return)}")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    market = _arg("--market", "KR").upper()
+    horizon = int(_arg("--horizon", "5"))
+    workers = int(_arg("--workers")) if _arg("--workers") else None
+
+    if "--all" in sys.argv:
+        tickers = market_tickers(market)
+    else:
+        tickers = DEFAULT_UNIVERSE[market]
+    panel = load_backtest_panel(tickers, years=float(_arg("--years", "3")))
+    if not panel.tickers:
+        print("❌ No stored history for these tickers")
+        return
+    shares = cached_shares(panel.tickers)
+    print(f"📊 {market}: {len(panel.tickers)} tickers x {len(panel.dates)} days, "
+          f"{horizon}-day forward returns")
+
+    if "--walk-forward" in sys.argv:
+        folds = walk_forward(panel, SWEEP_GRID, horizon,
+                             folds=int(_arg("--walk-forward", "4")),
+                             shares=shares, workers=workers)
+        for fold in folds:
+            print(f"Chosen {dict(fold['params']._asdict())}")
+            _print_result(fold["out_of_sample"])
+            print("  baseline:")
+            _print_result(fold["baseline"])
+        return
+
+    if "--sweep" in sys.argv:
+        results = sweep(panel, SWEEP_GRID, horizon, shares=shares, workers=workers)
+        results.sort(key=lambda r: r.ic if r.ic == r.ic else -1, reverse=True)
+        for result in results[:10]:
+            print(dict(result.params._asdict()))
+            _print_result(result)
+        return
+
+    result = run_backtest(panel, horizon=horizon, shares=shares)
+    _print_result(result)
+    for row in result.deciles:
+        print(f"  decile {row['decile']:>2}: {_pct(row['mean_return'])} "
+              f"(hit {row['hit_rate'] or 0:.0%}, n={row['count']})")
+
+
+if __name__ == "__main__":
+    main()
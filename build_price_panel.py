@@ -0,0 +1,35 @@
+"""
+Build or update the shared memory-mapped price panel from the history store.
+Every API worker and the Streamlit app read the same on-disk panel:
+
+    python build_price_panel.py            # append new dates (rebuild if needed)
+    python build_price_panel.py --rebuild  # full rebuild
+"""
+
+import logging
+import sys
+
+from services.price_panel import PricePanelBuilder, open_panel
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    builder = PricePanelBuilder()
+
+    if "--rebuild" in sys.argv:
+        builder.build()
+        result = "built"
+    else:
+        result = builder.refresh()
+
+    panel = open_panel()
+    if panel is None:
+        print("❌ No price panel was written")
+        return
+    last = str(panel.dates[-1]) if panel.n_dates else "-"
+    print(f"✅ Price panel {result}: {len(panel.tickers)} tickers x "
+          f"{panel.n_dates}/{panel.capacity} dates (last {last})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 from models import Base
@@ -19,12 +19,106 @@ engine = create_engine(DATABASE_URL, echo=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# Columns added to existing tables after their first release. create_all()
+# only creates missing tables, so init_db() adds these if they're absent.
+ADDED_COLUMNS = {
+    "market_data_cache": ["payload", "expires_at", "last_accessed_at", "size_bytes"],
+}
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    upgrade_db()
     print("✅ Database tables created successfully!")
 
 
+def upgrade_db():
+    """Add columns from ADDED_COLUMNS that an older schema is missing."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table_name, column_names in ADDED_COLUMNS.items():
+            existing = {col["name"] for col in inspector.get_columns(table_name)}
+            table = Base.metadata.tables[table_name]
+            for column_name in column_names:
+                if column_name in existing:
+                    continue
+                column_type = table.c[column_name].type.compile(dialect=engine.dialect)
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table_name} "
+                        f"ADD COLUMN {column_name} {column_type}"
+                    )
+                )
+                print(f"✅ Added column {table_name}.{column_name}")
+
+            # Indexes on added columns (create_all only indexes new tables)
+            for column_name in column_names:
+                if table.c[column_name].index:
+                    conn.execute(
+                        text(
+                            f"CREATE INDEX IF NOT EXISTS ix_{table_name}_{column_name} "
+                            f"ON {table_name} ({column_name})"
+                        )
+                    )
+
+    _relax_cache_columns()
+
+
+# market_data_cache columns whose original definition was relaxed later:
+# data used to be NOT NULL (codec rows leave it empty) and key VARCHAR(50)
+# (too short for some ticker keys)
+CACHE_KEY_LENGTH = 255
+
+
+def _relax_cache_columns():
+    """Relax legacy market_data_cache constraints, only if still present."""
+    columns = {
+        col["name"]: col for col in inspect(engine).get_columns("market_data_cache")
+    }
+    data_not_null = not columns["data"].get("nullable", True)
+    key_length = getattr(columns["key"]["type"], "length", None)
+    key_too_short = key_length is not None and key_length < CACHE_KEY_LENGTH
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            if data_not_null:
+                conn.execute(
+                    text("ALTER TABLE market_data_cache ALTER COLUMN data DROP NOT NULL")
+                )
+                print("✅ Relaxed market_data_cache.data to NULL")
+            if key_too_short:
+                # Rewrites the table under an exclusive lock, so only once
+                conn.execute(
+                    text(
+                        "ALTER TABLE market_data_cache "
+                        f"ALTER COLUMN key TYPE VARCHAR({CACHE_KEY_LENGTH})"
+                    )
+                )
+                print(f"✅ Widened market_data_cache.key to {CACHE_KEY_LENGTH}")
+    elif engine.dialect.name == "sqlite" and data_not_null:
+        # SQLite can't drop NOT NULL in place: rebuild the table once
+        # (SQLite doesn't enforce VARCHAR lengths, so key needs nothing)
+        _rebuild_sqlite_table("market_data_cache", list(columns))
+        print("✅ Rebuilt market_data_cache with nullable data")
+
+
+def _rebuild_sqlite_table(table_name: str, column_names: list):
+    """Recreate a table from the current model, keeping its rows."""
+    table = Base.metadata.tables[table_name]
+    legacy = f"{table_name}_legacy"
+    kept = ", ".join(name for name in column_names if name in table.c)
+    with engine.begin() as conn:
+        for index in inspect(conn).get_indexes(table_name):
+            conn.execute(text(f"DROP INDEX IF EXISTS {index['name']}"))
+        conn.execute(text(f"ALTER TABLE {table_name} RENAME TO {legacy}"))
+        table.create(conn)
+        conn.execute(
+            text(f"INSERT INTO {table_name} ({kept}) SELECT {kept} FROM {legacy}")
+        )
+        conn.execute(text(f"DROP TABLE {legacy}"))
+
+
 def get_db():
     """Dependency for FastAPI to get database session"""
     db = SessionLocal()
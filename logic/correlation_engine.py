@@ -1,6 +1,11 @@
+import numpy as np
 from sqlalchemy.orm import Session
 from models import Theme, ValueChain, Watchlist
 
+# Trading days of returns used for US driver -> KR follower correlation
+LAGGED_CORRELATION_DAYS = 120
+MIN_CORRELATION_PAIRS = 20
+
 
 class CorrelationEngine:
     def __init__(self, db: Session):
@@ -45,6 +50,9 @@ class CorrelationEngine:
                 )
                 .all()
             )
+            correlations = self.get_lagged_correlations(
+                us_driver_ticker, [conn.child_stock_kr for conn in connections]
+            )
 
             for conn in connections:
                 rec_data = {
@@ -54,6 +62,7 @@ class CorrelationEngine:
                     "relation": conn.relation_type,
                     "description": conn.description,
                     "reason": reason,
+                    "lagged_correlation": correlations.get(conn.child_stock_kr),
                 }
 
                 results["general_recommendations"].append(rec_data)
@@ -125,6 +134,55 @@ class CorrelationEngine:
 
         return tree
 
+    def get_lagged_correlations(
+        self, us_ticker: str, kr_tickers: list[str], days: int = LAGGED_CORRELATION_DAYS
+    ) -> dict:
+        """
+        Correlation of each KR stock's next-session return with the US
+        driver's daily return, read straight from the shared price panel.
+
+        :param us_ticker: US driver symbol (e.g. "NVDA")
+        :param kr_tickers: KR codes (e.g. "000660"); ".KS"/".KQ" symbols are tried
+        :param days: Calendar days of history
+        :return: {kr_ticker: correlation} for tickers in the panel with enough
+                 overlapping sessions (empty if no panel has been built)
+        """
+        try:
+            from services.price_panel import get_price_panel
+
+            panel = get_price_panel()
+        except Exception:
+            return {}
+        if panel is None or panel.column(us_ticker) is None:
+            return {}
+
+        close = panel.field("Close", days)
+        us_rows, us_returns = _session_returns(close[:, panel.column(us_ticker)])
+
+        correlations = {}
+        for kr_ticker in kr_tickers:
+            col = next(
+                (
+                    panel.column(symbol)
+                    for symbol in (kr_ticker, f"{kr_ticker}.KS", f"{kr_ticker}.KQ")
+                    if panel.column(symbol) is not None
+                ),
+                None,
+            )
+            if col is None:
+                continue
+            kr_rows, kr_returns = _session_returns(close[:, col])
+
+            # The KR session after a US session trades on a later date row
+            following = np.searchsorted(kr_rows, us_rows, side="right")
+            paired = following < len(kr_rows)
+            if paired.sum() < MIN_CORRELATION_PAIRS:
+                continue
+            corr = np.corrcoef(us_returns[paired], kr_returns[following[paired]])[0, 1]
+            if np.isfinite(corr):
+                correlations[kr_ticker] = round(float(corr), 2)
+        return correlations
+
     def get_us_impact_for_kr_symbol(self, kr_symbol: str) -> dict:
         """Simple rule-based impact estimation for a given Korean symbol using US top gainers and theme keywords."""
         try:
@@ -157,6 +215,13 @@ class CorrelationEngine:
         return {"symbol": kr_symbol, "summary": summary, "matches": matched}
 
 
+def _session_returns(closes: np.ndarray):
+    """Date rows and close-to-close returns for the sessions a ticker traded."""
+    rows = np.flatnonzero(~np.isnan(closes))
+    prices = closes[rows].astype(np.float64)
+    return rows[1:], prices[1:] / prices[:-1] - 1
+
+
 if __name__ == "__main__":
     engine = CorrelationEngine()
     result = engine.run_daily_analysis()
@@ -0,0 +1,42 @@
+"""
+공유 메모리 패널 헬퍼 — 프로세스 풀 채점(logic/smart_score.py)과 병렬
+백테스트(logic/smart_score_backtest.py)가 함께 쓴다.
+
+큰 (일자, 종목) 배열은 pickle하지 않고 공유 메모리 블록에 한 번 복사한다.
+워커에는 블록 설명자 (이름, 모양, dtype)만 넘기고, 워커는 attach_array()로
+같은 버퍼에 뷰를 붙인다. 블록의 close/unlink는 만든 프로세스가 맡는다.
+"""
+
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def resolve_workers(workers: int) -> int:
+    """워커 수 설정값 → 실제 프로세스 수 (0 이하 = CPU 수)."""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def share_array(array: np.ndarray, blocks: list) -> tuple:
+    """array를 새 공유 메모리 블록에 복사 → (이름, 모양, dtype). 블록은 blocks에 추가된다."""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    blocks.append(block)
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[:] = array
+    del view
+    return block.name, array.shape, array.dtype.str
+
+
+def attach_array(desc: tuple):
+    """워커 쪽: 블록에 붙기만 한다 → (블록, 배열 뷰). 해제/unlink는 만든 프로세스 책임."""
+    name, shape, dtype = desc
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def release_blocks(blocks: list):
+    """share_array()로 만든 블록을 닫고 지운다 (만든 프로세스에서 호출)."""
+    for block in blocks:
+        block.close()
+        block.unlink()
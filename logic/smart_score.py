@@ -9,23 +9,108 @@ Smart Score 엔진 — 다중 팩터 종목 스코어링 + Anomaly Detection
 
 Anomaly Detection:
   - 최근 10거래일 중 전반부 거래량이 극히 낮고, 최근 급등한 '소외주 반등' 패턴
+
+compute_smart_scores()는 ScorePanel(일자 × 종목 배열) 전체를 NumPy 연산으로
+한 번에 채점하고, compute_smart_score()는 종목 하나짜리 패널로 같은 경로를 탄다.
+팩터와 가중치(기본 40/30/30)는 logic/smart_score_factors.py 레지스트리에서 온다.
 """
 
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+
 import yfinance as yf
 import pandas as pd
 import numpy as np
 
-
-def _safe_float(val, default=0.0):
+from logic.shared_panel import (
+    attach_array,
+    release_blocks,
+    resolve_workers,
+    share_array,
+)
+from logic.smart_score_factors import (
+    ANOMALY_FEATURES,
+    MA5,
+    VOLUME_RATIO,
+    VWAP,
+    FeaturePlanner,
+    detect_anomalies,
+    factor_weights,
+    get_factors,
+    surge_flat,
+)
+
+logger = logging.getLogger(__name__)
+
+# 병렬 채점 프로세스 수 (0 = CPU 수)
+SCORE_WORKERS = int(os.getenv("SMART_SCORE_WORKERS", "0"))
+
+# 이보다 적은 종목은 한 프로세스에서 채점 (프로세스 간 전달 비용이 더 큼)
+PARALLEL_MIN_TICKERS = int(os.getenv("SMART_SCORE_PARALLEL_MIN", "1500"))
+
+# 워커당 샤드 수 — 샤드가 작을수록 부하가 고르게 나뉜다
+SHARDS_PER_WORKER = 2
+
+
+def load_price_history(
+    tickers: list[str], period: str = "1mo"
+) -> dict[str, pd.DataFrame]:
+    """
+    종목별 일봉 히스토리 — 공유 가격 패널(services/price_panel.py)이 최신이면
+    메모리 맵에서 바로 읽고, 아니면 로컬 히스토리 스토어에서 누락 구간만
+    다운로드한다. 스토어를 쓸 수 없는 환경(Streamlit 단독 실행 등)에서는
+    yfinance에서 직접 받는다.
+    """
     try:
-        return float(val)
-    except (TypeError, ValueError):
-        return default
-
+        from services.history_store import period_to_days
+        from services.price_panel import load_frames
+    except ImportError:
+        frames = {}
+        for ticker in tickers:
+            df = yf.Ticker(ticker).history(period=period)
+            if df is not None and len(df):
+                frames[ticker] = df
+        return frames
+    return load_frames(tickers, days=period_to_days(period))
+
+
+def load_metadata(tickers: list[str]) -> tuple[dict, dict]:
+    """
+    종목명/유통주식수 — 장기 TTL 메타데이터 캐시(services/ticker_metadata.py)에서
+    읽고 누락분만 조회한다. 캐시를 쓸 수 없으면 yfinance info를 직접 조회한다.
 
-def compute_smart_score(ticker: str, period: str = "1mo") -> dict | None:
+    Returns:
+        (infos {ticker: info}, failures {ticker: 실패 사유})
+    """
+    try:
+        from services.ticker_metadata import get_metadata
+    except ImportError:
+        infos, failures = {}, {}
+        for ticker in tickers:
+            try:
+                infos[ticker] = yf.Ticker(ticker).info or {}
+            except Exception as e:
+                failures[ticker] = str(e)[:200]
+        return infos, failures
+    return get_metadata(tickers)
+
+
+def compute_smart_score(
+    ticker: str, period: str = "1mo", history: pd.DataFrame | None = None
+) -> dict | None:
     """
-    개별 종목의 Smart Score를 계산한다.
+    개별 종목의 Smart Score를 계산한다 — 종목 하나짜리 ScorePanel을
+    compute_smart_scores()로 채점하므로 팩터와 가중치는 레지스트리를 따른다.
+
+    Args:
+        history: 미리 로드한 일봉 (scan_and_score가 일괄 로드해 전달), 없으면 직접 로드
 
     Returns:
         dict with keys:
@@ -35,278 +120,513 @@ def compute_smart_score(ticker: str, period: str = "1mo") -> dict | None:
         or None on failure
     """
     try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(period=period)
+        df = history
+        if df is None:
+            df = load_price_history([ticker], period).get(ticker)
 
         if df is None or len(df) < 10:
             return None
 
-        info = stock.info or {}
-        name = info.get("shortName") or info.get("longName") or ticker
-        shares_outstanding = info.get("sharesOutstanding", 0)
-
-        close = df["Close"]
-        volume = df["Volume"]
-        high = df["High"]
-        low = df["Low"]
-
-        cur_price = _safe_float(close.iloc[-1])
-        prev_price = _safe_float(close.iloc[-2]) if len(close) >= 2 else cur_price
-        change_pct = ((cur_price - prev_price) / prev_price * 100) if prev_price > 0 else 0
-
-        # ───────────────────────────────────────────────
-        # 1. Institutional Accumulation Proxy (40%)
-        # ───────────────────────────────────────────────
-        # 기관 데이터 대신: (거래량 급증 + 양봉) 3일 연속이면 기관 매집 추정
-        inst_score = _calc_institutional_proxy(df, shares_outstanding)
-
-        # ───────────────────────────────────────────────
-        # 2. Price Momentum (30%) — VWAP & MA5 이격도
-        # ───────────────────────────────────────────────
-        momentum_score, vwap, ma5 = _calc_price_momentum(df)
-
-        # ───────────────────────────────────────────────
-        # 3. Volume Surge (30%) — 20일 평균 대비 당일 거래량
-        # ───────────────────────────────────────────────
-        volume_score, volume_ratio = _calc_volume_surge(df)
-
-        # ───────────────────────────────────────────────
-        # 종합 점수
-        # ───────────────────────────────────────────────
-        total = inst_score * 0.4 + momentum_score * 0.3 + volume_score * 0.3
-        total = max(0, min(100, round(total, 1)))
-
-        # ───────────────────────────────────────────────
-        # Anomaly Detection
-        # ───────────────────────────────────────────────
-        is_anomaly, anomaly_reason = _detect_anomaly(df)
-
-        # 시각화용 히스토리
-        vol_hist = volume.tail(20).tolist()
-        price_hist = close.tail(20).tolist()
-        dates_hist = [d.strftime("%m/%d") for d in df.index[-20:]]
-
-        return {
-            "ticker": ticker,
-            "name": name,
-            "score": total,
-            "inst_score": round(inst_score, 1),
-            "momentum_score": round(momentum_score, 1),
-            "volume_score": round(volume_score, 1),
-            "is_anomaly": is_anomaly,
-            "anomaly_reason": anomaly_reason,
-            "price": round(cur_price, 2),
-            "change_percent": round(change_pct, 2),
-            "vwap": round(vwap, 2) if vwap else None,
-            "ma5": round(ma5, 2) if ma5 else None,
-            "volume_ratio": round(volume_ratio, 2),
-            "volume_history": vol_hist,
-            "price_history": price_hist,
-            "dates": dates_hist,
-        }
-    except Exception:
+        infos, failures = load_metadata([ticker])
+        if ticker not in infos:
+            logger.warning(f"Smart score skipped {ticker}: {failures.get(ticker)}")
+            return None
+
+        results = compute_smart_scores(build_score_panel({ticker: df}), infos)
+        return results[0] if results else None
+    except Exception as e:
+        logger.warning(f"Smart score failed for {ticker}: {e}")
         return None
 
 
-def _calc_institutional_proxy(df: pd.DataFrame, shares_outstanding: int) -> float:
+# ═══════════════════════════════════════════════════
+# 벡터화 엔진 — 여러 종목을 한 번에 채점
+# ═══════════════════════════════════════════════════
+
+
+class ScorePanel(NamedTuple):
     """
-    기관/외인 매집 프록시 점수 (0~100)
-
-    로직:
-    - 최근 3일 각각에 대해:
-      ① 양봉(종가 > 시가) 여부
-      ② 거래량이 직전 5일 평균보다 높은지
-      ③ 유통주식수 대비 거래량 비율
-    - 3일 다 충족 → 100, 2일 → 70, 1일 → 35, 0일 → 10
+    채점용 OHLCV 패널. 배열은 (일자, 종목) 모양이며 종목마다 자기 거래일을
+    오른쪽 정렬한다 (마지막 행 = 각 종목의 최근 봉, 앞쪽 빈 칸은 NaN/NaT).
+    그래서 df.iloc[-k]는 배열[-k], df.tail(k)는 배열[-k:]와 같다.
     """
-    if len(df) < 8:
-        return 10.0
 
-    score = 0
-    bullish_days = 0
+    tickers: list[str]
+    dates: np.ndarray  # datetime64[D]
+    open: np.ndarray  # float64
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray  # float64 (결측은 NaN)
+    lengths: np.ndarray  # 종목별 봉 수
+
+    def subset(self, tickers: list[str]) -> "ScorePanel":
+        """tickers 열만 고른 패널 (패널에 없는 종목은 무시)."""
+        positions = _positions(self.tickers)
+        tickers = [t for t in tickers if t in positions]
+        cols = np.array([positions[t] for t in tickers], dtype=np.intp)
+        return ScorePanel(
+            tickers,
+            self.dates[:, cols],
+            self.open[:, cols],
+            self.high[:, cols],
+            self.low[:, cols],
+            self.close[:, cols],
+            self.volume[:, cols],
+            self.lengths[cols],
+        )
+
+
+_PANEL_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def build_score_panel(
+    histories: dict[str, pd.DataFrame], tickers: list[str] | None = None
+) -> ScorePanel:
+    """종목별 일봉 DataFrame들을 ScorePanel로 묶는다 (데이터 없는 종목은 제외)."""
+    tickers = [
+        t
+        for t in dict.fromkeys(tickers if tickers is not None else histories)
+        if histories.get(t) is not None and len(histories[t])
+    ]
+    lengths = np.array([len(histories[t]) for t in tickers], dtype=np.int64)
+    width = int(lengths.max()) if len(tickers) else 0
+
+    arrays = {name: np.full((width, len(tickers)), np.nan) for name in _PANEL_FIELDS}
+    dates = np.full((width, len(tickers)), np.datetime64("NaT"), dtype="datetime64[D]")
+    for col, ticker in enumerate(tickers):
+        df = histories[ticker]
+        start = width - len(df)
+        for name in _PANEL_FIELDS:
+            arrays[name][start:, col] = df[name].to_numpy(dtype=np.float64)
+        index = df.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        dates[start:, col] = index.values.astype("datetime64[D]")
+
+    return ScorePanel(
+        tickers,
+        dates,
+        arrays["Open"],
+        arrays["High"],
+        arrays["Low"],
+        arrays["Close"],
+        arrays["Volume"],
+        lengths,
+    )
 
-    for i in range(-3, 0):
-        try:
-            c = _safe_float(df["Close"].iloc[i])
-            o = _safe_float(df["Open"].iloc[i])
-            v = _safe_float(df["Volume"].iloc[i])
-
-            # 직전 5일 평균 거래량
-            window_start = max(0, len(df) + i - 5)
-            window_end = len(df) + i
-            avg_vol = df["Volume"].iloc[window_start:window_end].mean()
-
-            is_bullish = c > o
-            is_vol_above = v > avg_vol * 1.2
-
-            if is_bullish and is_vol_above:
-                bullish_days += 1
-
-                # 유통주식 대비 거래량 가산점
-                if shares_outstanding > 0:
-                    buy_ratio = v / shares_outstanding
-                    if buy_ratio > 0.03:
-                        score += 15
-                    elif buy_ratio > 0.01:
-                        score += 8
-        except (IndexError, TypeError):
-            continue
 
-    base = {0: 10, 1: 35, 2: 70, 3: 100}.get(bullish_days, 10)
-    return min(100, base + score)
+def score_panel_from_price_panel(
+    price_panel, tickers: list[str], days: int
+) -> ScorePanel:
+    """
+    공유 가격 패널(services/price_panel.PricePanel)에서 바로 ScorePanel을 만든다.
+    종가가 없는 날(휴장일)을 빼고 종목별로 오른쪽 정렬한다 — DataFrame 없이.
+    """
+    tickers = [t for t in dict.fromkeys(tickers) if t in price_panel]
+    cols = np.array([price_panel.column(t) for t in tickers], dtype=np.intp)
+    close = price_panel.field("Close", days)[:, cols]
+    dates = price_panel.dates[price_panel.start_row(days) : price_panel.n_dates]
+
+    valid = ~np.isnan(close)
+    lengths = valid.sum(axis=0).astype(np.int64)
+    width = int(lengths.max()) if len(tickers) else 0
+    # 유효한 봉마다 "자기 뒤에 남은 봉 수"로 목표 행을 정한다
+    remaining = np.cumsum(valid[::-1], axis=0)[::-1]
+    src_rows, src_cols = np.nonzero(valid)
+    dst_rows = width - remaining[src_rows, src_cols]
+
+    def compact(values, fill, dtype):
+        out = np.full((width, len(tickers)), fill, dtype=dtype)
+        out[dst_rows, src_cols] = values[src_rows, src_cols]
+        return out
+
+    arrays = {
+        name: compact(
+            price_panel.field(name, days)[:, cols].astype(np.float64),
+            np.nan,
+            np.float64,
+        )
+        for name in _PANEL_FIELDS
+    }
+    date_grid = np.broadcast_to(dates[:, None], close.shape)
+    return ScorePanel(
+        tickers,
+        compact(date_grid, np.datetime64("NaT"), "datetime64[D]"),
+        arrays["Open"],
+        arrays["High"],
+        arrays["Low"],
+        arrays["Close"],
+        arrays["Volume"],
+        lengths,
+    )
 
 
-def _calc_price_momentum(df: pd.DataFrame) -> tuple[float, float | None, float | None]:
+def load_score_panel(tickers: list[str], period: str = "1mo") -> ScorePanel:
     """
-    Price Momentum 점수 (0~100)
-
-    VWAP = sum(전형가 * 거래량) / sum(거래량), 전형가 = (H+L+C)/3
-    MA5 = 5일 종가 이동평균
+    tickers의 ScorePanel — 공유 가격 패널이 최신이면 메모리 맵에서 바로,
+    아니면 load_price_history()의 DataFrame들로 만든다.
     """
-    if len(df) < 5:
-        return 50.0, None, None
-
-    close = df["Close"]
-    high = df["High"]
-    low = df["Low"]
-    volume = df["Volume"]
-
-    # VWAP (당일)
-    typical_price = (high + low + close) / 3
-    cum_tp_vol = (typical_price * volume).cumsum()
-    cum_vol = volume.cumsum()
-    vwap_series = cum_tp_vol / cum_vol.replace(0, np.nan)
-    vwap = _safe_float(vwap_series.iloc[-1])
-
-    # MA5
-    ma5 = _safe_float(close.rolling(5).mean().iloc[-1])
-
-    cur = _safe_float(close.iloc[-1])
-
-    score = 50.0  # 기본
-
-    # VWAP 돌파: 현재가 > VWAP → 가산
-    if vwap and vwap > 0:
-        vwap_ratio = (cur - vwap) / vwap * 100
-        if vwap_ratio > 2:
-            score += 25
-        elif vwap_ratio > 0:
-            score += 15
-        elif vwap_ratio > -1:
-            score += 5
-        else:
-            score -= 15
-
-    # MA5 이격도: 현재가가 MA5 위 → 가산
-    if ma5 and ma5 > 0:
-        gap_ratio = (cur - ma5) / ma5 * 100
-        if gap_ratio > 3:
-            score += 25
-        elif gap_ratio > 1:
-            score += 15
-        elif gap_ratio > 0:
-            score += 5
-        else:
-            score -= 10
-
-    return max(0, min(100, score)), vwap, ma5
-
-
-def _calc_volume_surge(df: pd.DataFrame) -> tuple[float, float]:
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    try:
+        from services.history_store import period_to_days
+        from services.price_panel import get_fresh_panel
+    except ImportError:
+        return build_score_panel(load_price_history(tickers, period), tickers)
+
+    days = period_to_days(period)
+    price_panel = get_fresh_panel(tickers, days)
+    if price_panel is not None:
+        return score_panel_from_price_panel(price_panel, tickers, days)
+    return build_score_panel(load_price_history(tickers, period), tickers)
+
+
+def compute_smart_scores(
+    panel: ScorePanel, infos: dict | None = None, weights: dict | None = None
+) -> list[dict]:
     """
-    Volume Surge 점수 (0~100)
+    ScorePanel의 모든 종목을 한 번에 채점한다 (compute_smart_score()도 이 경로).
+    팩터는 logic/smart_score_factors.py의
+    레지스트리에서 오고, 팩터들이 선언한 피처는 FeaturePlanner가 패널당 한 번씩만
+    계산해 공유한다.
+
+    Args:
+        panel: build_score_panel() / load_score_panel() 결과
+        infos: {ticker: yfinance info}; 없으면 채점 대상 종목만 load_metadata()로
+               조회한다. info가 없는 종목은 compute_smart_score()처럼 제외한다
+        weights: {팩터 이름: 가중치} (기본값/SMART_SCORE_WEIGHTS를 덮어씀)
 
-    당일 거래량 / 최근 20일 평균 거래량
+    Returns:
+        compute_smart_score() 형식의 dict 리스트 (panel.tickers 순서)
     """
-    if len(df) < 2:
-        return 50.0, 1.0
+    scorable = panel.lengths >= 10
+    if not scorable.any():
+        return []
+    if infos is None:
+        infos = load_metadata([t for t, ok in zip(panel.tickers, scorable) if ok])[0]
+
+    shares = np.array(
+        [_shares_outstanding(infos.get(t)) for t in panel.tickers], dtype=np.float64
+    )
+    factors = get_factors()
+    factor_weight = factor_weights(weights)
+    planner = FeaturePlanner(panel, shares).plan(
+        itertools.chain(
+            ANOMALY_FEATURES,
+            (VWAP, MA5, VOLUME_RATIO),
+            *(factor.features for factor in factors),
+        )
+    )
+    factor_scores = {factor.result_key: factor.compute(planner) for factor in factors}
+    total = np.zeros(len(panel.tickers))
+    for factor in factors:
+        total = total + factor_scores[factor.result_key] * factor_weight[factor.name]
+
+    vwap_values = planner.get(VWAP)
+    ma5 = planner.get(MA5)
+    volume_ratios = np.where(surge_flat(planner), 1.0, planner.get(VOLUME_RATIO))
+    is_anomaly, is_neglected, surge_ratio, bullish = detect_anomalies(planner)
+
+    # 최근 20행의 날짜 라벨 — 종목들이 같은 거래일을 공유하므로 고유 날짜만 포맷
+    recent_dates = panel.dates[-20:]
+    unique_dates, date_ids = np.unique(recent_dates, return_inverse=True)
+    date_ids = date_ids.reshape(recent_dates.shape)
+    date_labels = [
+        None if np.isnat(d) else d.astype(object).strftime("%m/%d")
+        for d in unique_dates
+    ]
 
-    cur_vol = _safe_float(df["Volume"].iloc[-1])
-    avg_20 = df["Volume"].tail(20).mean()
+    results = []
+    for col in np.flatnonzero(scorable):
+        ticker = panel.tickers[col]
+        if ticker not in infos:
+            continue
+        info = infos[ticker] or {}
+        length = int(panel.lengths[col])
+
+        close = panel.close[:, col]
+        cur_price = float(close[-1])
+        prev_price = float(close[-2]) if length >= 2 else cur_price
+        change_pct = (
+            ((cur_price - prev_price) / prev_price * 100) if prev_price > 0 else 0
+        )
+
+        anomaly_reason = ""
+        if is_anomaly[col]:
+            ratio_text = f"{float(surge_ratio[col]):.1f}배"
+            if is_neglected[col]:
+                anomaly_reason = (
+                    f"소외주 반등 감지: 거래량 {ratio_text} 급증, "
+                    f"양봉 {int(bullish[col])}개"
+                )
+            else:
+                anomaly_reason = (
+                    f"거래량 이상 급증: {ratio_text}, 양봉 {int(bullish[col])}개"
+                )
+
+        tail = min(length, 20)
+        vol_hist = panel.volume[-tail:, col]
+        vol_hist = (
+            vol_hist.astype(np.int64).tolist()
+            if not np.isnan(vol_hist).any()
+            else vol_hist.tolist()
+        )
+        vwap_value = float(vwap_values[col]) if length >= 5 else None
+        ma5_value = float(ma5[col]) if length >= 5 else None
+
+        result = {
+            "ticker": ticker,
+            "name": info.get("shortName") or info.get("longName") or ticker,
+            "score": max(0, min(100, round(float(total[col]), 1))),
+        }
+        for key, scores in factor_scores.items():
+            result[key] = round(float(scores[col]), 1)
+        result.update(
+            {
+                "is_anomaly": bool(is_anomaly[col]),
+                "anomaly_reason": anomaly_reason,
+                "price": round(cur_price, 2),
+                "change_percent": round(change_pct, 2),
+                "vwap": round(vwap_value, 2) if vwap_value else None,
+                "ma5": round(ma5_value, 2) if ma5_value else None,
+                "volume_ratio": round(float(volume_ratios[col]), 2),
+                "volume_history": vol_hist,
+                "price_history": close[-tail:].tolist(),
+                "dates": [date_labels[i] for i in date_ids[-tail:, col]],
+            }
+        )
+        results.append(result)
+    return results
 
-    if avg_20 <= 0:
-        return 50.0, 1.0
 
-    ratio = cur_vol / avg_20
+def _shares_outstanding(info: dict | None) -> float:
+    value = (info or {}).get("sharesOutstanding", 0)
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+# 기본 스캔 유니버스 (시총 상위 대표 종목)
+DEFAULT_UNIVERSE = {
+    "KR": [
+        "005930.KS", "000660.KS", "373220.KS", "207940.KS",
+        "005380.KS", "006400.KS", "051910.KS", "035420.KS",
+        "035720.KS", "068270.KS", "105560.KS", "055550.KS",
+        "000270.KS", "012330.KS", "066570.KS", "003670.KS",
+        "015760.KS", "009150.KS", "247540.KS", "086520.KS",
+        "003550.KS", "028260.KS", "017670.KS", "030200.KS",
+    ],
+    "US": [
+        "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA",
+        "JPM", "V", "WMT", "UNH", "JNJ", "HD", "PG", "MA",
+        "XOM", "CVX", "KO", "PEP", "COST", "AVGO", "LLY",
+        "AMD", "NFLX", "INTC", "BA", "CRM", "ORCL", "QCOM", "ADBE",
+    ],
+}
+
+
+class ScanResult(NamedTuple):
+    results: list[dict]  # 점수 내림차순 (동점은 입력 순서)
+    failures: dict[str, str]  # 채점하지 못한 종목 → 사유
+
+
+def scan_smart_scores(
+    tickers: list[str],
+    market: str = "KR",
+    workers: int | None = None,
+    top_k: int | None = None,
+) -> ScanResult:
+    """
+    여러 종목을 스캔하여 Smart Score 기준 정렬 후 반환한다.
+    Anomaly 종목은 보너스 점수(+10)를 받는다. 한 종목의 실패는 그 종목만
+    제외하며, 제외된 종목과 사유는 failures로 보고한다.
+
+    종목이 PARALLEL_MIN_TICKERS 이상이고 workers > 1이면 패널을 공유 메모리에
+    올려 프로세스 풀에서 샤드별로 채점하고, 샤드별 상위 K개를 힙으로 병합한다.
+    순서는 (점수 내림차순, 입력 순서)로 고정이라 워커 수와 무관하게 같다.
+
+    Args:
+        tickers: 스캔할 종목 (순서가 동점 처리 기준)
+        market: 결과에 기록할 시장 코드
+        workers: 프로세스 수 (None = SMART_SCORE_WORKERS, 0 = CPU 수, 1 = 단일 프로세스)
+        top_k: 상위 K개만 반환 (None = 전체)
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    # 히스토리는 한 번에 로드하고 (청크 단위 일괄 다운로드), 전 종목을 한 번에 채점
+    panel = load_score_panel(tickers)
+    return score_panel(panel, tickers, market, workers, top_k)
+
+
+def score_panel(
+    panel: ScorePanel,
+    tickers: list[str],
+    market: str = "KR",
+    workers: int | None = None,
+    top_k: int | None = None,
+) -> ScanResult:
+    """
+    이미 로드한 패널로 scan_smart_scores()를 수행한다 (메타데이터 조회 → 채점 →
+    보너스/정렬). tickers 중 패널에 없거나 봉이 부족한 종목은 failures로 보고한다.
+    """
+    failures = {}
+    bars = dict(zip(panel.tickers, panel.lengths.tolist()))
+    for ticker in tickers:
+        if ticker not in bars:
+            failures[ticker] = "가격 히스토리 없음"
+        elif bars[ticker] < 10:
+            failures[ticker] = f"히스토리 부족 ({bars[ticker]}봉)"
+
+    infos, info_failures = load_metadata([t for t in tickers if t not in failures])
+    for ticker, reason in info_failures.items():
+        failures[ticker] = f"메타데이터 조회 실패: {reason}"
+
+    workers = resolve_workers(SCORE_WORKERS if workers is None else workers)
+    results = None
+    if workers > 1 and len(panel.tickers) >= PARALLEL_MIN_TICKERS:
+        try:
+            results = _score_in_processes(panel, infos, market, workers, top_k)
+        except (BrokenProcessPool, OSError) as e:
+            # 워커를 띄울 수 없는 환경 (예: spawn이 메인 모듈을 못 읽음)
+            logger.warning(f"Parallel scoring unavailable, scoring in-process: {e}")
+            _reset_pool()
+    if results is None:
+        scored = [_finalize(r, market) for r in compute_smart_scores(panel, infos)]
+        results = _top_k(scored, top_k, _positions(panel.tickers))
 
-    if ratio >= 5.0:
-        score = 100
-    elif ratio >= 3.0:
-        score = 85
-    elif ratio >= 2.0:
-        score = 70
-    elif ratio >= 1.5:
-        score = 55
-    elif ratio >= 1.0:
-        score = 40
-    elif ratio >= 0.5:
-        score = 25
-    else:
-        score = 10
+    if failures:
+        logger.warning(
+            f"Smart score scan ({market}): {len(failures)}/{len(tickers)} tickers "
+            f"not scored"
+        )
+    return ScanResult(results, failures)
 
-    return score, ratio
 
+def scan_and_score(
+    tickers: list[str],
+    market: str = "KR",
+    workers: int | None = None,
+    top_k: int | None = None,
+) -> list[dict]:
+    """scan_smart_scores()의 결과 리스트만 반환한다 (실패 종목은 로그로 남는다)."""
+    return scan_smart_scores(tickers, market, workers, top_k).results
 
-def _detect_anomaly(df: pd.DataFrame) -> tuple[bool, str]:
-    """
-    Anomaly Detection — '소외주 반등' 패턴
 
-    조건:
-    1) 최근 10거래일 데이터 확보
-    2) 전반부(1~7일) 평균 거래량이 전체 20일 평균의 50% 이하 (소외)
-    3) 후반부(8~10일) 평균 거래량이 전반부의 3배 이상 (급증)
-    4) 최근 3일 중 양봉이 2개 이상
-    """
-    if len(df) < 10:
-        return False, ""
+def _finalize(result: dict, market: str) -> dict:
+    # Anomaly 보너스
+    if result["is_anomaly"]:
+        result["score"] = min(100, result["score"] + 10)
+    result["market"] = market
+    return result
 
-    recent_10 = df.tail(10)
-    vol = recent_10["Volume"]
 
-    early_vol = vol.iloc[:7].mean()  # 전반부 7일
-    late_vol = vol.iloc[7:].mean()   # 후반부 3일
+def _positions(tickers: list[str], offset: int = 0) -> dict[str, int]:
+    return {ticker: offset + i for i, ticker in enumerate(tickers)}
 
-    # 20일 평균
-    avg_20 = df["Volume"].tail(20).mean() if len(df) >= 20 else df["Volume"].mean()
 
-    # 소외 조건: 전반부 거래량이 20일 평균의 50% 이하
-    is_neglected = (early_vol < avg_20 * 0.5) if avg_20 > 0 else False
+def _top_k(results, top_k: int | None, positions: dict[str, int]) -> list[dict]:
+    """(점수 내림차순, 입력 순서) — top_k가 있으면 전체 정렬 대신 힙으로 상위 K개."""
 
-    # 급증 조건: 후반부가 전반부의 3배 이상
-    is_surge = (late_vol > early_vol * 3) if early_vol > 0 else False
+    def rank(result):
+        return result["score"], -positions[result["ticker"]]
 
-    # 양봉 확인
-    last_3 = df.tail(3)
-    bullish_count = sum(
-        _safe_float(last_3["Close"].iloc[i]) > _safe_float(last_3["Open"].iloc[i])
-        for i in range(len(last_3))
-    )
+    if top_k is None:
+        return sorted(results, key=rank, reverse=True)
+    return heapq.nlargest(top_k, results, key=rank)
 
-    if is_neglected and is_surge and bullish_count >= 2:
-        surge_ratio = late_vol / early_vol if early_vol > 0 else 0
-        return True, f"소외주 반등 감지: 거래량 {surge_ratio:.1f}배 급증, 양봉 {bullish_count}개"
 
-    if is_surge and bullish_count >= 2:
-        surge_ratio = late_vol / early_vol if early_vol > 0 else 0
-        return True, f"거래량 이상 급증: {surge_ratio:.1f}배, 양봉 {bullish_count}개"
+# ─── 프로세스 풀 채점 ───
+# 패널 배열은 공유 메모리 두 블록으로 넘긴다 (DataFrame pickle 없음):
+#   bars  float64 (5, 일자, 종목)   Open/High/Low/Close/Volume
+#   index int64   (일자 + 1, 종목)  날짜(datetime64[D]) 행들 + 마지막 행 = 봉 수
+# 워커에는 블록 이름/모양과 샤드의 종목 범위, 메타데이터만 pickle된다.
 
-    return False, ""
+_pool_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+_pool_workers = 0
 
 
-def scan_and_score(tickers: list[str], market: str = "KR") -> list[dict]:
+def _get_pool(workers: int) -> ProcessPoolExecutor:
     """
-    여러 종목을 스캔하여 Smart Score 기준 정렬 후 반환한다.
-    Anomaly 종목은 보너스 점수(+10)를 받는다.
+    재사용하는 프로세스 풀. uvicorn/Streamlit 프로세스는 스레드를 쓰므로
+    fork 대신 spawn으로 워커를 띄운다.
     """
-    results = []
-    for ticker in tickers:
-        result = compute_smart_score(ticker)
-        if result:
-            # Anomaly 보너스
-            if result["is_anomaly"]:
-                result["score"] = min(100, result["score"] + 10)
-            result["market"] = market
-            results.append(result)
-
-    results.sort(key=lambda x: x["score"], reverse=True)
-    return results
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _score_in_processes(
+    panel: ScorePanel, infos: dict, market: str, workers: int, top_k: int | None
+) -> list[dict]:
+    n = len(panel.tickers)
+    bars = np.stack([panel.open, panel.high, panel.low, panel.close, panel.volume])
+    index = np.vstack([panel.dates.view(np.int64), panel.lengths[None, :]])
+    blocks = []
+    try:
+        bars_desc = share_array(bars, blocks)
+        index_desc = share_array(index, blocks)
+        del bars, index
+
+        shard_size = -(-n // (workers * SHARDS_PER_WORKER))
+        specs = []
+        for lo in range(0, n, shard_size):
+            hi = min(lo + shard_size, n)
+            shard_tickers = panel.tickers[lo:hi]
+            specs.append(
+                {
+                    "bars": bars_desc,
+                    "index": index_desc,
+                    "columns": (lo, hi),
+                    "tickers": shard_tickers,
+                    "infos": {t: infos[t] for t in shard_tickers if t in infos},
+                    "market": market,
+                    "top_k": top_k,
+                }
+            )
+        shards = list(_get_pool(workers).map(_score_shard, specs))
+    finally:
+        release_blocks(blocks)
+
+    merged = itertools.chain.from_iterable(shards)
+    return _top_k(merged, top_k, _positions(panel.tickers))
+
+
+def _score_shard(spec: dict) -> list[dict]:
+    """워커 프로세스: 샤드의 종목 열만 채점해 샤드 내 상위 K개를 반환한다."""
+    bars_block, bars = attach_array(spec["bars"])
+    index_block, index = attach_array(spec["index"])
+    try:
+        lo, hi = spec["columns"]
+        panel = ScorePanel(
+            spec["tickers"],
+            index[:-1, lo:hi].view("datetime64[D]"),
+            bars[0, :, lo:hi],
+            bars[1, :, lo:hi],
+            bars[2, :, lo:hi],
+            bars[3, :, lo:hi],
+            bars[4, :, lo:hi],
+            index[-1, lo:hi],
+        )
+        scored = [
+            _finalize(r, spec["market"])
+            for r in compute_smart_scores(panel, spec["infos"])
+        ]
+        return _top_k(scored, spec["top_k"], _positions(spec["tickers"], lo))
+    finally:
+        # 공유 버퍼를 참조하는 뷰를 먼저 놓아야 블록을 닫을 수 있다
+        panel = bars = index = None
+        bars_block.close()
+        index_block.close()
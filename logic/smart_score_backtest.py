@@ -0,0 +1,564 @@
+"""
+Smart Score 백테스트 — 저장된 일봉 히스토리로 채점 로직을 재현하고
+점수 십분위별 선행 수익률을 측정한다.
+
+  1) load_backtest_panel(): 로컬 히스토리 스토어(price_history 테이블)를
+     (일자, 종목) 배열로 읽는다 — 네트워크 없음
+  2) score_history(): 모든 일자 × 종목의 점수를 한 번에 계산한다. 각 일자의
+     점수는 그 날까지의 봉만 쓴다 (이동합을 누적합 차분으로 구해 미래 참조 없음)
+  3) evaluate(): 일자별 횡단면 십분위 → 십분위별 h일 선행 수익률, 상위-하위
+     스프레드, 순위 IC(일자별 Spearman 상관의 평균), Anomaly 종목 수익률
+  4) sweep() / walk_forward(): 가중치·임계값 조합을 프로세스 풀에서 병렬 평가.
+     walk_forward()는 확장 창 구간에서 최적 조합을 고르고 바로 다음 구간에서
+     표본 외 성과를 잰다 (구간 경계에서 horizon만큼 비워 선행 수익률 누수 방지)
+
+창은 공통 거래일 달력의 행 기준이라 (휴장일은 NaN 봉으로 건너뜀), 한 시장의
+종목끼리 돌릴 때 compute_smart_score()와 같은 점수가 된다 (VWAP 창 = vwap_window).
+팩터 규칙은 레지스트리(logic/smart_score_factors.py)의 기본 세 팩터
+(BACKTEST_FACTORS)를 전 일자 벡터 연산으로 다시 구현한 것이고, BacktestParams의
+가중치와 거래량 구간 기본값만 레지스트리에서 온다 (SMART_SCORE_WEIGHTS 포함).
+그 밖의 팩터가 가중치를 가지면 score_history()가 ValueError를 낸다.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from logic.shared_panel import (
+    attach_array,
+    release_blocks,
+    resolve_workers,
+    share_array,
+)
+from logic.smart_score_factors import SURGE_BUCKETS, factor_weights, require_factors
+
+logger = logging.getLogger(__name__)
+
+# 병렬 스윕 프로세스 수 (0 = CPU 수)
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "0"))
+
+# 십분위/IC를 계산할 최소 횡단면 종목 수
+MIN_CROSS_SECTION = 10
+
+# 채점에 필요한 최소 봉 수 (compute_smart_score와 같음)
+MIN_BARS = 10
+
+# BacktestParams.weights 순서의 레지스트리 팩터 이름
+BACKTEST_FACTORS = ("institutional", "momentum", "volume")
+
+
+def default_weights() -> tuple:
+    """설정된 레지스트리 가중치 (기본값 ← SMART_SCORE_WEIGHTS), BACKTEST_FACTORS 순서."""
+    weights = factor_weights()
+    return tuple(weights[name] for name in BACKTEST_FACTORS)
+
+
+class BacktestParams(NamedTuple):
+    """스윕 가능한 채점 파라미터 (기본값 = 현재 scan_and_score 로직)."""
+
+    weights: tuple = default_weights()  # 기관 프록시 / 모멘텀 / 거래량 급증
+    anomaly_bonus: float = 10.0
+    inst_volume_cutoff: float = 1.2  # 직전 5일 평균 대비 거래량 배수
+    # 거래량 비율 구간과 구간별 점수 (미만 10점)
+    surge_thresholds: tuple = tuple(threshold for threshold, _ in SURGE_BUCKETS)
+    surge_points: tuple = tuple(points for _, points in SURGE_BUCKETS)
+    anomaly_surge: float = 3.0  # 후반부/전반부 거래량 배수
+    vwap_window: int = 21  # VWAP 누적 창 (1mo ≈ 21거래일)
+
+
+class BacktestPanel(NamedTuple):
+    """공통 거래일 달력 위의 OHLCV (일자, 종목) 배열. 봉이 없는 칸은 NaN."""
+
+    tickers: list[str]
+    dates: np.ndarray  # datetime64[D]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+
+class BacktestResult(NamedTuple):
+    params: BacktestParams
+    horizon: int  # 선행 수익률 기간 (거래일)
+    start: str  # 평가 첫 일자
+    end: str  # 평가 마지막 일자
+    observations: int  # (일자, 종목) 표본 수
+    deciles: list[dict]  # decile(1=최저), mean_return, hit_rate, count
+    spread: float  # 10분위 - 1분위 평균 수익률
+    ic: float  # 일자별 순위 IC 평균
+    ic_ir: float  # IC 평균 / 표준편차
+    anomaly_return: float  # Anomaly 종목 평균 수익률
+    anomaly_count: int
+
+
+# ─── 데이터 ───
+
+
+def market_tickers(market: str, session_factory=None) -> list[str]:
+    """히스토리 스토어에 저장된 시장별 종목 (KR = .KS/.KQ, US = 접미사 없음)."""
+    from models import PriceHistory
+
+    db = _session(session_factory)
+    try:
+        tickers = [row[0] for row in db.query(PriceHistory.ticker).distinct()]
+    finally:
+        db.close()
+    if market == "KR":
+        return sorted(t for t in tickers if t.endswith((".KS", ".KQ")))
+    return sorted(t for t in tickers if "." not in t and not t.startswith("^"))
+
+
+def load_backtest_panel(
+    tickers: list[str],
+    years: float = 3.0,
+    end: date | None = None,
+    session_factory=None,
+) -> BacktestPanel:
+    """
+    price_history 테이블에서 최근 years년 일봉을 읽어 BacktestPanel로 만든다.
+    다운로드는 하지 않는다 — 필요한 구간은 미리 스토어에 채워 둔다.
+    """
+    from models import PriceHistory
+
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    end = end or date.today()
+    start = end - timedelta(days=int(years * 365.25))
+
+    db = _session(session_factory)
+    try:
+        query = db.query(
+            PriceHistory.ticker,
+            PriceHistory.date,
+            PriceHistory.open,
+            PriceHistory.high,
+            PriceHistory.low,
+            PriceHistory.close,
+            PriceHistory.volume,
+        ).filter(
+            PriceHistory.ticker.in_(tickers),
+            PriceHistory.date >= start,
+            PriceHistory.date <= end,
+        )
+        table = pd.read_sql(query.statement, db.get_bind())
+    finally:
+        db.close()
+
+    if table.empty:
+        empty = np.empty((0, 0))
+        return BacktestPanel([], np.empty(0, "datetime64[D]"), *[empty] * 5)
+
+    table["date"] = pd.to_datetime(table["date"])
+    present = [t for t in tickers if t in set(table["ticker"])]
+    wide = {
+        field: table.pivot(index="date", columns="ticker", values=field)
+        .reindex(columns=present)
+        .to_numpy(dtype=np.float64)
+        for field in ("open", "high", "low", "close", "volume")
+    }
+    dates = np.sort(table["date"].unique()).astype("datetime64[D]")
+    return BacktestPanel(present, dates, **wide)
+
+
+def cached_shares(tickers: list[str], session_factory=None) -> np.ndarray:
+    """
+    메타데이터 캐시에 이미 있는 유통주식수 (네트워크 조회 없음, 없으면 0).
+    기관 프록시의 유통주식 대비 거래량 가산점에만 쓰인다.
+    """
+    shares = np.zeros(len(tickers))
+    try:
+        from services.cache_keys import ticker_metadata
+        from services.cache_service import TTL_METADATA, CacheService
+
+        db = _session(session_factory)
+        try:
+            cached = CacheService(db).get_many_cached(
+                [ticker_metadata(t) for t in tickers], TTL_METADATA
+            )
+        finally:
+            db.close()
+    except Exception as e:
+        logger.warning(f"Metadata cache unavailable for backtest: {e}")
+        return shares
+
+    for i, ticker in enumerate(tickers):
+        value = (cached.get(ticker_metadata(ticker)) or {}).get("sharesOutstanding")
+        if isinstance(value, (int, float)) and value > 0:
+            shares[i] = value
+    return shares
+
+
+# ─── 채점 (일자 × 종목 벡터화) ───
+
+
+def score_history(
+    panel: BacktestPanel,
+    params: BacktestParams = BacktestParams(),
+    shares: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    모든 (일자, 종목)의 Smart Score (Anomaly 보너스 포함).
+
+    Returns:
+        (scores, is_anomaly) — 채점할 수 없는 칸(최근 vwap_window 행 안의 봉이
+        MIN_BARS 미만이거나 당일 봉이 없음)은 scores가 NaN
+
+    Raises:
+        ValueError: BACKTEST_FACTORS 밖의 등록 팩터가 가중치를 가질 때
+    """
+    require_factors("backtest", BACKTEST_FACTORS, factor_weights())
+    close, volume = panel.close, panel.volume
+    if shares is None:
+        shares = np.zeros(close.shape[1])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        inst = _inst_scores(panel, params, shares)
+        momentum = _momentum_scores(panel, params)
+        surge = _surge_scores(volume, params)
+        is_anomaly = _anomalies(panel, params)
+
+        w_inst, w_momentum, w_volume = params.weights
+        total = inst * w_inst + momentum * w_momentum + surge * w_volume
+        total = np.clip(total, 0, 100)
+        total = np.where(
+            is_anomaly, np.minimum(100, total + params.anomaly_bonus), total
+        )
+
+    bars = _rolling(close, params.vwap_window)[1]
+    scorable = (bars >= MIN_BARS) & ~np.isnan(close)
+    return np.where(scorable, total, np.nan), is_anomaly & scorable
+
+
+def _rolling(values: np.ndarray, window: int, lag: int = 0):
+    """
+    행 t마다 [t-lag-window+1, t-lag] 구간의 NaN 제외 (합, 개수) — 누적합 차분.
+    앞쪽 행은 있는 만큼만 쓴다 (df.tail(k)와 같음).
+    """
+    valid = ~np.isnan(values)
+    zero = np.zeros((1, values.shape[1]))
+    sums = np.vstack([zero, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    counts = np.vstack([zero, np.cumsum(valid, axis=0)])
+    n = len(values)
+    hi = np.clip(np.arange(n) - lag + 1, 0, n)
+    lo = np.clip(hi - window, 0, n)
+    return sums[hi] - sums[lo], counts[hi] - counts[lo]
+
+
+def _rolling_mean(values: np.ndarray, window: int, lag: int = 0) -> np.ndarray:
+    total, count = _rolling(values, window, lag)
+    return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def _shift(values: np.ndarray, k: int) -> np.ndarray:
+    """행을 k칸 아래로 (행 t에 t-k의 값)."""
+    if k == 0:
+        return values
+    out = np.full_like(values, np.nan)
+    out[k:] = values[:-k]
+    return out
+
+
+def _inst_scores(panel, params, shares) -> np.ndarray:
+    """InstitutionalProxyFactor: 최근 3봉 중 (양봉 & 거래량 > 직전 5봉 평균 × cutoff)."""
+    hits = np.zeros(panel.close.shape, dtype=np.int64)
+    bonus = np.zeros(panel.close.shape)
+    has_shares = shares > 0
+    for k in range(3):
+        volume = _shift(panel.volume, k)
+        prior = _rolling_mean(panel.volume, 5, lag=k + 1)
+        hit = (_shift(panel.close, k) > _shift(panel.open, k)) & (
+            volume > prior * params.inst_volume_cutoff
+        )
+        hits += hit
+        buy_ratio = volume / np.where(has_shares, shares, 1.0)
+        points = np.select([buy_ratio > 0.03, buy_ratio > 0.01], [15, 8], 0)
+        bonus += np.where(hit & has_shares, points, 0)
+    return np.minimum(100, np.array([10, 35, 70, 100])[hits] + bonus)
+
+
+def _momentum_scores(panel, params) -> np.ndarray:
+    """PriceMomentumFactor: VWAP 돌파 + MA5 이격도."""
+    close, volume = panel.close, panel.volume
+    tp_vol = (panel.high + panel.low + close) / 3 * volume
+    tp_sum = _rolling(tp_vol, params.vwap_window)[0]
+    vol_sum = _rolling(volume, params.vwap_window)[0]
+    vwap = np.where(np.isnan(tp_vol) | (vol_sum == 0), np.nan, tp_sum / vol_sum)
+    ma5_sum, ma5_count = _rolling(close, 5)
+    ma5 = np.where(ma5_count == 5, ma5_sum / 5, np.nan)
+
+    vwap_ratio = (close - vwap) / vwap * 100
+    gap_ratio = (close - ma5) / ma5 * 100
+    vwap_points = np.select(
+        [vwap_ratio > 2, vwap_ratio > 0, vwap_ratio > -1], [25, 15, 5], -15
+    )
+    gap_points = np.select(
+        [gap_ratio > 3, gap_ratio > 1, gap_ratio > 0], [25, 15, 5], -10
+    )
+    score = 50.0 + np.where(vwap > 0, vwap_points, 0) + np.where(ma5 > 0, gap_points, 0)
+    return np.clip(score, 0, 100)
+
+
+def _surge_scores(volume, params) -> np.ndarray:
+    """VolumeSurgeFactor: 당일 거래량 / 20일 평균 구간 점수."""
+    avg_20 = _rolling_mean(volume, 20)
+    ratio = volume / avg_20
+    score = np.select(
+        [ratio >= t for t in params.surge_thresholds], params.surge_points, 10
+    ).astype(np.float64)
+    return np.where(avg_20 <= 0, 50.0, score)
+
+
+def _anomalies(panel, params) -> np.ndarray:
+    """detect_anomalies(): 후반 3봉 거래량이 전반 7봉의 anomaly_surge배 & 양봉 2개 이상."""
+    early = _rolling_mean(panel.volume, 7, lag=3)
+    late = _rolling_mean(panel.volume, 3)
+    bullish = sum(
+        _shift(panel.close, k) > _shift(panel.open, k) for k in range(3)
+    )
+    return (early > 0) & (late > early * params.anomaly_surge) & (bullish >= 2)
+
+
+# ─── 평가 ───
+
+
+def forward_returns(close: np.ndarray, horizon: int) -> np.ndarray:
+    """행 t의 horizon행 뒤 종가 수익률 (없으면 NaN)."""
+    out = np.full_like(close, np.nan)
+    if horizon < len(close):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    return out
+
+
+def evaluate(
+    panel: BacktestPanel,
+    scores: np.ndarray,
+    is_anomaly: np.ndarray,
+    fwd: np.ndarray,
+    params: BacktestParams,
+    horizon: int,
+    rows: tuple[int, int] | None = None,
+) -> BacktestResult:
+    """
+    rows=[lo, hi) 일자 구간의 십분위 성과. 선행 수익률이 구간 밖을 보지 않도록
+    평가 일자는 hi - horizon 전까지만 쓴다.
+    """
+    lo, hi = rows or (0, len(scores))
+    hi = max(lo, hi - horizon)
+    s, r, a = scores[lo:hi], fwd[lo:hi], is_anomaly[lo:hi]
+    mask = ~np.isnan(s) & ~np.isnan(r)
+    mask &= (mask.sum(axis=1) >= MIN_CROSS_SECTION)[:, None]
+
+    pct = pd.DataFrame(np.where(mask, s, np.nan)).rank(axis=1, pct=True).to_numpy()
+    decile = np.where(mask, np.clip(np.ceil(pct * 10), 1, 10), 0).astype(np.int64)
+    flat = decile[mask]
+    returns = r[mask]
+    counts = np.bincount(flat, minlength=11)
+    sums = np.bincount(flat, weights=returns, minlength=11)
+    wins = np.bincount(flat, weights=returns > 0, minlength=11)
+    deciles = [
+        {
+            "decile": d,
+            "mean_return": float(sums[d] / counts[d]) if counts[d] else None,
+            "hit_rate": float(wins[d] / counts[d]) if counts[d] else None,
+            "count": int(counts[d]),
+        }
+        for d in range(1, 11)
+    ]
+    top, bottom = deciles[-1]["mean_return"], deciles[0]["mean_return"]
+
+    ic = _rank_ic(np.where(mask, s, np.nan), np.where(mask, r, np.nan))
+    ic = ic[~np.isnan(ic)]
+    anomaly = mask & a
+    return BacktestResult(
+        params=params,
+        horizon=horizon,
+        start=str(panel.dates[lo]) if hi > lo else "",
+        end=str(panel.dates[hi - 1]) if hi > lo else "",
+        observations=int(mask.sum()),
+        deciles=deciles,
+        spread=top - bottom if top is not None and bottom is not None else np.nan,
+        ic=float(ic.mean()) if len(ic) else np.nan,
+        ic_ir=float(ic.mean() / ic.std()) if len(ic) > 1 and ic.std() > 0 else np.nan,
+        anomaly_return=float(r[anomaly].mean()) if anomaly.any() else np.nan,
+        anomaly_count=int(anomaly.sum()),
+    )
+
+
+def _rank_ic(scores: np.ndarray, returns: np.ndarray) -> np.ndarray:
+    """일자(행)별 Spearman 상관 — 평균 순위의 행별 Pearson 상관."""
+    x = pd.DataFrame(scores).rank(axis=1).to_numpy()
+    y = pd.DataFrame(returns).rank(axis=1).to_numpy()
+    counts = (~np.isnan(x)).sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = x - np.nansum(x, axis=1, keepdims=True) / counts
+        y = y - np.nansum(y, axis=1, keepdims=True) / counts
+        cov = np.nansum(x * y, axis=1)
+        return cov / np.sqrt(np.nansum(x * x, axis=1) * np.nansum(y * y, axis=1))
+
+
+def run_backtest(
+    panel: BacktestPanel,
+    params: BacktestParams = BacktestParams(),
+    horizon: int = 5,
+    shares: np.ndarray | None = None,
+) -> BacktestResult:
+    """한 파라미터 조합의 전체 기간 백테스트."""
+    return _evaluate_ranges(panel, shares, params, horizon, [None])[0]
+
+
+# ─── 파라미터 스윕 (프로세스 병렬) ───
+
+
+def param_grid(grid: dict) -> list[BacktestParams]:
+    """{필드: [값, ...]}의 모든 조합 (지정하지 않은 필드는 기본값)."""
+    names = list(grid)
+    return [
+        BacktestParams()._replace(**dict(zip(names, values)))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def sweep(
+    panel: BacktestPanel,
+    grid: dict | list[BacktestParams],
+    horizon: int = 5,
+    shares: np.ndarray | None = None,
+    workers: int | None = None,
+) -> list[BacktestResult]:
+    """조합별 전체 기간 백테스트 (입력 순서대로)."""
+    param_list = param_grid(grid) if isinstance(grid, dict) else list(grid)
+    runs = _evaluate_many(panel, shares, param_list, horizon, [None], workers)
+    return [results[0] for results in runs]
+
+
+def walk_forward(
+    panel: BacktestPanel,
+    grid: dict | list[BacktestParams],
+    horizon: int = 5,
+    folds: int = 4,
+    metric: str = "ic",
+    shares: np.ndarray | None = None,
+    workers: int | None = None,
+) -> list[dict]:
+    """
+    확장 창 walk-forward: 구간 k마다 처음~k 구간에서 metric("ic"/"spread")이
+    가장 좋은 조합을 골라 k+1 구간에서 평가한다. 기본 파라미터의 같은 구간
+    성과(baseline)도 함께 돌려준다.
+
+    Returns:
+        구간별 {"params", "in_sample", "out_of_sample", "baseline"} 리스트
+    """
+    param_list = param_grid(grid) if isinstance(grid, dict) else list(grid)
+    if BacktestParams() not in param_list:
+        param_list.append(BacktestParams())
+    # 첫 구간 앞은 VWAP/20일 창이 찰 때까지 건너뛴다
+    warmup = max(p.vwap_window for p in param_list)
+    bounds = np.linspace(warmup, len(panel.dates), folds + 2).astype(int)
+    ranges = []
+    for k in range(1, folds + 1):
+        ranges += [(bounds[0], bounds[k]), (bounds[k], bounds[k + 1])]
+
+    runs = _evaluate_many(panel, shares, param_list, horizon, ranges, workers)
+    baseline = runs[param_list.index(BacktestParams())]
+
+    folds_out = []
+    for k in range(folds):
+        in_sample = [results[2 * k] for results in runs]
+        scores = [getattr(result, metric) for result in in_sample]
+        best = int(np.nanargmax(scores)) if not np.all(np.isnan(scores)) else 0
+        folds_out.append(
+            {
+                "params": param_list[best],
+                "in_sample": in_sample[best],
+                "out_of_sample": runs[best][2 * k + 1],
+                "baseline": baseline[2 * k + 1],
+            }
+        )
+    return folds_out
+
+
+def _evaluate_ranges(panel, shares, params, horizon, ranges) -> list[BacktestResult]:
+    scores, is_anomaly = score_history(panel, params, shares)
+    fwd = forward_returns(panel.close, horizon)
+    return [
+        evaluate(panel, scores, is_anomaly, fwd, params, horizon, rows)
+        for rows in ranges
+    ]
+
+
+def _evaluate_many(panel, shares, param_list, horizon, ranges, workers):
+    """조합마다 _evaluate_ranges(). 여러 조합이면 패널을 공유 메모리로 넘겨 병렬."""
+    workers = resolve_workers(BACKTEST_WORKERS if workers is None else workers)
+    workers = min(workers, len(param_list))
+    if shares is None:
+        shares = np.zeros(len(panel.tickers))
+    if workers > 1:
+        try:
+            return _evaluate_in_processes(
+                panel, shares, param_list, horizon, ranges, workers
+            )
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Parallel backtest unavailable, running in-process: {e}")
+    return [
+        _evaluate_ranges(panel, shares, params, horizon, ranges)
+        for params in param_list
+    ]
+
+
+def _evaluate_in_processes(panel, shares, param_list, horizon, ranges, workers):
+    bars = np.stack([panel.open, panel.high, panel.low, panel.close, panel.volume])
+    blocks = []
+    try:
+        desc = share_array(bars, blocks)
+        del bars
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(desc, panel.tickers, panel.dates, shares),
+        ) as pool:
+            return list(
+                pool.map(
+                    _evaluate_worker,
+                    param_list,
+                    itertools.repeat(horizon),
+                    itertools.repeat(ranges),
+                )
+            )
+    finally:
+        release_blocks(blocks)
+
+
+# 워커 프로세스 상태: 공유 메모리 패널에 한 번만 붙는다
+_worker_state: dict = {}
+
+
+def _init_worker(desc, tickers, dates, shares):
+    block, bars = attach_array(desc)
+    _worker_state["block"] = block  # 블록이 살아 있어야 뷰가 유효하다
+    _worker_state["panel"] = BacktestPanel(tickers, dates, *bars)
+    _worker_state["shares"] = shares
+
+
+def _evaluate_worker(params, horizon, ranges) -> list[BacktestResult]:
+    return _evaluate_ranges(
+        _worker_state["panel"], _worker_state["shares"], params, horizon, ranges
+    )
+
+
+def _session(session_factory):
+    if session_factory is None:
+        from database import SessionLocal
+
+        session_factory = SessionLocal
+    return session_factory()
@@ -0,0 +1,374 @@
+"""
+Smart Score 팩터 레지스트리 — 팩터는 필요한 피처를 선언하고, FeaturePlanner가
+패널마다 서로 다른 피처를 한 번씩만 계산해 모든 팩터가 공유한다.
+
+피처(Feature)는 ScorePanel의 마지막 행(각 종목의 최근 봉) 기준 값이다:
+  mean(field, window, lag)   최근 봉에서 lag개 앞까지, window개 봉의 NaN 제외 평균
+  strict_mean(field, window) pandas rolling(window).mean() (NaN이 있으면 NaN)
+  candle(lag)                lag개 앞 봉의 양봉 여부 (종가 > 시가)
+  last(field, lag)           lag개 앞 봉의 값
+  vwap()                     패널 전체 구간 VWAP
+  volume_ratio()             당일 거래량 / 20봉 평균 (mean과 last에서 파생)
+
+예를 들어 20봉 평균 거래량은 Volume Surge와 Anomaly Detection이, 최근 3봉의
+양봉 여부는 기관 프록시와 Anomaly Detection이 같은 계산을 공유한다.
+
+새 팩터는 Factor를 상속해 features/compute()를 구현하고 register_factor()로
+등록한다 (프로세스 풀 워커에서도 보이도록 모듈 import 시점에 등록).
+
+가중치는 SMART_SCORE_WEIGHTS (예: "institutional=0.5,momentum=0.25,volume=0.25")
+환경 변수나 compute_smart_scores()의 weights 인자로 바꿀 수 있다.
+
+등록된 팩터의 compute()로 채점하는 곳은 compute_smart_score()/compute_smart_scores()
+뿐이다. 스트리밍 엔진(smart_score_stream, 이동합)과 백테스트(smart_score_backtest,
+전 일자 벡터 연산)는 기본 세 팩터의 규칙을 각자 다시 구현하고, 레지스트리에서는
+가중치(factor_weights())와 거래량 구간(SURGE_BUCKETS)만 가져온다. 그래서 규칙을
+바꾸면 세 곳을 함께 고쳐야 하고, 두 엔진이 모르는 팩터가 가중치를 가지면
+require_factors()가 ValueError를 낸다 (조용히 빼고 계산하지 않는다).
+"""
+
+import logging
+import os
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class Feature(NamedTuple):
+    kind: str
+    field: str = ""
+    window: int = 0
+    lag: int = 0
+
+
+def mean(field: str, window: int, lag: int = 0) -> Feature:
+    return Feature("mean", field, window, lag)
+
+
+def strict_mean(field: str, window: int) -> Feature:
+    return Feature("strict_mean", field, window)
+
+
+def candle(lag: int = 0) -> Feature:
+    return Feature("candle", lag=lag)
+
+
+def last(field: str, lag: int = 0) -> Feature:
+    return Feature("last", field, lag=lag)
+
+
+def vwap() -> Feature:
+    return Feature("vwap")
+
+
+def volume_ratio() -> Feature:
+    return Feature("volume_ratio", "volume", 20)
+
+
+# 결과 dict에도 실리는 피처
+VWAP = vwap()
+MA5 = strict_mean("close", 5)
+VOLUME_RATIO = volume_ratio()
+
+
+def nanmean_columns(values: np.ndarray) -> np.ndarray:
+    """열(종목)별 NaN 제외 평균 — pandas Series.mean()과 같은 값 (거래량은 정수라 합이 정확)."""
+    mask = ~np.isnan(values)
+    total = np.where(mask, values, 0.0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / mask.sum(axis=0)
+
+
+class FeaturePlanner:
+    """
+    한 ScorePanel의 피처 캐시. plan()은 선언된 피처의 합집합을 한 번씩 계산하고,
+    get()은 캐시에서 꺼낸다 (없으면 계산 후 저장).
+    """
+
+    def __init__(self, panel, shares: np.ndarray | None = None):
+        self.panel = panel
+        self.shares = shares if shares is not None else np.zeros(len(panel.tickers))
+        self.width, self.n = panel.close.shape
+        self._cache: dict[Feature, np.ndarray] = {}
+
+    def plan(self, features) -> "FeaturePlanner":
+        for feature in dict.fromkeys(features):
+            self.get(feature)
+        return self
+
+    def get(self, feature: Feature) -> np.ndarray:
+        value = self._cache.get(feature)
+        if value is None:
+            value = self._cache[feature] = self._compute(feature)
+        return value
+
+    @property
+    def computed(self) -> int:
+        """지금까지 계산한 서로 다른 피처 수."""
+        return len(self._cache)
+
+    def _compute(self, feature: Feature) -> np.ndarray:
+        panel, width = self.panel, self.width
+        kind = feature.kind
+        if kind == "mean":
+            stop = width - feature.lag
+            if stop <= 0:
+                return np.full(self.n, np.nan)
+            values = getattr(panel, feature.field)
+            return nanmean_columns(values[max(0, stop - feature.window) : stop])
+        if kind == "strict_mean":
+            if not width:
+                return np.full(self.n, np.nan)
+            values = getattr(panel, feature.field)
+            return pd.DataFrame(values).rolling(feature.window).mean().to_numpy()[-1]
+        if kind == "candle":
+            if width <= feature.lag:
+                return np.zeros(self.n, dtype=bool)
+            row = width - 1 - feature.lag
+            return panel.close[row] > panel.open[row]
+        if kind == "last":
+            if width <= feature.lag:
+                return np.full(self.n, np.nan)
+            return getattr(panel, feature.field)[width - 1 - feature.lag]
+        if kind == "vwap":
+            return self._vwap()
+        if kind == "volume_ratio":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return self.get(last("volume")) / self.get(mean("volume", 20))
+        raise ValueError(f"Unknown feature: {feature}")
+
+    def _vwap(self) -> np.ndarray:
+        """누적합은 pandas cumsum처럼 NaN을 건너뛰되 마지막 봉이 NaN이면 NaN."""
+        panel = self.panel
+        if not self.width:
+            return np.full(self.n, np.nan)
+        tp_vol = (panel.high + panel.low + panel.close) / 3 * panel.volume
+        cum_tp_vol = np.nancumsum(tp_vol, axis=0)[-1]
+        cum_vol = np.nancumsum(panel.volume, axis=0)[-1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(
+                np.isnan(tp_vol[-1]) | np.isnan(panel.volume[-1]) | (cum_vol == 0),
+                np.nan,
+                cum_tp_vol / cum_vol,
+            )
+
+
+class Factor:
+    """
+    Smart Score 팩터. 점수(0~100)는 result_key로 결과 dict에 실리고
+    weight만큼 총점에 반영된다.
+    """
+
+    name: str = ""  # 가중치 설정 키
+    result_key: str = ""  # 결과 dict 키
+    weight: float = 0.0  # 기본 가중치
+    features: tuple = ()
+
+    def compute(self, planner: FeaturePlanner) -> np.ndarray:
+        raise NotImplementedError
+
+
+_REGISTRY: dict[str, Factor] = {}
+
+
+def register_factor(factor: Factor) -> Factor:
+    """팩터를 등록한다 (같은 이름은 교체). 총점은 등록 순서대로 더한다."""
+    _REGISTRY[factor.name] = factor
+    return factor
+
+
+def get_factors() -> list[Factor]:
+    return list(_REGISTRY.values())
+
+
+def factor_weights(overrides: dict | None = None) -> dict[str, float]:
+    """기본 가중치 ← SMART_SCORE_WEIGHTS ← overrides 순으로 덮어쓴 가중치."""
+    weights = {factor.name: factor.weight for factor in get_factors()}
+    for source in (_env_weights(), overrides or {}):
+        for name, weight in source.items():
+            if name in weights:
+                weights[name] = float(weight)
+            else:
+                logger.warning(f"Unknown Smart Score factor in weights: {name}")
+    return weights
+
+
+def require_factors(engine: str, supported, weights: dict[str, float]):
+    """
+    supported 밖의 등록 팩터가 가중치를 가지면 ValueError — 팩터 규칙을 따로
+    구현한 엔진(스트림/백테스트)이 그 팩터를 빼고 다른 점수를 내지 않도록 한다.
+    """
+    missing = [
+        factor.name
+        for factor in get_factors()
+        if factor.name not in supported and weights.get(factor.name)
+    ]
+    if missing:
+        raise ValueError(
+            f"Smart Score factors not implemented by the {engine}: {missing} "
+            f"(set their weight to 0 or implement them there)"
+        )
+
+
+def _env_weights() -> dict[str, float]:
+    weights = {}
+    for item in os.getenv("SMART_SCORE_WEIGHTS", "").split(","):
+        if not item.strip():
+            continue
+        name, _, value = item.partition("=")
+        try:
+            weights[name.strip()] = float(value)
+        except ValueError:
+            logger.warning(f"Invalid SMART_SCORE_WEIGHTS entry: {item!r}")
+    return weights
+
+
+# ═══════════════════════════════════════════════════
+# 기본 팩터
+# ═══════════════════════════════════════════════════
+
+
+class InstitutionalProxyFactor(Factor):
+    """
+    기관/외인 매집 프록시: 최근 3봉 중 (양봉 & 거래량 > 직전 5봉 평균 × 1.2)인
+    날 수 + 유통주식 대비 거래량 가산점.
+    """
+
+    name = "institutional"
+    result_key = "inst_score"
+    weight = 0.4
+    features = tuple(
+        feature
+        for lag in range(3)
+        for feature in (candle(lag), last("volume", lag), mean("volume", 5, lag + 1))
+    )
+
+    def compute(self, planner: FeaturePlanner) -> np.ndarray:
+        shares = planner.shares
+        has_shares = shares > 0
+        bullish_days = np.zeros(planner.n, dtype=np.int64)
+        bonus = np.zeros(planner.n, dtype=np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for lag in range(3):
+                v = planner.get(last("volume", lag))
+                avg_vol = planner.get(mean("volume", 5, lag + 1))
+                hit = planner.get(candle(lag)) & (v > avg_vol * 1.2)
+                bullish_days += hit
+
+                buy_ratio = np.where(
+                    has_shares, v / np.where(has_shares, shares, 1.0), 0.0
+                )
+                bonus += np.where(
+                    hit & has_shares,
+                    np.select([buy_ratio > 0.03, buy_ratio > 0.01], [15, 8], 0),
+                    0,
+                )
+
+        base = np.array([10, 35, 70, 100])[bullish_days]
+        score = np.minimum(100, base + bonus).astype(np.float64)
+        return np.where(planner.panel.lengths < 8, 10.0, score)
+
+
+class PriceMomentumFactor(Factor):
+    """Price Momentum: VWAP 돌파 + MA5 이격도."""
+
+    name = "momentum"
+    result_key = "momentum_score"
+    weight = 0.3
+    features = (vwap(), strict_mean("close", 5), last("close"))
+
+    def compute(self, planner: FeaturePlanner) -> np.ndarray:
+        vwap_value = planner.get(vwap())
+        ma5 = planner.get(strict_mean("close", 5))
+        cur = planner.get(last("close"))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap_ratio = (cur - vwap_value) / vwap_value * 100
+            gap_ratio = (cur - ma5) / ma5 * 100
+            vwap_points = np.select(
+                [vwap_ratio > 2, vwap_ratio > 0, vwap_ratio > -1], [25, 15, 5], -15
+            )
+            gap_points = np.select(
+                [gap_ratio > 3, gap_ratio > 1, gap_ratio > 0], [25, 15, 5], -10
+            )
+            score = (
+                50.0
+                + np.where(vwap_value > 0, vwap_points, 0)
+                + np.where(ma5 > 0, gap_points, 0)
+            )
+        score = np.clip(score, 0, 100)
+        return np.where(planner.panel.lengths < 5, 50.0, score)
+
+
+# 거래량 비율 구간 → 점수 (미만 10점)
+SURGE_BUCKETS = ((5.0, 100), (3.0, 85), (2.0, 70), (1.5, 55), (1.0, 40), (0.5, 25))
+
+
+class VolumeSurgeFactor(Factor):
+    """Volume Surge: 당일 거래량 / 20봉 평균 구간 점수."""
+
+    name = "volume"
+    result_key = "volume_score"
+    weight = 0.3
+    features = (volume_ratio(), mean("volume", 20))
+
+    def compute(self, planner: FeaturePlanner) -> np.ndarray:
+        ratio = planner.get(volume_ratio())
+        with np.errstate(invalid="ignore"):
+            score = np.select(
+                [ratio >= threshold for threshold, _ in SURGE_BUCKETS],
+                [points for _, points in SURGE_BUCKETS],
+                10,
+            ).astype(np.float64)
+        return np.where(surge_flat(planner), 50.0, score)
+
+
+def surge_flat(planner: FeaturePlanner) -> np.ndarray:
+    """거래량 비율을 쓸 수 없는 종목 (봉 2개 미만 또는 20봉 평균 0)."""
+    with np.errstate(invalid="ignore"):
+        return (planner.panel.lengths < 2) | (planner.get(mean("volume", 20)) <= 0)
+
+
+# Anomaly Detection이 쓰는 피처 (팩터는 아니지만 같은 플래너를 공유)
+ANOMALY_FEATURES = (
+    mean("volume", 7, 3),  # 최근 10봉 중 전반부 7봉
+    mean("volume", 3),  # 후반부 3봉
+    mean("volume", 20),
+    candle(0),
+    candle(1),
+    candle(2),
+)
+
+
+def detect_anomalies(planner: FeaturePlanner):
+    """
+    Anomaly Detection ('소외주 반등' 패턴) — 최근 10봉 중 후반 3봉 평균 거래량이
+    전반 7봉의 3배 초과 & 최근 3봉 중 양봉 2개 이상. 전반부가 20봉 평균의
+    절반 미만이면 소외주 반등으로 본다.
+
+    Returns:
+        (is_anomaly, is_neglected, surge_ratio, bullish_count) 배열
+    """
+    n = planner.n
+    if planner.width < 10:
+        zeros = np.zeros(n, dtype=bool)
+        return zeros, zeros, np.zeros(n), np.zeros(n, dtype=np.int64)
+
+    early_vol = planner.get(mean("volume", 7, 3))
+    late_vol = planner.get(mean("volume", 3))
+    avg_20 = planner.get(mean("volume", 20))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        is_neglected = (avg_20 > 0) & (early_vol < avg_20 * 0.5)
+        is_surge = (early_vol > 0) & (late_vol > early_vol * 3)
+        surge_ratio = np.where(early_vol > 0, late_vol / early_vol, 0.0)
+    bullish = sum(planner.get(candle(lag)).astype(np.int64) for lag in range(3))
+
+    is_anomaly = is_surge & (bullish >= 2) & (planner.panel.lengths >= 10)
+    return is_anomaly, is_neglected & is_anomaly, surge_ratio, bullish
+
+
+register_factor(InstitutionalProxyFactor())
+register_factor(PriceMomentumFactor())
+register_factor(VolumeSurgeFactor())
@@ -0,0 +1,500 @@
+"""
+Smart Score 스트리밍 엔진 — 봉이 들어올 때마다 O(1)로 점수를 갱신한다.
+
+compute_smart_score()는 호출마다 전체 일봉 창으로 VWAP 누적합, 20일 평균
+거래량 등을 다시 계산한다. StreamingScorer는 종목별로 최근 window_bars개의
+봉과 고정 구간 이동합(VWAP 분자/분모, MA5, 20일 거래량, 이상 탐지의
+전반부/후반부, 기관 프록시의 직전 5일 거래량)을 유지하므로 봉 하나의
+갱신 비용이 창 길이와 무관하다.
+
+봉(Bar)은 두 종류다:
+  - 마지막 봉보다 뒤 날짜 → 새 봉 추가 (창에서 가장 오래된 봉이 빠진다)
+  - 마지막 봉과 같은 날짜 → 형성 중인 당일 봉 갱신 (장중 업데이트)
+
+결과는 같은 최근 window_bars개 봉으로 compute_smart_score()를 돌린 것과 같다.
+팩터 규칙은 레지스트리(logic/smart_score_factors.py)의 기본 세 팩터
+(STREAM_FACTORS)를 이동합으로 다시 구현한 것이고, 레지스트리에서는 가중치
+(factor_weights(), SMART_SCORE_WEIGHTS 포함)와 거래량 구간만 가져온다. 그 밖의
+팩터가 가중치를 가지면 생성 시 ValueError를 낸다.
+봉은 BarFeed에서 온다 — 기록 파일을 재생하는 ReplayFeed(테스트/백필용)와
+yfinance 당일 봉을 주기적으로 폴링하는 YahooBarFeed가 있다.
+"""
+
+import csv
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from datetime import date, timedelta
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from logic.smart_score import load_metadata, load_price_history
+from logic.smart_score_factors import SURGE_BUCKETS, factor_weights, require_factors
+
+logger = logging.getLogger(__name__)
+
+# 종목별로 유지하는 봉 수 (1mo 일봉 ≈ 21~23봉)
+STREAM_WINDOW_BARS = 22
+
+# 이동합의 부동소수점 오차가 쌓이지 않도록 이만큼 갱신할 때마다 창에서 다시 합산
+RESYNC_UPDATES = 500
+
+# YahooBarFeed 폴링 시 받는 기간 (마지막 봉만 쓴다)
+POLL_LOOKBACK_DAYS = 5
+
+# 이동합으로 갱신할 수 있는 팩터 (레지스트리 이름)
+STREAM_FACTORS = ("institutional", "momentum", "volume")
+
+
+class Bar(NamedTuple):
+    ticker: str
+    date: date
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class _Window:
+    """
+    bars[-start:-end] 구간(end=0이면 끝까지)의 NaN 제외 합/개수.
+    새 봉 추가·마지막 봉 교체 모두 O(1).
+    """
+
+    __slots__ = ("start", "end", "value", "total", "count")
+
+    def __init__(self, start: int, end: int, value: Callable):
+        self.start, self.end, self.value = start, end, value
+        self.total, self.count = 0.0, 0
+
+    def _add(self, bar, sign: int):
+        x = self.value(bar)
+        if not np.isnan(x):
+            self.total += sign * x
+            self.count += sign
+
+    def on_append(self, bars: deque, evicted):
+        """bars에는 새 봉이 이미 추가됨; evicted는 창 밖으로 밀려난 봉 (없으면 None)."""
+        n = len(bars)
+        if n > self.end:
+            self._add(bars[n - 1 - self.end], 1)  # 구간에 새로 들어온 봉
+        leaving = n - 1 - self.start
+        if leaving >= 0:
+            self._add(bars[leaving], -1)
+        elif evicted is not None and leaving == -1:
+            self._add(evicted, -1)
+
+    def on_replace(self, old, new):
+        if self.end == 0:
+            self._add(old, -1)
+            self._add(new, 1)
+
+    def resync(self, bars: deque):
+        self.total, self.count = 0.0, 0
+        n = len(bars)
+        for i in range(max(0, n - self.start), n - self.end):
+            self._add(bars[i], 1)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else np.nan
+
+
+def _typical_volume(bar: Bar) -> float:
+    return (bar.high + bar.low + bar.close) / 3 * bar.volume
+
+
+def _close(bar: Bar) -> float:
+    return bar.close
+
+
+def _volume(bar: Bar) -> float:
+    return bar.volume
+
+
+class _TickerState:
+    """한 종목의 최근 봉과 이동합."""
+
+    def __init__(self, window_bars: int):
+        self.bars: deque = deque(maxlen=window_bars)
+        self.tp_vol = _Window(window_bars, 0, _typical_volume)  # VWAP 분자
+        self.vol = _Window(window_bars, 0, _volume)  # VWAP 분모
+        self.ma5 = _Window(5, 0, _close)
+        self.vol20 = _Window(20, 0, _volume)
+        self.early = _Window(10, 3, _volume)  # 이상 탐지 전반부 (7봉)
+        self.late = _Window(3, 0, _volume)  # 이상 탐지 후반부 (3봉)
+        # 최근 3봉 각각의 직전 5봉 거래량 (기관 프록시)
+        self.prior5 = [
+            _Window(8, 3, _volume),
+            _Window(7, 2, _volume),
+            _Window(6, 1, _volume),
+        ]
+        self.windows = [
+            self.tp_vol,
+            self.vol,
+            self.ma5,
+            self.vol20,
+            self.early,
+            self.late,
+            *self.prior5,
+        ]
+        self.updates = 0
+
+    def push(self, bar: Bar) -> bool:
+        """봉을 반영한다. 마지막 봉보다 과거 날짜면 무시하고 False."""
+        bars = self.bars
+        if bars and bar.date < bars[-1].date:
+            return False
+        if bars and bar.date == bars[-1].date:
+            old = bars[-1]
+            bars[-1] = bar
+            for window in self.windows:
+                window.on_replace(old, bar)
+        else:
+            evicted = bars[0] if len(bars) == bars.maxlen else None
+            bars.append(bar)
+            for window in self.windows:
+                window.on_append(bars, evicted)
+
+        self.updates += 1
+        if self.updates % RESYNC_UPDATES == 0:
+            for window in self.windows:
+                window.resync(bars)
+        return True
+
+    def vwap(self) -> float:
+        last = self.bars[-1]
+        if np.isnan(_typical_volume(last)) or not self.vol.total:
+            return np.nan
+        return self.tp_vol.total / self.vol.total
+
+
+class StreamingScorer:
+    """
+    종목별 스트리밍 Smart Score.
+
+    사용 예:
+        scorer = StreamingScorer()
+        scorer.seed_history(tickers)            # 일봉 히스토리로 초기화
+        for result in scorer.run(YahooBarFeed(tickers)):
+            ...                                  # 갱신된 종목의 점수 dict
+    """
+
+    def __init__(
+        self,
+        market: str = "KR",
+        window_bars: int = STREAM_WINDOW_BARS,
+        infos: dict | None = None,
+        weights: dict | None = None,
+    ):
+        self.market = market
+        self.window_bars = window_bars
+        self.infos: dict = dict(infos or {})
+        # {팩터 이름: 가중치} — weights는 기본값/SMART_SCORE_WEIGHTS를 덮어쓴다
+        self.weights = factor_weights(weights)
+        require_factors("stream engine", STREAM_FACTORS, self.weights)
+        self._states: dict[str, _TickerState] = {}
+
+    def seed(self, ticker: str, df: pd.DataFrame):
+        """일봉 DataFrame(Open/High/Low/Close/Volume)으로 종목 상태를 초기화한다."""
+        state = _TickerState(self.window_bars)
+        for idx, row in df.tail(self.window_bars).iterrows():
+            state.push(_bar(ticker, idx, row))
+        self._states[ticker] = state
+
+    def seed_history(self, tickers: list[str], period: str = "1mo") -> dict[str, str]:
+        """
+        load_price_history()/load_metadata()로 종목들을 초기화한다.
+
+        Returns:
+            {ticker: 실패 사유} — 히스토리나 메타데이터가 없는 종목
+        """
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        histories = load_price_history(tickers, period)
+        infos, failures = load_metadata([t for t in tickers if t not in self.infos])
+        self.infos.update(infos)
+        for ticker in tickers:
+            df = histories.get(ticker)
+            if df is None or not len(df):
+                failures.setdefault(ticker, "가격 히스토리 없음")
+                continue
+            self.seed(ticker, df)
+        return failures
+
+    def update(self, bar: Bar) -> dict | None:
+        """봉 하나를 반영하고 그 종목의 새 점수를 돌려준다 (채점 불가면 None)."""
+        state = self._states.get(bar.ticker)
+        if state is None:
+            state = self._states[bar.ticker] = _TickerState(self.window_bars)
+        if not state.push(bar):
+            logger.debug(f"Out-of-order bar ignored: {bar.ticker} {bar.date}")
+            return None
+        return self.score(bar.ticker)
+
+    def run(self, feed: Iterable[Bar]) -> Iterator[dict]:
+        """피드의 봉을 차례로 반영하며 갱신된 점수를 내보낸다."""
+        for bar in feed:
+            result = self.update(bar)
+            if result is not None:
+                yield result
+
+    def scores(self) -> list[dict]:
+        """현재 채점 가능한 모든 종목 (점수 내림차순)."""
+        results = [r for r in map(self.score, self._states) if r is not None]
+        return sorted(results, key=lambda r: r["score"], reverse=True)
+
+    def score(self, ticker: str) -> dict | None:
+        """
+        현재 상태의 점수 — compute_smart_score()와 같은 형식과 값.
+        봉이 10개 미만이거나 메타데이터가 없는 종목은 None.
+        """
+        state = self._states.get(ticker)
+        if state is None or len(state.bars) < 10 or ticker not in self.infos:
+            return None
+        info = self.infos[ticker] or {}
+        bars = state.bars
+        n = len(bars)
+        last = bars[-1]
+
+        cur_price = float(last.close)
+        prev_price = float(bars[-2].close)
+        change_pct = (
+            ((cur_price - prev_price) / prev_price * 100) if prev_price > 0 else 0
+        )
+
+        inst_score = _inst_points(state, info.get("sharesOutstanding", 0))
+
+        # Price Momentum — n >= 10이므로 VWAP/MA5는 항상 계산된다
+        vwap = state.vwap()
+        ma5 = state.ma5.mean() if state.ma5.count == 5 else np.nan
+        momentum_score = _momentum_points(cur_price, vwap, ma5)
+
+        avg_20 = state.vol20.mean()
+        if avg_20 <= 0:
+            volume_score, volume_ratio = 50.0, 1.0
+        else:
+            volume_ratio = last.volume / avg_20
+            volume_score = _surge_points(volume_ratio)
+
+        is_anomaly, anomaly_reason = _anomaly(state, avg_20)
+
+        points = {
+            "institutional": inst_score,
+            "momentum": momentum_score,
+            "volume": volume_score,
+        }
+        total = sum(
+            points[name] * self.weights.get(name, 0.0) for name in STREAM_FACTORS
+        )
+        recent = list(itertools.islice(bars, max(0, n - 20), n))
+        return {
+            "ticker": ticker,
+            "name": info.get("shortName") or info.get("longName") or ticker,
+            "score": max(0, min(100, round(total, 1))),
+            "inst_score": round(inst_score, 1),
+            "momentum_score": round(momentum_score, 1),
+            "volume_score": round(volume_score, 1),
+            "is_anomaly": is_anomaly,
+            "anomaly_reason": anomaly_reason,
+            "price": round(cur_price, 2),
+            "change_percent": round(change_pct, 2),
+            "vwap": round(vwap, 2) if vwap and not np.isnan(vwap) else None,
+            "ma5": round(ma5, 2) if ma5 and not np.isnan(ma5) else None,
+            "volume_ratio": round(float(volume_ratio), 2),
+            "volume_history": [b.volume for b in recent],
+            "price_history": [b.close for b in recent],
+            "dates": [b.date.strftime("%m/%d") for b in recent],
+            "market": self.market,
+        }
+
+
+def _inst_points(state: _TickerState, shares_outstanding) -> float:
+    """InstitutionalProxyFactor와 같은 규칙 — 직전 5봉 거래량은 이동합에서."""
+    bars = state.bars
+    if len(bars) < 8:
+        return 10.0
+    bullish_days, bonus = 0, 0
+    for offset, prior in zip((-3, -2, -1), state.prior5):
+        bar = bars[offset]
+        if bar.close > bar.open and bar.volume > prior.mean() * 1.2:
+            bullish_days += 1
+            if shares_outstanding and shares_outstanding > 0:
+                buy_ratio = bar.volume / shares_outstanding
+                if buy_ratio > 0.03:
+                    bonus += 15
+                elif buy_ratio > 0.01:
+                    bonus += 8
+    return min(100, {0: 10, 1: 35, 2: 70, 3: 100}[bullish_days] + bonus)
+
+
+def _momentum_points(cur: float, vwap: float, ma5: float) -> float:
+    """PriceMomentumFactor의 점수 규칙."""
+    score = 50.0
+    if vwap > 0:
+        vwap_ratio = (cur - vwap) / vwap * 100
+        if vwap_ratio > 2:
+            score += 25
+        elif vwap_ratio > 0:
+            score += 15
+        elif vwap_ratio > -1:
+            score += 5
+        else:
+            score -= 15
+    if ma5 > 0:
+        gap_ratio = (cur - ma5) / ma5 * 100
+        if gap_ratio > 3:
+            score += 25
+        elif gap_ratio > 1:
+            score += 15
+        elif gap_ratio > 0:
+            score += 5
+        else:
+            score -= 10
+    return max(0, min(100, score))
+
+
+def _surge_points(ratio: float) -> float:
+    """VolumeSurgeFactor의 점수 규칙."""
+    for threshold, points in SURGE_BUCKETS:
+        if ratio >= threshold:
+            return points
+    return 10
+
+
+def _anomaly(state: _TickerState, avg_20: float) -> tuple[bool, str]:
+    """detect_anomalies()와 같은 규칙 — 전반부/후반부 평균은 이동합에서."""
+    early_vol, late_vol = state.early.mean(), state.late.mean()
+    is_neglected = avg_20 > 0 and early_vol < avg_20 * 0.5
+    is_surge = early_vol > 0 and late_vol > early_vol * 3
+    bars = state.bars
+    bullish = sum(bars[i].close > bars[i].open for i in (-3, -2, -1))
+    if not (is_surge and bullish >= 2):
+        return False, ""
+    surge_ratio = late_vol / early_vol
+    if is_neglected:
+        return (
+            True,
+            f"소외주 반등 감지: 거래량 {surge_ratio:.1f}배 급증, 양봉 {bullish}개",
+        )
+    return True, f"거래량 이상 급증: {surge_ratio:.1f}배, 양봉 {bullish}개"
+
+
+def _bar(ticker: str, index, row) -> Bar:
+    return Bar(
+        ticker,
+        pd.Timestamp(index).date(),
+        float(row["Open"]),
+        float(row["High"]),
+        float(row["Low"]),
+        float(row["Close"]),
+        float(row["Volume"]),
+    )
+
+
+# ═══════════════════════════════════════════════════
+# 봉 피드
+# ═══════════════════════════════════════════════════
+
+
+class BarFeed:
+    """Bar를 차례로 내보내는 피드 — __iter__만 구현하면 StreamingScorer.run()에 쓸 수 있다."""
+
+    def __iter__(self) -> Iterator[Bar]:
+        raise NotImplementedError
+
+
+class ReplayFeed(BarFeed):
+    """
+    기록된 봉 파일을 재생한다 (.jsonl 또는 .csv).
+
+    필드: ticker, date(YYYY-MM-DD), open, high, low, close, volume, 선택적으로
+    ts(기록 시각, epoch 초). speed > 0이면 ts 간격을 speed배 빠르게 재현하고,
+    0이면 기다리지 않고 바로 내보낸다.
+    """
+
+    def __init__(self, path: str, speed: float = 0.0):
+        self.path = path
+        self.speed = speed
+
+    def __iter__(self) -> Iterator[Bar]:
+        previous_ts = None
+        for record in self._records():
+            ts = record.get("ts")
+            if self.speed > 0 and ts not in (None, ""):
+                ts = float(ts)
+                if previous_ts is not None and ts > previous_ts:
+                    time.sleep((ts - previous_ts) / self.speed)
+                previous_ts = ts
+            yield Bar(
+                record["ticker"],
+                date.fromisoformat(str(record["date"])[:10]),
+                float(record["open"]),
+                float(record["high"]),
+                float(record["low"]),
+                float(record["close"]),
+                float(record["volume"]),
+            )
+
+    def _records(self) -> Iterator[dict]:
+        with open(self.path, newline="", encoding="utf-8") as f:
+            if self.path.endswith(".csv"):
+                yield from csv.DictReader(f)
+            else:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def record_bars(path: str, bars: Iterable[Bar]) -> Iterator[Bar]:
+    """
+    봉을 그대로 흘려보내며 ReplayFeed가 읽는 .jsonl로 기록한다.
+    예: scorer.run(record_bars("today.jsonl", YahooBarFeed(tickers)))
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        for bar in bars:
+            record = bar._asdict()
+            record["date"] = bar.date.isoformat()
+            record["ts"] = time.time()
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            yield bar
+
+
+class YahooBarFeed(BarFeed):
+    """
+    yfinance 당일 일봉을 interval초마다 폴링한다. 형성 중인 봉이 바뀐 종목만
+    내보내므로 StreamingScorer에는 '당일 봉 갱신'으로 들어간다.
+    """
+
+    def __init__(
+        self, tickers: list[str], interval: float = 60.0, passes: int | None = None
+    ):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.interval = interval
+        self.passes = passes  # None = 무한 반복
+
+    def __iter__(self) -> Iterator[Bar]:
+        from services.history_store import download_history
+
+        last_seen: dict[str, Bar] = {}
+        rounds = itertools.count() if self.passes is None else range(self.passes)
+        for _ in rounds:
+            started = time.monotonic()
+            try:
+                # 주말/장 시작 전에도 마지막 봉이 잡히도록 며칠 앞에서부터 받는다
+                frames = download_history(
+                    self.tickers, date.today() - timedelta(days=POLL_LOOKBACK_DAYS)
+                )
+            except Exception as e:
+                logger.warning(f"Intraday bar poll failed: {e}")
+                frames = {}
+            for ticker, df in frames.items():
+                bar = _bar(ticker, df.index[-1], df.iloc[-1])
+                if last_seen.get(ticker) != bar:
+                    last_seen[ticker] = bar
+                    yield bar
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
@@ -1,7 +1,11 @@
+import logging
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import briefing, themes, market, insight, watchlist, calendar, system
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="Taraga API",
     description="Wall Street to Yeouido - US to Korean Market Analysis",
@@ -27,6 +31,69 @@ app.include_router(calendar.router, prefix="/api/v1/calendar", tags=["Calendar"]
 app.include_router(system.router, prefix="/api/v1/system", tags=["System"])
 
 
+@app.on_event("startup")
+def init_database():
+    """
+    Create missing tables and apply database.upgrade_db()'s column changes
+    before any worker or request touches them. A database that is down at
+    startup is logged, not fatal: endpoints fall back to live data.
+    """
+    from database import init_db
+
+    try:
+        init_db()
+    except Exception as e:
+        logger.error(f"Database initialization failed: {e}")
+
+
+@app.on_event("startup")
+def start_background_workers():
+    """
+    Start in-process workers: the cache warmer when CACHE_WARMER=true, the
+    analytics jobs (price panel, Smart Scores, anomaly screen) when
+    ANALYTICS_JOBS=true, and the table janitor (DB cache backend only)
+    unless CACHE_JANITOR=false.
+    """
+    if os.getenv("CACHE_WARMER", "false").lower() == "true":
+        from services.cache_warmer import CacheWarmer
+
+        app.state.cache_warmer = CacheWarmer()
+        app.state.cache_warmer.start()
+
+    if os.getenv("ANALYTICS_JOBS", "false").lower() == "true":
+        from services.analytics_jobs import AnalyticsJobs
+
+        app.state.analytics_jobs = AnalyticsJobs()
+        app.state.analytics_jobs.start()
+
+    from services.service_factory import ServiceFactory
+
+    if (
+        os.getenv("CACHE_JANITOR", "true").lower() == "true"
+        and ServiceFactory.get_cache_backend_name() == "db"
+    ):
+        from services.cache_janitor import CacheJanitor
+
+        app.state.cache_janitor = CacheJanitor()
+        app.state.cache_janitor.start()
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    for name in ("cache_warmer", "analytics_jobs", "cache_janitor"):
+        worker = getattr(app.state, name, None)
+        if worker:
+            worker.stop()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """Close the async market data service's pooled connections."""
+    from services.http_client import close_async_http_client
+
+    await close_async_http_client()
+
+
 @app.get("/")
 def root():
     """Root endpoint"""
@@ -8,6 +8,10 @@ from sqlalchemy import (
     JSON,
     Boolean,
     DateTime,
+    LargeBinary,
+    Float,
+    BigInteger,
+    Index,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
@@ -85,11 +89,18 @@ class MarketDataCache(Base):
 
     __tablename__ = "market_data_cache"
 
-    key = Column(String(50), primary_key=True)  # e.g. "US_INDICES", "US_TOP_GAINERS"
-    data = Column(JSON, nullable=False)
+    key = Column(String(255), primary_key=True)  # e.g. "market:indices", "stock:detail:AAPL"
+    # Legacy plain-JSON value (rows written before the codec, or CACHE_CODEC=none)
+    data = Column(JSON, nullable=True)
+    # Codec-encoded value (services/cache_codec.py); preferred when present
+    payload = Column(LargeBinary, nullable=True)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+    # Bookkeeping for services/cache_janitor.py
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    last_accessed_at = Column(DateTime(timezone=True), nullable=True)
+    size_bytes = Column(Integer, nullable=True)
 
 
 class RecommendedTheme(Base):
@@ -161,3 +172,115 @@ class ValueChain(Base):
     theme = relationship("Theme")
     us_stock = relationship("StockUS")
     kr_stock = relationship("StockKR")
+
+
+class PriceHistory(Base):
+    """Daily OHLCV bars (split/dividend adjusted) shared by all yfinance consumers"""
+
+    __tablename__ = "price_history"
+
+    ticker = Column(String(20), primary_key=True)  # yfinance symbol, e.g. "AAPL", "005930.KS"
+    date = Column(Date, primary_key=True)
+    open = Column(Float, nullable=True)
+    high = Column(Float, nullable=True)
+    low = Column(Float, nullable=True)
+    close = Column(Float, nullable=True)
+    volume = Column(BigInteger, nullable=True)
+
+
+class PriceHistorySync(Base):
+    """Per-ticker coverage of price_history (what's been backfilled and when)"""
+
+    __tablename__ = "price_history_sync"
+
+    ticker = Column(String(20), primary_key=True)
+    first_date = Column(Date, nullable=False)  # earliest date requested/backfilled
+    last_date = Column(Date, nullable=True)  # latest bar stored
+    synced_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class SmartScore(Base):
+    """Daily Smart Score per ticker (logic/smart_score.py), one row per bar date"""
+
+    __tablename__ = "smart_scores"
+
+    date = Column(Date, primary_key=True)  # date of the latest bar scored
+    ticker = Column(String(20), primary_key=True)  # yfinance symbol
+    market = Column(String(5), nullable=False)  # "KR" / "US"
+    name = Column(String(200), nullable=True)
+
+    score = Column(Float, nullable=False)  # incl. anomaly bonus
+    inst_score = Column(Float, nullable=False)
+    momentum_score = Column(Float, nullable=False)
+    volume_score = Column(Float, nullable=False)
+    is_anomaly = Column(Boolean, nullable=False, default=False)
+    anomaly_reason = Column(Text, nullable=True)
+
+    price = Column(Float, nullable=True)
+    change_percent = Column(Float, nullable=True)
+    vwap = Column(Float, nullable=True)
+    ma5 = Column(Float, nullable=True)
+    volume_ratio = Column(Float, nullable=True)
+    # Sparkline data: {"price": [...], "volume": [...], "dates": [...]}
+    history = Column(JSON, nullable=True)
+
+    # Latest bar as scored; a re-run skips the ticker unless this bar changed
+    bar_close = Column(Float, nullable=True)
+    bar_volume = Column(BigInteger, nullable=True)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Top-N per market and day
+        Index("ix_smart_scores_market_date_score", "market", "date", "score"),
+        # Per-ticker history
+        Index("ix_smart_scores_ticker_date", "ticker", "date"),
+        # Anomaly-only queries (partial index where supported)
+        Index(
+            "ix_smart_scores_anomalies",
+            "market",
+            "date",
+            postgresql_where=is_anomaly.is_(True),
+            sqlite_where=is_anomaly.is_(True),
+        ),
+    )
+
+
+class AnomalySignal(Base):
+    """Daily anomaly screener hits across the stored universe"""
+
+    __tablename__ = "anomaly_signals"
+
+    date = Column(Date, primary_key=True)  # bar date screened
+    ticker = Column(String(20), primary_key=True)
+    market = Column(String(5), nullable=False)  # "KR" / "US"
+    pattern = Column(String(30), nullable=False)  # "neglected_rebound" / "volume_surge"
+
+    surge_ratio = Column(Float, nullable=False)  # late 3-bar / early 7-bar avg volume
+    early_volume = Column(Float, nullable=True)
+    late_volume = Column(Float, nullable=True)
+    avg_volume_20 = Column(Float, nullable=True)
+    bullish_count = Column(Integer, nullable=False)  # bullish bars among the last 3
+    close = Column(Float, nullable=True)
+    change_percent = Column(Float, nullable=True)
+    reason = Column(Text, nullable=True)
+    detected_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Paginated listing per day, strongest surge first
+        Index("ix_anomaly_signals_date_surge", "date", "surge_ratio"),
+        Index("ix_anomaly_signals_ticker_date", "ticker", "date"),
+    )
+
+
+class IndexConstituent(Base):
+    """Index membership (S&P 500, NASDAQ-100) behind the market mover universe"""
+
+    __tablename__ = "index_constituents"
+
+    index_name = Column(String(20), primary_key=True)  # "SP500" / "NDX"
+    ticker = Column(String(20), primary_key=True)  # yfinance symbol (BRK-B)
+    name = Column(String(200), nullable=True)
+    sector = Column(String(100), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("ix_index_constituents_ticker", "ticker"),)
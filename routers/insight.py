@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date as date_type
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from database import get_db
 from models import User
 from services.stock_service import StockService
 from logic.correlation_engine import CorrelationEngine
+from services import anomaly_screener, smart_score_store
 
 router = APIRouter()
 
@@ -99,3 +103,84 @@ def get_news_bridge(db: Session = Depends(get_db)):
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/smart-scores")
+def get_smart_scores(
+    market: str = "KR",
+    limit: int = Query(20, ge=1, le=500),
+    date: Optional[date_type] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Top-N stored Smart Scores for a market (latest scored day by default).
+    """
+    day, rows = smart_score_store.top_scores(db, market.upper(), limit, date)
+    return {
+        "status": "success",
+        "date": day.isoformat() if day else None,
+        "data": [smart_score_store.to_dict(row) for row in rows],
+    }
+
+
+@router.get("/smart-scores/anomalies")
+def get_smart_score_anomalies(
+    market: str = "KR",
+    limit: int = Query(20, ge=1, le=500),
+    date: Optional[date_type] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Anomaly-flagged tickers (neglected stocks with a volume surge) for a day.
+    """
+    day, rows = smart_score_store.anomalies(db, market.upper(), limit, date)
+    return {
+        "status": "success",
+        "date": day.isoformat() if day else None,
+        "data": [smart_score_store.to_dict(row) for row in rows],
+    }
+
+
+@router.get("/smart-scores/{ticker}/history")
+def get_smart_score_history(
+    ticker: str,
+    days: int = Query(60, ge=1, le=730),
+    db: Session = Depends(get_db),
+):
+    """
+    A ticker's daily Smart Scores over the last `days` calendar days.
+    """
+    rows = smart_score_store.ticker_history(db, ticker.upper(), days)
+    if not rows:
+        raise HTTPException(status_code=404, detail="No smart scores for ticker")
+    return {
+        "status": "success",
+        "ticker": ticker.upper(),
+        "data": [smart_score_store.to_dict(row) for row in rows],
+    }
+
+
+@router.get("/anomalies")
+def get_anomalies(
+    date: Optional[date_type] = None,
+    market: Optional[str] = None,
+    pattern: Optional[str] = Query(None, pattern="^(neglected_rebound|volume_surge)$"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    """
+    Universe-wide anomaly screener hits for a day (latest screen by default),
+    strongest volume surge first.
+    """
+    day, total, rows = anomaly_screener.list_signals(
+        db, date, market.upper() if market else None, pattern, page, page_size
+    )
+    return {
+        "status": "success",
+        "date": day.isoformat() if day else None,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "data": [anomaly_screener.to_dict(row) for row in rows],
+    }
@@ -1,19 +1,28 @@
 """
 Market Router — US market data endpoints with server-side caching.
-All responses are cached in MarketDataCache to prevent rate limits
-and share data across all users.
+All responses are cached through CacheService (one namespaced key per item,
+see services/cache_keys.py) to prevent rate limits and share data across
+all users.
+
+Endpoints are async: market data comes from the async market data service
+(services/async_market_service.py) through AsyncCacheService, and blocking
+work (DB queries, scrapers) runs on worker threads, so slow upstreams don't
+tie up the threadpool.
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from database import get_db
 from models import StockKR
+from services import cache_keys
+from services.async_cache import AsyncCacheService
 from services.cache_service import (
-    CacheService,
-    TTL_MARKET_INDICES,
-    TTL_GAINERS_LOSERS,
     TTL_SCRAPER,
+    STALE_TTL_MARKET,
 )
+from services.ttl_policy import ttl_policy
 from services.service_factory import ServiceFactory
 from logic.correlation_engine import CorrelationEngine
 
@@ -21,79 +30,84 @@ router = APIRouter()
 
 
 @router.get("/us/snapshot")
-def get_us_market_snapshot(db: Session = Depends(get_db)):
+async def get_us_market_snapshot():
     """
-    Get snapshot of US major indices (cached, 15 min TTL).
+    Get snapshot of US major indices (cached, session-aware TTL).
     First request fetches from Yahoo Finance, subsequent requests use cache.
+    Expired entries are served immediately while a background refresh runs.
     """
     try:
-        cache = CacheService(db)
-        market_service = ServiceFactory.get_market_data_service(db)
-
-        indices = cache.get_or_fetch(
-            "US_INDICES_V2",
-            lambda: market_service.get_market_indices(),
-            ttl_minutes=TTL_MARKET_INDICES,
+        cache = AsyncCacheService()
+        market_service = ServiceFactory.get_async_market_data_service()
+
+        result = await cache.lookup(
+            cache_keys.MARKET_INDICES,
+            market_service.get_market_indices,
+            ttl_minutes=ttl_policy.ttl_for("indices"),
+            stale_ttl_minutes=STALE_TTL_MARKET,
         )
 
-        if not indices:
+        if not result.data:
             return {
                 "status": "error",
                 "message": "시장 데이터를 가져올 수 없습니다.",
                 "data": {},
+                "source": result.source,
             }
 
-        return {"status": "success", "data": indices}
+        return {"status": "success", "data": result.data, "source": result.source}
     except Exception as e:
         return {"status": "error", "message": str(e), "data": {}}
 
 
 @router.get("/us/top-gainers")
-def get_us_top_gainers(limit: int = 10, db: Session = Depends(get_db)):
-    """Get top gaining stocks (cached, 30 min TTL)."""
+async def get_us_top_gainers(limit: int = 10):
+    """Get top gaining stocks (cached, session-aware TTL)."""
     try:
-        cache = CacheService(db)
-        market_service = ServiceFactory.get_market_data_service(db)
-
-        all_gainers = cache.get_or_fetch(
-            "US_TOP_GAINERS",
-            lambda: (
-                market_service.get_top_gainers()
-                if hasattr(market_service, "get_top_gainers")
-                else []
-            ),
-            ttl_minutes=TTL_GAINERS_LOSERS,
+        cache = AsyncCacheService()
+        market_service = ServiceFactory.get_async_market_data_service()
+
+        result = await cache.lookup(
+            cache_keys.MARKET_GAINERS,
+            market_service.get_top_gainers,
+            ttl_minutes=ttl_policy.ttl_for("movers"),
+            stale_ttl_minutes=STALE_TTL_MARKET,
         )
 
-        return {"status": "success", "data": (all_gainers or [])[:limit]}
+        return {
+            "status": "success",
+            "data": (result.data or [])[:limit],
+            "source": result.source,
+        }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 @router.get("/us/top-losers")
-def get_us_top_losers(limit: int = 10, db: Session = Depends(get_db)):
-    """Get top losing stocks (cached, 30 min TTL)."""
+async def get_us_top_losers(limit: int = 10):
+    """Get top losing stocks (cached, session-aware TTL)."""
     try:
-        cache = CacheService(db)
-        market_service = ServiceFactory.get_market_data_service(db)
-
-        all_losers = cache.get_or_fetch(
-            "US_TOP_LOSERS",
-            lambda: (
-                market_service.get_top_losers()
-                if hasattr(market_service, "get_top_losers")
-                else []
-            ),
-            ttl_minutes=TTL_GAINERS_LOSERS,
+        cache = AsyncCacheService()
+        market_service = ServiceFactory.get_async_market_data_service()
+
+        result = await cache.lookup(
+            cache_keys.MARKET_LOSERS,
+            market_service.get_top_losers,
+            ttl_minutes=ttl_policy.ttl_for("movers"),
+            stale_ttl_minutes=STALE_TTL_MARKET,
         )
 
-        return {"status": "success", "data": (all_losers or [])[:limit]}
+        return {
+            "status": "success",
+            "data": (result.data or [])[:limit],
+            "source": result.source,
+        }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 @router.get("/service-status")
-def get_service_status():
+async def get_service_status():
     """Get current API service configuration (free vs premium)"""
     try:
         status = ServiceFactory.get_service_status()
@@ -103,65 +117,68 @@ def get_service_status():
 
 
 @router.get("/watchlist/{symbol}/us-impact")
-def get_watchlist_us_impact(symbol: str):
+async def get_watchlist_us_impact(symbol: str):
     """Estimate potential US market impact for a given Korean symbol."""
     try:
         engine = CorrelationEngine()
-        result = engine.get_us_impact_for_kr_symbol(symbol)
+        result = await asyncio.to_thread(engine.get_us_impact_for_kr_symbol, symbol)
         return {"status": "success", "data": result}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 @router.get("/us/trends/retail")
-def get_retail_flow(region: str = "US", db: Session = Depends(get_db)):
+async def get_retail_flow(region: str = "US", db: Session = Depends(get_db)):
     """Get Top Retail Picks (cached, 4 hour TTL). Supports region: US, KR, Coin."""
     try:
-        cache = CacheService(db)
+        cache = AsyncCacheService()
 
         from services.scraper_service import ScraperService
 
         service = ScraperService(db)
 
-        # Cache key must include region now
-        cache_key_suffix = f"RETAIL_PICKS_{region}"
-
-        data = cache.get_or_fetch(
-            cache_key_suffix,
-            lambda: service.get_retail_picks(region=region),
+        result = await cache.lookup(
+            cache_keys.retail_picks(region),
+            lambda: asyncio.to_thread(service.get_retail_picks, region=region),
             ttl_minutes=TTL_SCRAPER,
         )
 
-        return {"status": "success", "data": data or []}
+        return {
+            "status": "success",
+            "data": result.data or [],
+            "source": result.source,
+        }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 @router.get("/us/trends/institutional")
-def get_institutional_flow(region: str = "US", db: Session = Depends(get_db)):
+async def get_institutional_flow(region: str = "US", db: Session = Depends(get_db)):
     """Get Top Institutional Picks (cached, 4 hour TTL). Supports region: US, KR, Coin."""
     try:
-        cache = CacheService(db)
+        cache = AsyncCacheService()
 
         from services.scraper_service import ScraperService
 
         service = ScraperService(db)
 
-        cache_key_suffix = f"INSTITUTIONAL_PICKS_{region}"
-
-        data = cache.get_or_fetch(
-            cache_key_suffix,
-            lambda: service.get_institutional_picks(region=region),
+        result = await cache.lookup(
+            cache_keys.institutional_picks(region),
+            lambda: asyncio.to_thread(service.get_institutional_picks, region=region),
             ttl_minutes=TTL_SCRAPER,
         )
 
-        return {"status": "success", "data": data or []}
+        return {
+            "status": "success",
+            "data": result.data or [],
+            "source": result.source,
+        }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 @router.get("/search")
-def search_stocks(query: str, db: Session = Depends(get_db)):
+async def search_stocks(query: str, db: Session = Depends(get_db)):
     """
     Search KR stocks by name or ticker.
     Case-insensitive partial match. (No caching — queries are dynamic)
@@ -169,6 +186,10 @@ def search_stocks(query: str, db: Session = Depends(get_db)):
     if not query or len(query) < 1:
         return []
 
+    return await asyncio.to_thread(_search_kr_stocks, db, query)
+
+
+def _search_kr_stocks(db: Session, query: str) -> list:
     results = (
         db.query(StockKR)
         .filter(
@@ -185,34 +206,28 @@ def search_stocks(query: str, db: Session = Depends(get_db)):
 
 
 @router.get("/stock/{ticker}")
-def get_stock_detail(ticker: str, db: Session = Depends(get_db)):
+async def get_stock_detail(ticker: str):
     """
     Get detailed stock info + 30 days history.
     """
     try:
-        cache = CacheService(db)
-        market_service = ServiceFactory.get_market_data_service(db)
-
-        # Cache key specific to ticker
-        cache_key = f"STOCK_DETAIL_{ticker}"
-
-        def fetch_detail():
-            info = market_service.get_stock_data(ticker)
-            if not info:
-                return None
-            history = market_service.get_historical_data(ticker, days=30)
-            info["history"] = history
-            return info
-
-        data = cache.get_or_fetch(
-            cache_key,
-            fetch_detail,
-            ttl_minutes=15,  # 15 min cache for details
+        cache = AsyncCacheService()
+        market_service = ServiceFactory.get_async_market_data_service()
+
+        result = await cache.lookup(
+            cache_keys.stock_detail(ticker),
+            lambda: market_service.get_stock_detail(ticker),
+            ttl_minutes=ttl_policy.ttl_for("stock_detail", ticker=ticker),
         )
 
-        if not data:
-            return {"status": "error", "message": "Stock not found"}
+        if not result.data:
+            # Unknown tickers are negatively cached, so repeats don't hit Yahoo
+            return {
+                "status": "error",
+                "message": "Stock not found",
+                "source": result.source,
+            }
 
-        return {"status": "success", "data": data}
+        return {"status": "success", "data": result.data, "source": result.source}
     except Exception as e:
         return {"status": "error", "message": str(e)}
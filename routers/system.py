@@ -1,5 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from database import get_db
 from services.system_service import SystemService
+from services.cache_service import CacheService
+from services import upstream
 
 router = APIRouter()
 system_service = SystemService()
@@ -16,3 +20,47 @@ def get_app_mode():
         return {"status": "success", "data": mode_data}
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+
+@router.get("/cache-stats")
+def get_cache_stats():
+    """
+    Cache hit/miss counters per tier (L1 = in-process LRU, L2 = shared backend)
+    and per key namespace (hits, stale, misses, fetches, latency) for this worker.
+    """
+    try:
+        return {"status": "success", "data": CacheService.get_stats()}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@router.get("/upstream-stats")
+def get_upstream_stats():
+    """
+    Outbound calls per upstream host (calls, failures, 429s, retries, token
+    waits, latency) and circuit breaker state for this worker.
+    """
+    try:
+        return {"status": "success", "data": upstream.get_stats()}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@router.get("/cache-table")
+def get_cache_table_stats(db: Session = Depends(get_db)):
+    """
+    Size of the market_data_cache table and the janitor's eviction counters
+    (expired / LRU evictions, last pass) for this worker.
+    """
+    try:
+        from services.cache_janitor import CacheJanitor
+
+        return {
+            "status": "success",
+            "data": {
+                "table": CacheJanitor.table_stats(db),
+                "janitor": CacheJanitor.get_stats(),
+            },
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,40 @@
+"""
+Screen every ticker in the shared price panel for anomaly patterns and store
+the hits in anomaly_signals (services/anomaly_screener.py):
+
+    python screen_anomalies.py                     # latest panel date
+    python screen_anomalies.py --date 2024-03-15   # a past date in the panel
+    python screen_anomalies.py --refresh           # refresh the panel first
+"""
+
+import logging
+import sys
+import time
+from datetime import date
+
+from services.anomaly_screener import AnomalyScreener
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if "--refresh" in sys.argv:
+        from services.price_panel import PricePanelBuilder
+
+        PricePanelBuilder().refresh()
+
+    day = None
+    if "--date" in sys.argv:
+        day = date.fromisoformat(sys.argv[sys.argv.index("--date") + 1])
+
+    started = time.monotonic()
+    summary = AnomalyScreener().run(day)
+    if summary["date"] is None:
+        print("❌ No price panel — run build_price_panel.py first")
+        return
+    print(f"✅ Anomaly screen {summary['date']}: {summary['screened']} screened, "
+          f"{summary['candidates']} candidates, {summary['anomalies']} anomalies "
+          f"({time.monotonic() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
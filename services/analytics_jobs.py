@@ -0,0 +1,129 @@
+"""
+Analytics Jobs - Scheduled batch work over the shared price data.
+
+Each job runs on its own cadence:
+  - panel:     append new history-store dates to the price panel
+               (services/price_panel.py), every PANEL_REFRESH_SECONDS
+  - scores:    incremental smart_scores update per market
+               (services/smart_score_store.py), every SCORE_REFRESH_SECONDS
+  - anomalies: universe-wide anomaly screen (services/anomaly_screener.py),
+               every ANOMALY_SCREEN_SECONDS
+
+These used to piggyback on the cache warmer's pass loop, so a slow scoring
+run delayed cache refreshes and CACHE_WARMER=false also stopped scoring.
+They now have their own thread: ANALYTICS_JOBS=true starts it with the API.
+The standalone scripts (build_price_panel.py, update_smart_scores.py,
+screen_anomalies.py) remain for cron-style scheduling.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PANEL_REFRESH_SECONDS = int(os.getenv("PANEL_REFRESH_SECONDS", "600"))
+SCORE_REFRESH_SECONDS = int(os.getenv("SCORE_REFRESH_SECONDS", "1800"))
+ANOMALY_SCREEN_SECONDS = int(os.getenv("ANOMALY_SCREEN_SECONDS", "1800"))
+
+# How often the scheduler checks which jobs are due
+TICK_SECONDS = 30
+
+
+class AnalyticsJobs:
+    """Background scheduler for the price panel, Smart Score and anomaly jobs."""
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from database import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        # job name -> (interval seconds, runner)
+        self.jobs: Dict[str, tuple] = {
+            "panel": (PANEL_REFRESH_SECONDS, self.refresh_panel),
+            "scores": (SCORE_REFRESH_SECONDS, self.refresh_scores),
+            "anomalies": (ANOMALY_SCREEN_SECONDS, self.screen_anomalies),
+        }
+        self._last_run: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_due(self) -> dict:
+        """
+        Run every job whose interval has elapsed (all of them on the first call).
+
+        Returns:
+            {job name: result} for the jobs that ran
+        """
+        results = {}
+        for name, (interval, runner) in self.jobs.items():
+            last = self._last_run.get(name)
+            if last is not None and time.monotonic() - last < interval:
+                continue
+            if self._stop.is_set():
+                break
+            self._last_run[name] = time.monotonic()
+            results[name] = self._run(name, runner)
+        return results
+
+    def start(self) -> threading.Thread:
+        """Run due jobs on a daemon thread until stop() is called."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever, name="analytics-jobs", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self):
+        logger.info("Analytics jobs started")
+        while not self._stop.is_set():
+            self.run_due()
+            self._stop.wait(TICK_SECONDS)
+        logger.info("Analytics jobs stopped")
+
+    @staticmethod
+    def _run(name: str, runner: Callable[[], object]):
+        started = time.monotonic()
+        try:
+            result = runner()
+        except Exception as e:
+            logger.error(f"Analytics job '{name}' failed: {e}")
+            return None
+        logger.info(f"Analytics job '{name}' done in {time.monotonic() - started:.1f}s")
+        return result
+
+    def refresh_panel(self) -> Optional[str]:
+        """Append new history-store dates to the shared price panel."""
+        from services.price_panel import PricePanelBuilder
+
+        return PricePanelBuilder(self.session_factory).refresh()
+
+    def refresh_scores(self) -> dict:
+        """Re-score default-universe tickers whose latest bar changed."""
+        from logic.smart_score import DEFAULT_UNIVERSE
+        from services.smart_score_store import SmartScoreStore
+
+        store = SmartScoreStore(self.session_factory)
+        results = {}
+        for market in DEFAULT_UNIVERSE:
+            try:
+                results[market] = store.update(market)
+            except Exception as e:
+                logger.error(f"Smart score update failed ({market}): {e}")
+                results[market] = None
+        return results
+
+    def screen_anomalies(self) -> Optional[dict]:
+        """Screen the whole price panel for anomalies."""
+        from services.anomaly_screener import AnomalyScreener
+
+        return AnomalyScreener(self.session_factory).run()
@@ -0,0 +1,252 @@
+"""
+Anomaly Screener - Universe-wide "neglected-stock rebound" / "volume surge" scan.
+
+logic/smart_score._detect_anomaly() only sees the tickers a scan is given.
+The screener checks every ticker in the shared price panel
+(services/price_panel.py) for one bar date, the same rules applied to each
+ticker's own last 20 bars:
+  1. Rolling volume statistics for the whole universe in one vectorized pass
+     over the memory-mapped volume field: 20-bar average, early 7-bar and
+     late 3-bar averages of the last 10 bars
+  2. Pre-filter: only tickers whose late average is ANOMALY_SURGE x the early
+     one go on; for those, read open/close for the bullish-bar check
+     (>= 2 of the last 3) and classify neglected (early < 50% of the 20-bar
+     average) vs plain surge
+Hits replace that date's rows in anomaly_signals and are served by the
+paginated /api/v1/insight/anomalies endpoint.
+
+Runs from the analytics jobs (services/analytics_jobs.py,
+ANOMALY_SCREEN_SECONDS) or standalone via `python screen_anomalies.py`.
+"""
+
+import logging
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from logic.smart_score_factors import nanmean_columns
+from models import AnomalySignal
+
+logger = logging.getLogger(__name__)
+
+# Late/early volume multiple that counts as a surge (as in _detect_anomaly)
+ANOMALY_SURGE = 3.0
+
+# Early-window volume below this share of the 20-bar average = "neglected"
+NEGLECT_RATIO = 0.5
+
+# Panel rows read per screen; enough to find 20 bars per ticker across the
+# union calendar (other markets' sessions are NaN rows for a ticker)
+LOOKBACK_ROWS = 40
+
+PATTERN_NEGLECTED = "neglected_rebound"
+PATTERN_SURGE = "volume_surge"
+
+
+def market_of(ticker: str) -> str:
+    return "KR" if ticker.endswith((".KS", ".KQ")) else "US"
+
+
+class AnomalyScreener:
+    """Screens the shared price panel and stores hits in anomaly_signals."""
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from database import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    def run(self, day: Optional[date] = None, panel=None) -> dict:
+        """
+        Screen one bar date (default: the panel's latest) and store the hits.
+
+        Returns:
+            Summary dict: date, screened, candidates, anomalies
+            (date None if there is no price panel)
+        """
+        if panel is None:
+            from services.price_panel import get_price_panel
+
+            panel = get_price_panel()
+        if panel is None or not panel.n_dates:
+            logger.warning("Anomaly screen skipped: no price panel")
+            return {"date": None, "screened": 0, "candidates": 0, "anomalies": 0}
+
+        end = panel.n_dates
+        if day is not None:
+            end = int(np.searchsorted(panel.dates, np.datetime64(day, "D"), "right"))
+        if end == 0:
+            return {"date": None, "screened": 0, "candidates": 0, "anomalies": 0}
+        screen_date = panel.dates[end - 1].astype(object)
+
+        rows, summary = screen_panel(panel, end)
+        summary["date"] = screen_date.isoformat()
+
+        db = self.session_factory()
+        try:
+            self._store(db, screen_date, rows)
+        finally:
+            db.close()
+
+        logger.info(
+            f"Anomaly screen {screen_date}: {summary['screened']} screened, "
+            f"{summary['candidates']} candidates, {summary['anomalies']} anomalies"
+        )
+        return summary
+
+    def _store(self, db: Session, day: date, rows: List[dict]):
+        now = datetime.now(timezone.utc)
+        try:
+            db.query(AnomalySignal).filter(AnomalySignal.date == day).delete()
+            if rows:
+                db.execute(
+                    insert(AnomalySignal),
+                    [{**row, "date": day, "detected_at": now} for row in rows],
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+
+def screen_panel(panel, end: int) -> tuple:
+    """
+    Anomaly rows for the bar date at panel row end - 1.
+
+    Only tickers with a bar on that date and at least 10 bars are screened.
+
+    Returns:
+        (rows for anomaly_signals without date, summary dict)
+    """
+    start = max(0, end - LOOKBACK_ROWS)
+    close_rows = panel.field_rows("Close", start, end).astype(np.float64)
+    valid = ~np.isnan(close_rows)
+    volume = np.where(valid, panel.field_rows("Volume", start, end), np.nan)
+
+    # 1. Rolling volume statistics over each ticker's last 20 bars
+    last20, lengths = _right_align(volume, valid, 20)
+    avg_20 = nanmean_columns(last20)
+    early = nanmean_columns(last20[10:17])
+    late = nanmean_columns(last20[17:])
+    screened = valid[-1] & (lengths >= 10)
+
+    # 2. Pre-filter on volume alone, then check candles for the few left
+    with np.errstate(invalid="ignore"):
+        surging = (early > 0) & (late > early * ANOMALY_SURGE)
+    candidates = np.flatnonzero(screened & surging)
+
+    summary = {
+        "screened": int(screened.sum()),
+        "candidates": len(candidates),
+        "anomalies": 0,
+    }
+    if not len(candidates):
+        return [], summary
+
+    sub_valid = valid[:, candidates]
+    opens = panel.field_rows("Open", start, end)[:, candidates].astype(np.float64)
+    closes, _ = _right_align(close_rows[:, candidates], sub_valid, 3)
+    opens, _ = _right_align(opens, sub_valid, 3)
+    bullish = (closes > opens).sum(axis=0)
+
+    rows = []
+    for i, col in enumerate(candidates):
+        if bullish[i] < 2:
+            continue
+        ticker = panel.tickers[col]
+        surge_ratio = float(late[col] / early[col])
+        neglected = avg_20[col] > 0 and early[col] < avg_20[col] * NEGLECT_RATIO
+        if neglected:
+            reason = (
+                f"소외주 반등 감지: 거래량 {surge_ratio:.1f}배 급증, 양봉 {bullish[i]}개"
+            )
+        else:
+            reason = f"거래량 이상 급증: {surge_ratio:.1f}배, 양봉 {bullish[i]}개"
+
+        cur, prev = float(closes[-1, i]), float(closes[-2, i])
+        change = round((cur - prev) / prev * 100, 2) if prev > 0 else None
+        rows.append(
+            {
+                "ticker": ticker,
+                "market": market_of(ticker),
+                "pattern": PATTERN_NEGLECTED if neglected else PATTERN_SURGE,
+                "surge_ratio": round(surge_ratio, 3),
+                "early_volume": float(early[col]),
+                "late_volume": float(late[col]),
+                "avg_volume_20": float(avg_20[col]),
+                "bullish_count": int(bullish[i]),
+                "close": round(cur, 4),
+                "change_percent": change,
+                "reason": reason,
+            }
+        )
+    summary["anomalies"] = len(rows)
+    return rows, summary
+
+
+def _right_align(values: np.ndarray, valid: np.ndarray, width: int):
+    """
+    Each column's last `width` valid entries, right-aligned (NaN-padded on
+    top), plus how many each column has.
+    """
+    remaining = np.cumsum(valid[::-1], axis=0)[::-1]
+    keep = valid & (remaining <= width)
+    src_rows, src_cols = np.nonzero(keep)
+    out = np.full((width, values.shape[1]), np.nan)
+    out[width - remaining[src_rows, src_cols], src_cols] = values[src_rows, src_cols]
+    return out, np.minimum(valid.sum(axis=0), width)
+
+
+def latest_screen_date(db: Session) -> Optional[date]:
+    return db.query(func.max(AnomalySignal.date)).scalar()
+
+
+def list_signals(
+    db: Session,
+    day: Optional[date] = None,
+    market: Optional[str] = None,
+    pattern: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 50,
+) -> tuple:
+    """
+    (day, total, rows) for one screen date (latest by default), strongest
+    surge first.
+    """
+    day = day or latest_screen_date(db)
+    if day is None:
+        return None, 0, []
+    query = db.query(AnomalySignal).filter(AnomalySignal.date == day)
+    if market:
+        query = query.filter(AnomalySignal.market == market)
+    if pattern:
+        query = query.filter(AnomalySignal.pattern == pattern)
+    total = query.count()
+    rows = (
+        query.order_by(AnomalySignal.surge_ratio.desc(), AnomalySignal.ticker)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+    return day, total, rows
+
+
+def to_dict(row: AnomalySignal) -> dict:
+    return {
+        "date": row.date.isoformat(),
+        "ticker": row.ticker,
+        "market": row.market,
+        "pattern": row.pattern,
+        "surge_ratio": row.surge_ratio,
+        "early_volume": row.early_volume,
+        "late_volume": row.late_volume,
+        "avg_volume_20": row.avg_volume_20,
+        "bullish_count": row.bullish_count,
+        "close": row.close,
+        "change_percent": row.change_percent,
+        "reason": row.reason,
+    }
@@ -0,0 +1,282 @@
+"""
+Async Cache - CacheService for coroutines.
+
+Same tiers, keys and semantics as CacheService.lookup() (L1, shared backend,
+single-flight, stale-while-revalidate, failure backoff, stats), but driven
+from the event loop:
+  - Cache reads/writes and the cross-worker backend lock run on worker
+    threads (asyncio.to_thread), since the backends are synchronous
+  - Fetchers are coroutine functions awaited on the loop itself, so a slow
+    upstream holds no thread
+  - Concurrent misses for a key on the same loop share one fetch (an
+    asyncio.Future); stale-while-revalidate refreshes run as tasks on the
+    loop, one per key
+
+Each lookup uses its own DB session, only ever touched by one thread at a
+time and returned to the pool after every step, so lookups can be awaited
+together with asyncio.gather.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from services.cache_service import (
+    DEFAULT_RETENTION_MINUTES,
+    FETCH_WAIT_SECONDS,
+    SOURCE_FRESH,
+    SOURCE_NEGATIVE,
+    SOURCE_STALE,
+    CacheResult,
+    CacheService,
+    _record_ns,
+)
+
+logger = logging.getLogger(__name__)
+
+# Per event loop: in-flight fetches {key: Future} and SWR refreshes {key: Task}
+_inflight: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_refreshing: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _for_loop(registry: weakref.WeakKeyDictionary) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    entries = registry.get(loop)
+    if entries is None:
+        entries = registry[loop] = {}
+    return entries
+
+
+async def _io(cache: CacheService, method: Callable[..., Any], *args) -> Any:
+    """
+    Run one CacheService step on a worker thread, then hand the session's
+    connection back to the pool, so none is held while coroutines await
+    (followers of a fetch, the fetcher itself).
+    """
+
+    def run():
+        try:
+            return method(*args)
+        finally:
+            if cache.db is not None:
+                cache.db.close()
+
+    return await asyncio.to_thread(run)
+
+
+async def _acquire(lock) -> Any:
+    """
+    Enter a backend lock on a worker thread. If we are cancelled while the
+    thread is still waiting, the lock is released as soon as it is taken,
+    so a cancelled request never leaves it (or its connection) held.
+    """
+    entering = asyncio.ensure_future(asyncio.to_thread(lock.__enter__))
+    try:
+        return await asyncio.shield(entering)
+    except asyncio.CancelledError:
+        entering.add_done_callback(lambda _: _release_entered(entering, lock))
+        raise
+
+
+def _release_entered(entering: "asyncio.Future", lock):
+    if entering.cancelled() or entering.exception() is not None:
+        return
+    asyncio.get_running_loop().run_in_executor(None, lock.__exit__, None, None, None)
+
+
+class AsyncCacheService:
+    """Awaitable CacheService.lookup() / get_or_fetch() with async fetchers."""
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from database import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    async def lookup(
+        self,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl_minutes: int = 15,
+        stale_ttl_minutes: Optional[int] = None,
+    ) -> CacheResult:
+        """
+        CacheService.lookup() without blocking the event loop.
+
+        Args:
+            key: Cache key
+            fetcher: Coroutine function returning fresh data
+            ttl_minutes: TTL in minutes
+            stale_ttl_minutes: Hard expiry for stale serving (None = disabled)
+
+        Returns:
+            CacheResult(data, source)
+        """
+        retention_minutes = max(
+            DEFAULT_RETENTION_MINUTES, ttl_minutes, stale_ttl_minutes or 0
+        )
+        async with self._cache() as cache:
+            started = time.perf_counter()
+            cached = await _io(cache, cache._lookup, key, ttl_minutes)
+            if cached is not None:
+                _record_ns(key, "hits", time.perf_counter() - started)
+                return CacheResult(cached, SOURCE_FRESH)
+
+            if stale_ttl_minutes is not None:
+                entry = await _io(cache, cache._peek, key)
+                if entry is not None:
+                    data, stored_at = entry
+                    if time.time() - stored_at < stale_ttl_minutes * 60:
+                        logger.info(
+                            f"Cache STALE for '{key}', refreshing in background"
+                        )
+                        _record_ns(key, "stale", time.perf_counter() - started)
+                        self._schedule_refresh(
+                            key, fetcher, ttl_minutes, retention_minutes
+                        )
+                        return CacheResult(data, SOURCE_STALE)
+            _record_ns(key, "misses", time.perf_counter() - started)
+
+            result = await self._refresh(
+                cache, key, fetcher, ttl_minutes, retention_minutes
+            )
+            if result is not None:
+                return CacheResult(result, SOURCE_FRESH)
+            stale = await _io(cache, cache.get_stale, key)
+            if stale is not None:
+                return CacheResult(stale, SOURCE_STALE)
+            _record_ns(key, "negative")
+            return CacheResult(None, SOURCE_NEGATIVE)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl_minutes: int = 15,
+        stale_ttl_minutes: Optional[int] = None,
+    ) -> Optional[Any]:
+        """Same as lookup(), returning only the data."""
+        result = await self.lookup(key, fetcher, ttl_minutes, stale_ttl_minutes)
+        return result.data
+
+    @asynccontextmanager
+    async def _cache(self):
+        """CacheService on a fresh DB session (_io returns its connection)."""
+        db = self.session_factory()
+        try:
+            yield CacheService(db)
+        finally:
+            db.close()
+
+    async def _refresh(
+        self,
+        cache: CacheService,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl_minutes: int,
+        retention_minutes: int,
+    ) -> Optional[Any]:
+        """CacheService.refresh(): one fetch per key on this loop, others wait."""
+        flights = _for_loop(_inflight)
+        flight = flights.get(key)
+        if flight is not None:
+            logger.info(f"Waiting for in-flight fetch of '{key}'")
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(flight), FETCH_WAIT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                return None
+
+        flight = flights[key] = asyncio.get_running_loop().create_future()
+        result = None
+        try:
+            result = await self._fetch_and_save(
+                cache, key, fetcher, ttl_minutes, retention_minutes
+            )
+        finally:
+            flights.pop(key, None)
+            flight.set_result(result)
+        return result
+
+    async def _fetch_and_save(
+        self,
+        cache: CacheService,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl_minutes: int,
+        retention_minutes: int,
+    ) -> Optional[Any]:
+        """CacheService._fetch_and_save() with the fetcher awaited on the loop."""
+        lock = cache.backend.lock(key, FETCH_WAIT_SECONDS)
+        acquired = await _acquire(lock)
+        try:
+            if not acquired:
+                logger.warning(f"Cache lock timeout for '{key}', fetching anyway")
+
+            # Another worker may have refreshed the entry while we waited
+            cached = await _io(cache, cache._lookup, key, ttl_minutes)
+            if cached is not None:
+                return cached
+
+            failure = await _io(cache, cache._get_failure, key)
+            if cache._backing_off(key, failure):
+                return None
+
+            started = time.perf_counter()
+            try:
+                logger.info(f"Fetching fresh data for '{key}'...")
+                fresh_data = await fetcher()
+            except Exception as e:
+                logger.error(f"Fetcher failed for '{key}': {e}")
+                reason = str(e)[:200]
+                await _io(cache, cache._fetch_failed, key, failure, reason, started)
+                return None
+            return await _io(
+                cache,
+                cache._fetch_done,
+                key,
+                fresh_data,
+                failure,
+                retention_minutes,
+                started,
+            )
+        finally:
+            await asyncio.to_thread(lock.__exit__, None, None, None)
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl_minutes: int,
+        retention_minutes: int,
+    ):
+        """Start one background refresh task per key (duplicates are dropped)."""
+        tasks = _for_loop(_refreshing)
+        if key in tasks:
+            return
+        tasks[key] = asyncio.get_running_loop().create_task(
+            self._background_refresh(key, fetcher, ttl_minutes, retention_minutes)
+        )
+
+    async def _background_refresh(
+        self,
+        key: str,
+        fetcher: Callable[[], Awaitable[Any]],
+        ttl_minutes: int,
+        retention_minutes: int,
+    ):
+        """Refresh one key on its own DB session (the request's is closed by now)."""
+        try:
+            async with self._cache() as cache:
+                await self._refresh(
+                    cache, key, fetcher, ttl_minutes, retention_minutes
+                )
+        except Exception as e:
+            logger.error(f"Background refresh failed for '{key}': {e}")
+        finally:
+            _for_loop(_refreshing).pop(key, None)
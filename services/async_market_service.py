@@ -0,0 +1,335 @@
+"""
+Async Market Data Service - Non-blocking variant of the market data interface
+(indices, movers, quotes, history, stock detail, Fear & Greed) for async
+FastAPI endpoints.
+
+Daily bars come from the same local history store as YahooFinanceService
+(services/history_store.py), but missing tails are not downloaded with
+yfinance on a blocked worker thread. The store plans the sync, and the
+bars are fetched from Yahoo's chart API on the pooled async HTTP client:
+  - One GET per symbol (v8/finance/chart), through upstream.arequest() under
+    the shared "yahoo" rate limit and circuit breaker
+  - Symbols are fetched concurrently with asyncio.gather, at most
+    ASYNC_MARKET_CONCURRENCY requests in flight
+  - Bars are adjusted like yf.Ticker.history() (auto_adjust=True) and stored
+    through the store's locked upsert, so both services share them
+
+Store and database steps (planning, upserts, reads, mover universe,
+reference metadata) are short and run on worker threads (asyncio.to_thread).
+Movers are ranked by the same build_board/top_movers pipeline
+(services/movers.py).
+
+Results are plain dicts in the sync service's shapes and are cached by the
+callers through services/async_cache.py.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services import upstream
+from services.briefing_service import fetch_fear_greed_async
+from services.constituents import load_universe
+from services.history_store import COLUMNS, SyncRequest, get_history_store
+from services.http_client import AsyncHttpClient
+from services.movers import build_board, top_movers
+from services.ticker_metadata import get_metadata
+from services.yahoo_finance_service import (
+    QUOTE_LOOKBACK_DAYS,
+    YahooFinanceService,
+    _history_rows,
+    _stock_payload,
+    quotes_from_frames,
+)
+
+logger = logging.getLogger(__name__)
+
+CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+
+# Chart requests in flight at once (the "yahoo" token bucket paces them too)
+CONCURRENCY = int(os.getenv("ASYNC_MARKET_CONCURRENCY", "16"))
+
+class AsyncMarketDataService:
+    """Free US market data from the history store, without blocking the loop."""
+
+    def __init__(self, http: Optional[AsyncHttpClient] = None):
+        self.http = http
+        self._fallback = YahooFinanceService()
+
+    async def get_history(
+        self, tickers: List[str], days: int = 31
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Daily bars for many tickers from the history store, syncing stale
+        tickers over the chart API (HistoryStore.get_history() with the
+        downloads awaited on the loop). If the store fails (e.g. the database
+        is unreachable) the charts are returned directly.
+
+        Returns:
+            {ticker: DataFrame indexed by Date with Open/High/Low/Close/Volume};
+            tickers without data are omitted
+        """
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        if not tickers:
+            return {}
+        store = get_history_store()
+        try:
+            requests = await asyncio.to_thread(store.plan_sync, tickers, days)
+            readjusted = await self._sync(requests)
+            if readjusted:
+                requests = await asyncio.to_thread(
+                    store.readjust_requests, readjusted
+                )
+                await self._sync(requests)
+            return await asyncio.to_thread(store.read, tickers, days)
+        except Exception as e:
+            logger.warning(f"History store unavailable, fetching charts directly: {e}")
+            return await self._download(tickers, date.today() - timedelta(days=days))
+
+    async def _sync(self, requests: List[SyncRequest]) -> List[str]:
+        """
+        Download the requests concurrently and store each one.
+
+        Returns:
+            Tickers whose series was re-adjusted upstream
+        """
+        store = get_history_store()
+        downloads = await asyncio.gather(
+            *(self._download(request.tickers, request.start) for request in requests)
+        )
+        readjusted = []
+        for request, frames in zip(requests, downloads):
+            if frames or not request.replace:
+                readjusted += await asyncio.to_thread(store.apply_sync, request, frames)
+        return readjusted
+
+    async def _download(
+        self, tickers: List[str], start: date
+    ) -> Dict[str, pd.DataFrame]:
+        """Chart bars from start to today, fetched concurrently."""
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def fetch(ticker: str) -> Optional[pd.DataFrame]:
+            async with semaphore:
+                try:
+                    return await self._fetch_chart(ticker, start)
+                except Exception as e:
+                    logger.warning(f"Chart fetch failed for {ticker}: {e}")
+                    return None
+
+        frames = await asyncio.gather(*(fetch(t) for t in tickers))
+        return {t: df for t, df in zip(tickers, frames) if df is not None}
+
+    async def _fetch_chart(self, ticker: str, start: date) -> Optional[pd.DataFrame]:
+        response = await upstream.arequest(
+            "GET",
+            CHART_URL.format(symbol=ticker),
+            self.http,
+            host=upstream.YAHOO,
+            params={
+                "period1": int(pd.Timestamp(start, tz="UTC").timestamp()),
+                "period2": int(time.time()),
+                "interval": "1d",
+                "events": "div,splits",
+            },
+        )
+        if response.status_code == 404:
+            return None  # Unknown symbol
+        response.raise_for_status()
+        return chart_frame(response.json())
+
+    async def get_market_indices(self) -> Dict:
+        """
+        Get major market indices for US, KR, and Crypto
+        (YahooFinanceService.get_market_indices() output).
+        """
+        indices = YahooFinanceService.INDICES_MAP
+        try:
+            frames = await self.get_history(list(indices), days=31)
+        except Exception as e:
+            logger.error(f"Error fetching market indices: {e}")
+            frames = {}
+
+        results = {}
+        for symbol, info in indices.items():
+            df = frames.get(symbol)
+            if df is None:
+                continue
+            closes = df["Close"].dropna()
+            if len(closes) < 2:
+                continue
+            current_close = float(closes.iloc[-1])
+            prev_close = float(closes.iloc[-2])
+            if prev_close <= 0:
+                continue
+            results[info["name"]] = {
+                "regularMarketPrice": round(current_close, 2),
+                "regularMarketChangePercent": round(
+                    (current_close - prev_close) / prev_close * 100, 2
+                ),
+                "history": [float(x) for x in closes.tail(14).tolist()],
+                "market": info["market"],
+            }
+
+        if not results:
+            logger.warning("No chart data for indices, using mock")
+            return self._fallback._get_mock_indices()
+        return results
+
+    async def get_quotes(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Latest price and change per ticker (see yahoo_finance_service.get_quotes)."""
+        frames = await self.get_history(tickers, days=QUOTE_LOOKBACK_DAYS)
+        return quotes_from_frames(frames)
+
+    async def get_historical_data(self, ticker: str, days: int = 30) -> List[Dict]:
+        """Daily bar dicts (date/open/high/low/close/volume) for one ticker."""
+        try:
+            hist = (await self.get_history([ticker], days=days)).get(ticker)
+        except Exception as e:
+            logger.error(f"Error fetching historical data for {ticker}: {e}")
+            return []
+        return _history_rows(hist) if hist is not None else []
+
+    async def get_stock_detail(self, ticker: str, days: int = 30) -> Optional[Dict]:
+        """
+        Stock data plus recent daily history (payload of /market/stock/{ticker}).
+
+        The bars and the reference metadata are loaded concurrently.
+
+        Returns:
+            Detail dict, or None if the ticker is unknown
+        """
+        try:
+            frames, metadata = await asyncio.gather(
+                self.get_history([ticker], days=days),
+                asyncio.to_thread(get_metadata, [ticker]),
+            )
+        except Exception as e:
+            logger.error(f"Error fetching details for {ticker}: {e}")
+            return None
+
+        quote = quotes_from_frames(frames).get(ticker)
+        if not quote:
+            return None
+        detail = _stock_payload(ticker, quote, metadata.infos.get(ticker, {}))
+        detail["history"] = _history_rows(frames[ticker])
+        return detail
+
+    async def get_top_gainers(self, limit: int = 10) -> List[Dict]:
+        """Get top gaining stocks across the mover universe."""
+        return await self._get_movers(limit, gainers=True)
+
+    async def get_top_losers(self, limit: int = 10) -> List[Dict]:
+        """Get top losing stocks across the mover universe."""
+        return await self._get_movers(limit, gainers=False)
+
+    async def _get_movers(self, limit: int, gainers: bool) -> List[Dict]:
+        mock = self._fallback._get_mock_gainers_losers(is_gainer=gainers)[:limit]
+        try:
+            infos = await asyncio.to_thread(load_universe) or {
+                ticker: {"name": ticker, "sector": "Major US"}
+                for ticker in YahooFinanceService.SP500_MAJOR_TICKERS
+            }
+            frames = await self.get_history(list(infos), days=QUOTE_LOOKBACK_DAYS)
+            board = build_board(frames)
+            return top_movers(board, limit, gainers=gainers, infos=infos) or mock
+        except Exception as e:
+            logger.error(f"Error fetching top movers: {e}")
+            return mock
+
+    async def get_fear_greed(self) -> dict:
+        """CNN Fear & Greed Index ({"score", "rating"}; neutral on failure)."""
+        return await fetch_fear_greed_async(self.http)
+
+
+def chart_frame(payload: dict) -> Optional[pd.DataFrame]:
+    """
+    Daily bars from a v8/finance/chart response, adjusted for splits and
+    dividends.
+
+    Returns:
+        DataFrame indexed by (exchange-local) Date with Open/High/Low/Close/
+        Volume, or None if the response has no bars
+    """
+    results = (payload.get("chart") or {}).get("result") or []
+    if not results:
+        return None
+    result = results[0]
+    timestamps = result.get("timestamp") or []
+    quotes = (result.get("indicators") or {}).get("quote") or []
+    if not timestamps or not quotes:
+        return None
+
+    offset = (result.get("meta") or {}).get("gmtoffset") or 0
+    index = pd.to_datetime(np.asarray(timestamps) + offset, unit="s").normalize()
+    df = pd.DataFrame(
+        {col: quotes[0].get(col.lower()) for col in COLUMNS}, index=index
+    ).astype(float)
+    df.index.name = "Date"
+
+    adjclose = (result["indicators"].get("adjclose") or [{}])[0].get("adjclose")
+    if adjclose:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = np.asarray(adjclose, dtype=float) / df["Close"].to_numpy()
+        for col in ("Open", "High", "Low", "Close"):
+            df[col] = df[col] * factor
+
+    df["Volume"] = df["Volume"].fillna(0)
+    df = df[~df.index.duplicated(keep="last")].dropna(subset=["Close"])
+    return df if len(df) else None
+
+
+class ThreadedMarketDataService:
+    """
+    Async facade over a synchronous market data service class (PolygonService
+    when premium APIs are enabled). Each call builds the service on its own
+    DB session, so its CacheService-backed caches work, and runs it on a
+    worker thread. Stock detail falls back to AsyncMarketDataService when
+    the service has no get_stock_detail().
+    """
+
+    def __init__(self, service_cls, session_factory=None):
+        if session_factory is None:
+            from database import SessionLocal
+
+            session_factory = SessionLocal
+        self.service_cls = service_cls
+        self.session_factory = session_factory
+        self._fallback = AsyncMarketDataService()
+
+    async def get_market_indices(self) -> Dict:
+        return await self._call("get_market_indices")
+
+    async def get_top_gainers(self) -> List[Dict]:
+        if not hasattr(self.service_cls, "get_top_gainers"):
+            return []
+        return await self._call("get_top_gainers")
+
+    async def get_top_losers(self) -> List[Dict]:
+        if not hasattr(self.service_cls, "get_top_losers"):
+            return []
+        return await self._call("get_top_losers")
+
+    async def get_stock_detail(self, ticker: str) -> Optional[Dict]:
+        if not hasattr(self.service_cls, "get_stock_detail"):
+            return await self._fallback.get_stock_detail(ticker)
+        return await self._call("get_stock_detail", ticker)
+
+    async def get_fear_greed(self) -> dict:
+        return await fetch_fear_greed_async()
+
+    async def _call(self, method: str, *args):
+        return await asyncio.to_thread(self._run, method, *args)
+
+    def _run(self, method: str, *args):
+        db = self.session_factory()
+        try:
+            return getattr(self.service_cls(db=db), method)(*args)
+        finally:
+            db.close()
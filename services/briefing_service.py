@@ -0,0 +1,231 @@
+"""
+Briefing Service - Builds the daily US market briefing from live data.
+Used by the briefing router (on demand) and the cache warmer (ahead of time):
+  1. Market indices from Yahoo Finance (cached)
+  2. Fear & Greed index from CNN (cached)
+  3. Template-based summary generation
+
+create_briefing_for_today_async() is the variant for async endpoints: both
+fetches run concurrently through services/async_market_service.py.
+"""
+
+import asyncio
+import logging
+from datetime import date
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from models import DailyBriefing
+from services import cache_keys, upstream
+from services.cache_service import CacheService, STALE_TTL_MARKET
+from services.http_client import AsyncHttpClient, HttpClient
+from services.ttl_policy import ttl_policy
+
+logger = logging.getLogger(__name__)
+
+
+FEAR_GREED_URL = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
+FEAR_GREED_HEADERS = {"User-Agent": "Mozilla/5.0"}
+FEAR_GREED_NEUTRAL = {"score": 50, "rating": "Neutral"}
+
+
+def fetch_fear_greed(http: Optional[HttpClient] = None) -> dict:
+    """Fetch CNN Fear & Greed Index (free, no API key needed)."""
+    try:
+        resp = upstream.get(
+            FEAR_GREED_URL, client=http, headers=FEAR_GREED_HEADERS, timeout=10
+        )
+        if resp.status_code == 200:
+            return _parse_fear_greed(resp.json())
+    except Exception as e:
+        logger.warning(f"Fear & Greed fetch failed: {e}")
+
+    return dict(FEAR_GREED_NEUTRAL)
+
+
+async def fetch_fear_greed_async(http: Optional[AsyncHttpClient] = None) -> dict:
+    """fetch_fear_greed() on the async HTTP client."""
+    try:
+        resp = await upstream.aget(
+            FEAR_GREED_URL, client=http, headers=FEAR_GREED_HEADERS, timeout=10
+        )
+        if resp.status_code == 200:
+            return _parse_fear_greed(resp.json())
+    except Exception as e:
+        logger.warning(f"Fear & Greed fetch failed: {e}")
+
+    return dict(FEAR_GREED_NEUTRAL)
+
+
+def _parse_fear_greed(data: dict) -> dict:
+    fg = data.get("fear_and_greed", {})
+    score = int(fg.get("score", 50))
+    rating = fg.get("rating", "Neutral")
+    return {"score": score, "rating": rating}
+
+
+def _sentiment_label(score: int) -> str:
+    """Convert Fear & Greed score to Korean sentiment label."""
+    if score >= 75:
+        return "극도의 탐욕"
+    elif score >= 55:
+        return "탐욕"
+    elif score >= 45:
+        return "중립"
+    elif score >= 25:
+        return "공포"
+    else:
+        return "극도의 공포"
+
+
+def _generate_summary(indices: dict, fg_score: int, sentiment: str) -> str:
+    """Generate a Korean market summary from data."""
+    parts = []
+
+    # Overall market direction
+    sp_change = 0.0
+    if "S&P 500" in indices:
+        sp_change = indices["S&P 500"].get("change_percent", 0)
+
+    if sp_change >= 1.0:
+        parts.append(
+            f"미국 시장이 강한 상승세를 보였습니다. S&P 500이 {sp_change:+.2f}% 올랐습니다."
+        )
+    elif sp_change >= 0:
+        parts.append(
+            f"미국 시장이 소폭 상승했습니다. S&P 500이 {sp_change:+.2f}% 변동했습니다."
+        )
+    elif sp_change >= -1.0:
+        parts.append(
+            f"미국 시장이 소폭 하락했습니다. S&P 500이 {sp_change:+.2f}% 내렸습니다."
+        )
+    else:
+        parts.append(
+            f"미국 시장이 큰 폭으로 하락했습니다. S&P 500이 {sp_change:+.2f}% 급락했습니다."
+        )
+
+    # Index details
+    for name, data in indices.items():
+        if name != "S&P 500":
+            cp = data.get("change_percent", 0)
+            parts.append(f"{name}: {cp:+.2f}%")
+
+    # Sentiment
+    parts.append(f"시장 심리: {sentiment} (공포탐욕지수 {fg_score})")
+
+    return " ".join(parts)
+
+
+def create_briefing_for_today(db: Session) -> DailyBriefing:
+    """Auto-generate today's briefing from live market data."""
+    cache = CacheService(db)
+
+    # 1. Get market indices (cached)
+    indices = cache.get_or_fetch(
+        cache_keys.MARKET_INDICES,
+        _fetch_market_indices,
+        ttl_minutes=ttl_policy.ttl_for("indices"),
+        stale_ttl_minutes=STALE_TTL_MARKET,
+    )
+
+    # 2. Get Fear & Greed (cached)
+    fg_data = cache.get_or_fetch(
+        cache_keys.FEAR_GREED,
+        fetch_fear_greed,
+        ttl_minutes=ttl_policy.ttl_for("fear_greed"),
+        stale_ttl_minutes=STALE_TTL_MARKET,
+    )
+    return save_briefing(db, indices, fg_data)
+
+
+def _fetch_market_indices() -> dict:
+    """
+    Market indices on a session of their own: a stale hit refreshes them on
+    the cache's background pool, after the caller's session is closed.
+    """
+    from database import SessionLocal
+    from services.service_factory import ServiceFactory
+
+    db = SessionLocal()
+    try:
+        return ServiceFactory.get_market_data_service(db).get_market_indices()
+    finally:
+        db.close()
+
+
+async def create_briefing_for_today_async(db: Session) -> DailyBriefing:
+    """
+    create_briefing_for_today() for async endpoints: indices and Fear & Greed
+    are fetched concurrently on the async market data service, and the
+    database write runs on a worker thread.
+    """
+    from services.async_cache import AsyncCacheService
+    from services.service_factory import ServiceFactory
+
+    cache = AsyncCacheService()
+    market_service = ServiceFactory.get_async_market_data_service()
+
+    indices, fg_data = await asyncio.gather(
+        cache.get_or_fetch(
+            cache_keys.MARKET_INDICES,
+            market_service.get_market_indices,
+            ttl_minutes=ttl_policy.ttl_for("indices"),
+            stale_ttl_minutes=STALE_TTL_MARKET,
+        ),
+        cache.get_or_fetch(
+            cache_keys.FEAR_GREED,
+            fetch_fear_greed_async,
+            ttl_minutes=ttl_policy.ttl_for("fear_greed"),
+            stale_ttl_minutes=STALE_TTL_MARKET,
+        ),
+    )
+    return await asyncio.to_thread(save_briefing, db, indices, fg_data)
+
+
+def save_briefing(
+    db: Session, indices: Optional[dict], fg_data: Optional[dict]
+) -> DailyBriefing:
+    """Build today's briefing from indices and Fear & Greed data and upsert it."""
+    if not indices:
+        indices = {}
+    fg_score = fg_data.get("score", 50) if fg_data else 50
+    # fg_rating available in fg_data["rating"] if needed
+
+    # 3. Determine sentiment
+    sentiment = _sentiment_label(fg_score)
+
+    # 4. Generate summary
+    summary = _generate_summary(indices, fg_score, sentiment)
+
+    # 5. Build key_indices_json for frontend
+    key_indices = {}
+    for name, data in indices.items():
+        key_indices[name] = {
+            "value": data.get("value", 0),
+            "change_percent": data.get("change_percent", 0),
+        }
+
+    # 6. Save to DB
+    today = date.today()
+    briefing = db.query(DailyBriefing).filter_by(date=today).first()
+
+    if briefing:
+        briefing.us_summary = summary
+        briefing.market_sentiment = sentiment
+        briefing.key_indices_json = key_indices
+        briefing.fear_greed_score = fg_score
+    else:
+        briefing = DailyBriefing(
+            date=today,
+            us_summary=summary,
+            market_sentiment=sentiment,
+            key_indices_json=key_indices,
+            fear_greed_score=fg_score,
+            content=summary,
+        )
+        db.add(briefing)
+
+    db.commit()
+    db.refresh(briefing)
+    return briefing
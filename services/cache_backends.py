@@ -0,0 +1,460 @@
+"""
+Cache Backends - Storage implementations for CacheService's shared tier.
+
+CacheService keeps an in-process LRU (L1) and delegates everything else to
+one of these backends (L2):
+  - DBCacheBackend:     MarketDataCache table (default, shared via Postgres)
+  - RedisCacheBackend:  Redis with native TTLs (CACHE_BACKEND=redis)
+  - MemoryCacheBackend: process-local dict (CACHE_BACKEND=memory, tests)
+
+Every backend stores (data, stored_at) where stored_at is epoch seconds of
+the last write, and exposes a per-key lock used to coalesce fetches across
+worker processes. The DB and Redis backends store values through
+services/cache_codec.py (msgpack/JSON, compressed above a size threshold).
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import bindparam, func, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models import MarketDataCache
+from services import cache_codec
+
+logger = logging.getLogger(__name__)
+
+# (data, stored_at epoch seconds)
+CacheEntry = Tuple[Any, float]
+
+# How often buffered read times are written to market_data_cache (seconds)
+ACCESS_FLUSH_SECONDS = int(os.getenv("CACHE_ACCESS_FLUSH_SECONDS", "60"))
+
+# Pooled connections per process that may hold cross-worker fetch locks
+# (each pg advisory lock pins one); keep well under the engine's pool size
+LOCK_CONNECTIONS = int(os.getenv("CACHE_LOCK_CONNECTIONS", "3"))
+
+
+class CacheBackend:
+    """Interface for the shared cache tier. Methods may raise; CacheService logs."""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CacheEntry]:
+        """Default: one get() per key. Backends override with a batched read."""
+        results = {}
+        for key in keys:
+            entry = self.get(key)
+            if entry is not None:
+                results[key] = entry
+        return results
+
+    def set(self, key: str, data: Any, retention_seconds: int) -> None:
+        """Store data; the backend may drop it after retention_seconds."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def touch(self, key: str) -> None:
+        """Note a read served without hitting the backend (L1 hit). Default: no-op."""
+
+    @contextmanager
+    def lock(self, key: str, timeout: float):
+        """Cross-process lock on key. Default: no-op (single process)."""
+        yield True
+
+
+class _AccessLog:
+    """
+    Last-read time per key, buffered in memory so reads don't become writes.
+    DBCacheBackend flushes it in one batched UPDATE at most every
+    ACCESS_FLUSH_SECONDS per process.
+    """
+
+    def __init__(self, flush_seconds: int = ACCESS_FLUSH_SECONDS):
+        self.flush_seconds = flush_seconds
+        self._pending: Dict[str, float] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, key: str):
+        with self._lock:
+            self._pending[key] = time.time()
+
+    def drain(self, force: bool = False) -> Dict[str, float]:
+        """Take the buffered times if a flush is due (or forced)."""
+        with self._lock:
+            if not self._pending:
+                return {}
+            if not force and time.monotonic() - self._last_flush < self.flush_seconds:
+                return {}
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            return pending
+
+
+# Shared by every DBCacheBackend in this process
+_access_log = _AccessLog()
+_lock_slots = threading.BoundedSemaphore(max(LOCK_CONNECTIONS, 1))
+
+
+class DBCacheBackend(CacheBackend):
+    """
+    MarketDataCache table. Values go to the binary `payload` column; rows
+    written before the codec (JSON `data` column only) are still read.
+    Retention is recorded as expires_at and enforced by CacheJanitor, which
+    also evicts least-recently-read rows (last_accessed_at) over budget.
+    """
+
+    name = "db"
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            cache = (
+                self.db.query(MarketDataCache)
+                .filter(MarketDataCache.key == key)
+                .first()
+            )
+        except Exception:
+            self.db.rollback()
+            raise
+        if not cache or not cache.updated_at:
+            return None
+        data = _row_value(cache)
+        if data is None:
+            return None
+        self.touch(key)
+        return data, _to_epoch(cache.updated_at)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CacheEntry]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            rows = (
+                self.db.query(MarketDataCache)
+                .filter(MarketDataCache.key.in_(keys))
+                .all()
+            )
+        except Exception:
+            self.db.rollback()
+            raise
+        results = {}
+        for row in rows:
+            data = _row_value(row) if row.updated_at else None
+            if data is not None:
+                results[row.key] = (data, _to_epoch(row.updated_at))
+                _access_log.record(row.key)
+        self.flush_access_times()
+        return results
+
+    def set(self, key: str, data: Any, retention_seconds: int) -> None:
+        if cache_codec.is_enabled():
+            payload = cache_codec.encode(data)
+            values = {"data": None, "payload": payload, "size_bytes": len(payload)}
+        else:
+            values = {
+                "data": data,
+                "payload": None,
+                "size_bytes": len(json.dumps(data, default=str)),
+            }
+        now = datetime.datetime.now(datetime.timezone.utc)
+        values["expires_at"] = now + datetime.timedelta(seconds=retention_seconds)
+        values["last_accessed_at"] = now
+        try:
+            if self._dialect() == "postgresql":
+                # Atomic upsert — concurrent writers can't hit a duplicate-key insert
+                stmt = pg_insert(MarketDataCache).values(
+                    key=key, updated_at=func.now(), **values
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[MarketDataCache.key],
+                    set_={
+                        "data": stmt.excluded.data,
+                        "payload": stmt.excluded.payload,
+                        "size_bytes": stmt.excluded.size_bytes,
+                        "expires_at": stmt.excluded.expires_at,
+                        "last_accessed_at": stmt.excluded.last_accessed_at,
+                        "updated_at": func.now(),
+                    },
+                )
+                self.db.execute(stmt)
+            else:
+                cache = (
+                    self.db.query(MarketDataCache)
+                    .filter(MarketDataCache.key == key)
+                    .first()
+                )
+                if cache:
+                    for column, value in values.items():
+                        setattr(cache, column, value)
+                    cache.updated_at = func.now()
+                else:
+                    self.db.add(MarketDataCache(key=key, **values))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            self.db.query(MarketDataCache).filter(MarketDataCache.key == key).delete()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def touch(self, key: str) -> None:
+        _access_log.record(key)
+        self.flush_access_times()
+
+    def flush_access_times(self, force: bool = False) -> int:
+        """
+        Write buffered read times in one batched UPDATE (when due, or forced).
+        Uses its own connection so the caller's session/transaction is untouched.
+
+        Returns:
+            Number of keys flushed
+        """
+        pending = _access_log.drain(force)
+        if not pending:
+            return 0
+        params = [
+            {
+                "k": key,
+                "ts": datetime.datetime.fromtimestamp(ts, datetime.timezone.utc),
+            }
+            for key, ts in pending.items()
+        ]
+        stmt = (
+            update(MarketDataCache.__table__)
+            .where(MarketDataCache.__table__.c.key == bindparam("k"))
+            .values(last_accessed_at=bindparam("ts"))
+        )
+        try:
+            with self.db.get_bind().begin() as conn:
+                conn.execute(stmt, params)
+        except Exception as e:
+            # Access times only steer eviction order; losing a batch is harmless
+            logger.warning(f"Cache access-time flush failed ({len(params)} keys): {e}")
+            return 0
+        return len(params)
+
+    @contextmanager
+    def lock(self, key: str, timeout: float):
+        """
+        pg_advisory_lock on a hash of the key, held on a dedicated connection
+        so commits on self.db don't release it. No-op on other databases or
+        if the lock can't be taken within timeout (yields False then).
+
+        At most CACHE_LOCK_CONNECTIONS locks are held per process (the
+        in-process single-flight already leaves one caller per key); when
+        every slot is busy the caller fetches without the cross-worker lock
+        instead of taking another pooled connection.
+        """
+        if self._dialect() != "postgresql":
+            yield True
+            return
+
+        if not _lock_slots.acquire(blocking=False):
+            logger.info(f"No free cache lock slot for '{key}', fetching unlocked")
+            yield False
+            return
+
+        lock_id = _advisory_lock_id(key)
+        conn = None
+        acquired = False
+        try:
+            try:
+                conn = self.db.get_bind().connect()
+                deadline = time.monotonic() + timeout
+                while True:
+                    acquired = conn.execute(
+                        text("SELECT pg_try_advisory_lock(:id)"), {"id": lock_id}
+                    ).scalar()
+                    if acquired or time.monotonic() >= deadline:
+                        break
+                    time.sleep(0.1)
+            except Exception as e:
+                logger.warning(f"Advisory lock unavailable for '{key}': {e}")
+
+            try:
+                yield bool(acquired)
+            finally:
+                if conn is not None:
+                    try:
+                        if acquired:
+                            conn.execute(
+                                text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id}
+                            )
+                            conn.commit()
+                    finally:
+                        conn.close()
+        finally:
+            _lock_slots.release()
+
+    def _dialect(self) -> str:
+        try:
+            return self.db.get_bind().dialect.name
+        except Exception:
+            return ""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Process-local store with expiry. Used for tests and single-process runs."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Any, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            data, stored_at, expires_at = entry
+            if time.time() >= expires_at:
+                del self._data[key]
+                return None
+            return data, stored_at
+
+    def set(self, key: str, data: Any, retention_seconds: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._data[key] = (data, now, now + retention_seconds)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis store. Entries expire natively (SET ... EX retention) and are
+    stored as a binary envelope: 8-byte stored_at + codec-encoded payload.
+    """
+
+    name = "redis"
+    KEY_PREFIX = "taraga:cache:"
+    LOCK_PREFIX = "taraga:lock:"
+
+    # Delete the lock only if we still own it
+    _RELEASE_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, url: str, client=None):
+        if client is None:
+            import redis  # optional dependency
+
+            client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        self.client = client
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return _unpack(self.client.get(self.KEY_PREFIX + key))
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CacheEntry]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        # MGET: all keys in a single round trip
+        raw_values = self.client.mget([self.KEY_PREFIX + k for k in keys])
+        results = {}
+        for key, raw in zip(keys, raw_values):
+            entry = _unpack(raw)
+            if entry is not None:
+                results[key] = entry
+        return results
+
+    def set(self, key: str, data: Any, retention_seconds: int) -> None:
+        self.client.set(
+            self.KEY_PREFIX + key, _pack(data, time.time()), ex=max(1, int(retention_seconds))
+        )
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.KEY_PREFIX + key)
+
+    @contextmanager
+    def lock(self, key: str, timeout: float):
+        """SET NX lock with expiry (so a crashed holder can't wedge the key)."""
+        lock_key = self.LOCK_PREFIX + key
+        token = uuid.uuid4().hex
+        acquired = False
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                acquired = bool(
+                    self.client.set(lock_key, token, nx=True, px=int(timeout * 1000))
+                )
+                if acquired or time.monotonic() >= deadline:
+                    break
+                time.sleep(0.1)
+        except Exception as e:
+            logger.warning(f"Redis lock unavailable for '{key}': {e}")
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    self.client.eval(self._RELEASE_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    logger.warning(f"Redis lock release failed for '{key}': {e}")
+
+
+_ENVELOPE = struct.Struct("!d")
+
+
+def _pack(data: Any, stored_at: float) -> bytes:
+    return _ENVELOPE.pack(stored_at) + cache_codec.encode(data)
+
+
+def _unpack(raw: Optional[bytes]) -> Optional[CacheEntry]:
+    if not raw or len(raw) < _ENVELOPE.size:
+        return None
+    (stored_at,) = _ENVELOPE.unpack_from(raw)
+    # Pre-codec values (headerless JSON) still decode
+    return cache_codec.decode(raw[_ENVELOPE.size:]), stored_at
+
+
+def _row_value(row: MarketDataCache) -> Any:
+    """Decoded payload column, else the legacy JSON column."""
+    if row.payload is not None:
+        return cache_codec.decode(row.payload)
+    return row.data
+
+
+def _to_epoch(updated_at: datetime.datetime) -> float:
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=datetime.timezone.utc)
+    return updated_at.timestamp()
+
+
+def _advisory_lock_id(key: str) -> int:
+    """Stable signed 64-bit id for pg_advisory_lock (same in every worker)."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
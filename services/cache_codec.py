@@ -0,0 +1,145 @@
+"""
+Cache Codec - Compact binary encoding for cache payloads.
+
+Encoded values start with a one-byte codec id, followed by the body:
+  0x01 JSON            0x04 msgpack
+  0x02 JSON + zlib     0x05 msgpack + zlib
+  0x03 JSON + zstd     0x06 msgpack + zstd
+Payloads smaller than CACHE_COMPRESS_MIN_BYTES are stored uncompressed.
+
+msgpack and zstandard are optional: without them values are written as
+JSON / zlib. Any codec id can always be read back as long as its library is
+installed, so changing CACHE_CODEC never invalidates existing entries.
+Bytes without a known codec id are legacy compact JSON (pre-codec Redis
+values), since JSON text never starts with a byte below 0x20.
+"""
+
+import json
+import logging
+import os
+import zlib
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+CODEC_JSON = 0x01
+CODEC_JSON_ZLIB = 0x02
+CODEC_JSON_ZSTD = 0x03
+CODEC_MSGPACK = 0x04
+CODEC_MSGPACK_ZLIB = 0x05
+CODEC_MSGPACK_ZSTD = 0x06
+
+_CODECS = {
+    CODEC_JSON: ("json", None),
+    CODEC_JSON_ZLIB: ("json", "zlib"),
+    CODEC_JSON_ZSTD: ("json", "zstd"),
+    CODEC_MSGPACK: ("msgpack", None),
+    CODEC_MSGPACK_ZLIB: ("msgpack", "zlib"),
+    CODEC_MSGPACK_ZSTD: ("msgpack", "zstd"),
+}
+_CODEC_IDS = {names: codec_id for codec_id, names in _CODECS.items()}
+
+# "auto" = msgpack when installed, else JSON. "none" keeps the legacy JSON column.
+CACHE_CODEC = os.getenv("CACHE_CODEC", "auto").lower()
+
+# Compress bodies at least this large (bytes); level favours speed
+COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "2048"))
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def is_enabled() -> bool:
+    """False when CACHE_CODEC=none (store plain JSON as before)."""
+    return CACHE_CODEC != "none"
+
+
+def describe() -> dict:
+    """Active serializer/compressor, for stats endpoints."""
+    return {
+        "serializer": _serializer(),
+        "compression": "zstd" if zstandard is not None else "zlib",
+        "compress_min_bytes": COMPRESS_MIN_BYTES,
+        "enabled": is_enabled(),
+    }
+
+
+def encode(data: Any) -> bytes:
+    """
+    Serialize (and compress if large) a JSON-compatible value.
+
+    Args:
+        data: Cache payload (dict/list/scalars; other types are str()-ed)
+
+    Returns:
+        Codec id byte + body
+    """
+    serializer = _serializer()
+    body = None
+    if serializer == "msgpack":
+        try:
+            body = msgpack.packb(data, default=str, use_bin_type=True)
+        except (TypeError, ValueError, OverflowError) as e:
+            logger.warning(f"msgpack encode failed, using JSON: {e}")
+            serializer = "json"
+    if body is None:
+        body = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+
+    compression = None
+    if len(body) >= COMPRESS_MIN_BYTES:
+        if zstandard is not None:
+            body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+            compression = "zstd"
+        else:
+            body = zlib.compress(body, ZLIB_LEVEL)
+            compression = "zlib"
+
+    return bytes([_CODEC_IDS[(serializer, compression)]]) + body
+
+
+def decode(raw: Optional[bytes]) -> Any:
+    """
+    Inverse of encode(). Accepts legacy headerless JSON bytes.
+
+    Raises:
+        ValueError: if the codec's library is not installed
+    """
+    if raw is None:
+        return None
+    raw = bytes(raw)
+    if not raw:
+        return None
+
+    names = _CODECS.get(raw[0])
+    if names is None:
+        return json.loads(raw)
+
+    serializer, compression = names
+    body = raw[1:]
+    if compression == "zlib":
+        body = zlib.decompress(body)
+    elif compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd-compressed cache entry but zstandard is not installed")
+        body = zstandard.ZstdDecompressor().decompress(body)
+
+    if serializer == "msgpack":
+        if msgpack is None:
+            raise ValueError("msgpack cache entry but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    return json.loads(body)
+
+
+def _serializer() -> str:
+    if CACHE_CODEC in ("auto", "msgpack") and msgpack is not None:
+        return "msgpack"
+    return "json"
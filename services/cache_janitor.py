@@ -0,0 +1,232 @@
+"""
+Cache Janitor - Keeps the market_data_cache table bounded.
+
+Per-ticker keys (stock:detail:*) are created for every ticker anyone looks
+up, so without cleanup the table only grows. Each pass:
+  1. Flushes this process's buffered read times (last_accessed_at)
+  2. Deletes hard-expired rows (expires_at in the past; rows from before
+     expires_at existed use updated_at + DEFAULT_RETENTION_MINUTES)
+  3. If still over CACHE_DB_MAX_ROWS or CACHE_DB_MAX_BYTES, deletes the
+     least recently read rows until back under budget
+
+Only the DB backend needs this — Redis and memory entries expire natively.
+Runs in-process (CACHE_JANITOR=true, the default) and is safe with several
+workers: a pass only runs while holding the janitor's advisory lock.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import MarketDataCache
+from services.cache_backends import DBCacheBackend
+from services.cache_service import DEFAULT_RETENTION_MINUTES
+
+logger = logging.getLogger(__name__)
+
+# Budgets for the whole table
+MAX_ROWS = int(os.getenv("CACHE_DB_MAX_ROWS", "5000"))
+MAX_BYTES = int(os.getenv("CACHE_DB_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Seconds between passes
+PASS_INTERVAL_SECONDS = int(os.getenv("CACHE_JANITOR_INTERVAL", "300"))
+
+# Keys per DELETE statement
+DELETE_BATCH_SIZE = 500
+
+# Advisory lock name (not a cache key) so only one worker runs a pass
+JANITOR_LOCK_KEY = "__cache_janitor__"
+
+_stats_lock = threading.Lock()
+_stats = {
+    "passes": 0,
+    "expired_evicted": 0,
+    "lru_evicted": 0,
+    "access_flushed": 0,
+    "last_pass_at": None,
+    "last_pass_ms": None,
+}
+
+
+class CacheJanitor:
+    """Background eviction for the MarketDataCache table."""
+
+    def __init__(
+        self,
+        session_factory=None,
+        max_rows: int = MAX_ROWS,
+        max_bytes: int = MAX_BYTES,
+    ):
+        if session_factory is None:
+            from database import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def get_stats() -> dict:
+        """Eviction counters for this process."""
+        with _stats_lock:
+            return dict(_stats)
+
+    @staticmethod
+    def table_stats(db: Session) -> dict:
+        """
+        Current size of the cache table.
+
+        Returns:
+            rows, bytes (sum of size_bytes; legacy rows count as 0),
+            expired rows awaiting eviction, and the oldest read time
+        """
+        now = datetime.now(timezone.utc)
+        rows, total_bytes, oldest_access = db.query(
+            func.count(MarketDataCache.key),
+            func.coalesce(func.sum(MarketDataCache.size_bytes), 0),
+            func.min(
+                func.coalesce(
+                    MarketDataCache.last_accessed_at, MarketDataCache.updated_at
+                )
+            ),
+        ).one()
+        expired = (
+            db.query(func.count(MarketDataCache.key))
+            .filter(MarketDataCache.expires_at < now)
+            .scalar()
+        )
+        return {
+            "rows": rows,
+            "bytes": int(total_bytes),
+            "expired_rows": expired,
+            "oldest_access": oldest_access.isoformat() if oldest_access else None,
+            "max_rows": MAX_ROWS,
+            "max_bytes": MAX_BYTES,
+        }
+
+    def run_once(self) -> dict:
+        """
+        One eviction pass.
+
+        Returns:
+            Summary dict: expired, lru (rows deleted), access_flushed,
+            skipped (True if another worker holds the janitor lock)
+        """
+        summary = {"expired": 0, "lru": 0, "access_flushed": 0, "skipped": False}
+        started = time.monotonic()
+
+        db = self.session_factory()
+        try:
+            backend = DBCacheBackend(db)
+            summary["access_flushed"] = backend.flush_access_times(force=True)
+
+            with backend.lock(JANITOR_LOCK_KEY, 0) as acquired:
+                if not acquired:
+                    summary["skipped"] = True
+                    return summary
+                summary["expired"] = self._evict_expired(db)
+                summary["lru"] = self._evict_over_budget(db)
+        except Exception as e:
+            logger.error(f"Cache janitor pass failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+        elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+        with _stats_lock:
+            _stats["passes"] += 1
+            _stats["expired_evicted"] += summary["expired"]
+            _stats["lru_evicted"] += summary["lru"]
+            _stats["access_flushed"] += summary["access_flushed"]
+            _stats["last_pass_at"] = datetime.now(timezone.utc).isoformat()
+            _stats["last_pass_ms"] = elapsed_ms
+
+        if summary["expired"] or summary["lru"]:
+            logger.info(
+                f"Cache janitor: evicted {summary['expired']} expired, "
+                f"{summary['lru']} LRU rows ({elapsed_ms}ms)"
+            )
+        return summary
+
+    def start(self) -> threading.Thread:
+        """Run passes on a daemon thread until stop() is called."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever, name="cache-janitor", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self):
+        logger.info("Cache janitor started")
+        while not self._stop.wait(PASS_INTERVAL_SECONDS):
+            self.run_once()
+        logger.info("Cache janitor stopped")
+
+    def _evict_expired(self, db: Session) -> int:
+        now = datetime.now(timezone.utc)
+        legacy_cutoff = now - timedelta(minutes=DEFAULT_RETENTION_MINUTES)
+        deleted = (
+            db.query(MarketDataCache)
+            .filter(MarketDataCache.expires_at < now)
+            .delete(synchronize_session=False)
+        )
+        deleted += (
+            db.query(MarketDataCache)
+            .filter(
+                MarketDataCache.expires_at.is_(None),
+                MarketDataCache.updated_at < legacy_cutoff,
+            )
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+    def _evict_over_budget(self, db: Session) -> int:
+        rows, total_bytes = db.query(
+            func.count(MarketDataCache.key),
+            func.coalesce(func.sum(MarketDataCache.size_bytes), 0),
+        ).one()
+        excess_rows = rows - self.max_rows
+        excess_bytes = int(total_bytes) - self.max_bytes
+        if excess_rows <= 0 and excess_bytes <= 0:
+            return 0
+
+        # Least recently read first; never-read rows fall back to write time
+        candidates = (
+            db.query(MarketDataCache.key, MarketDataCache.size_bytes)
+            .order_by(
+                func.coalesce(
+                    MarketDataCache.last_accessed_at, MarketDataCache.updated_at
+                ).asc()
+            )
+            .all()
+        )
+        victims: List[str] = []
+        for key, size in candidates:
+            if excess_rows <= 0 and excess_bytes <= 0:
+                break
+            victims.append(key)
+            excess_rows -= 1
+            excess_bytes -= size or 0
+
+        for i in range(0, len(victims), DELETE_BATCH_SIZE):
+            batch = victims[i : i + DELETE_BATCH_SIZE]
+            db.query(MarketDataCache).filter(MarketDataCache.key.in_(batch)).delete(
+                synchronize_session=False
+            )
+            db.commit()
+        return len(victims)
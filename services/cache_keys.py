@@ -0,0 +1,60 @@
+"""
+Cache Keys - One namespaced key per cached item.
+
+Keys look like "<namespace>:<name>[:<param>]". The namespace (first
+segment) groups hit/miss/latency metrics in CacheService.get_stats().
+Routers, services and the cache warmer all build keys here, so the same
+logical item is never cached twice under different names.
+"""
+
+from datetime import date
+from typing import Union
+
+# Market-wide data
+MARKET_INDICES = "market:indices"
+MARKET_GAINERS = "market:gainers"
+MARKET_LOSERS = "market:losers"
+MARKET_MOVERS = "market:movers"  # candidate pool behind gainers/losers (Polygon)
+
+# Sentiment
+FEAR_GREED = "sentiment:fear_greed"
+
+NEGATIVE_PREFIX = "negative:"
+
+
+def retail_picks(region: str) -> str:
+    return f"picks:retail:{region}"
+
+
+def institutional_picks(region: str) -> str:
+    return f"picks:institutional:{region}"
+
+
+def briefing(day: Union[date, str]) -> str:
+    if isinstance(day, date):
+        day = day.isoformat()
+    return f"briefing:{day}"
+
+
+def stock_detail(ticker: str) -> str:
+    return f"stock:detail:{ticker}"
+
+
+def ticker_metadata(ticker: str) -> str:
+    """Slow-changing reference data (name, sector, market cap, shares, ...)."""
+    return f"meta:reference:{ticker}"
+
+
+def negative(key: str) -> str:
+    """Failure/backoff record for key (kept apart so stale data survives)."""
+    return f"{NEGATIVE_PREFIX}{key}"
+
+
+def is_negative(key: str) -> bool:
+    return key.startswith(NEGATIVE_PREFIX)
+
+
+def namespace_of(key: str) -> str:
+    """First segment of a namespaced key ("other" for legacy flat keys)."""
+    namespace, sep, _ = key.partition(":")
+    return namespace if sep else "other"
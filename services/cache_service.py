@@ -1,105 +1,428 @@
 """
-Cache Service - Centralized caching layer using MarketDataCache table.
-All external API results are cached in DB so:
+Cache Service - Centralized caching layer for external API results.
+All external API results are cached so:
   1. First user request triggers the actual fetch
   2. Subsequent users get cached data until TTL expires
   3. Rate limits are never hit
+
+Lookups go through two tiers:
+  L1: in-process LRU (per worker, bounded by entry count and bytes)
+  L2: shared storage backend — MarketDataCache table by default, or Redis
+      (see services/cache_backends.py and CACHE_BACKEND)
+An L2 hit is promoted into L1, so hot keys skip the L2 round trip.
+
+Keys are namespaced ("market:indices", "stock:detail:AAPL"; see
+services/cache_keys.py) and get_stats() reports hits, misses, stale
+serves, fetches and latency per namespace.
+
+Failed or empty fetches are negatively cached under "negative:<key>" with
+exponential per-key backoff, so an unknown ticker or a throttled upstream
+is not retried on every request. lookup() reports where a response came
+from: fresh, stale (fallback) or negative.
 """
 
-import datetime
+import json
 import logging
-from typing import Any, Callable, Optional
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from models import MarketDataCache
+from services import cache_codec
+from services.cache_backends import CacheBackend
+from services.cache_keys import is_negative, namespace_of, negative
 
 logger = logging.getLogger(__name__)
 
-# Default TTLs (minutes) — conservative for single-user, rate-limit safe
+# Default TTLs (minutes) — conservative for single-user, rate-limit safe.
+# Session-aware TTLs for market data come from services/ttl_policy.py;
+# these are its fallbacks.
 TTL_MARKET_INDICES = 30  # 30 min for live indices
 TTL_BRIEFING = 120  # 2 hours for daily briefing
 TTL_GAINERS_LOSERS = 60  # 1 hour for movers
 TTL_SCRAPER = 360  # 6 hours for scraped picks
 TTL_FEAR_GREED = 120  # 2 hours for fear & greed
+TTL_STOCK_DETAIL = 15  # 15 min for single-stock details
+TTL_METADATA = 7 * 24 * 60  # 7 days for names / shares outstanding
+
+# Hard expiry for stale-while-revalidate keys: past TTL but within this
+# window, the old value is served immediately and refreshed in background
+STALE_TTL_MARKET = 360  # 6 hours
+
+# How long L2 keeps an entry after its last write (Redis/memory expire it
+# natively). Must outlive TTLs so stale fallback still has data.
+# 4 days covers a closed-market TTL across a long weekend.
+DEFAULT_RETENTION_MINUTES = 4 * 24 * 60
+
+# L1 (in-process) limits — one LRU per worker process
+L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "256"))
+L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Single-flight: how long followers wait for the leader's fetch (seconds)
+FETCH_WAIT_SECONDS = 30
+
+# Background refresh pool for stale-while-revalidate
+REFRESH_WORKERS = int(os.getenv("CACHE_REFRESH_WORKERS", "4"))
+
+# Negative caching: after the n-th consecutive failed/empty fetch of a key,
+# skip the upstream for NEGATIVE_TTL_SECONDS * 2**(n-1), capped
+NEGATIVE_TTL_SECONDS = 60
+NEGATIVE_MAX_BACKOFF_SECONDS = 30 * 60
+
+# Where lookup() data came from
+SOURCE_FRESH = "fresh"  # within TTL (cached or just fetched)
+SOURCE_STALE = "stale"  # past TTL: stale-while-revalidate or failure fallback
+SOURCE_NEGATIVE = "negative"  # no data; upstream failed or is backing off
+
+
+class CacheResult(NamedTuple):
+    data: Any
+    source: str
+
+
+def _estimate_size(data: Any) -> int:
+    """Approximate payload size in bytes (JSON-encoded length)."""
+    try:
+        return len(json.dumps(data, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class LocalLRUCache:
+    """
+    Thread-safe in-process LRU for cache payloads.
+
+    Each entry keeps the time it was stored upstream (epoch seconds), so
+    freshness is judged against the caller's TTL exactly like the DB tier.
+    Eviction is by least-recent use once either the entry or byte budget
+    is exceeded. Cached objects are shared — callers must not mutate them.
+    """
+
+    def __init__(self, max_entries: int = L1_MAX_ENTRIES, max_bytes: int = L1_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, ttl_minutes: Optional[float] = None) -> Optional[tuple]:
+        """
+        Return (data, stored_at) if present and younger than ttl_minutes.
+        Expired entries are kept (for stale serving) until LRU evicts them.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, stored_at, size = entry
+            if ttl_minutes is not None and time.time() - stored_at >= ttl_minutes * 60:
+                return None
+            self._entries.move_to_end(key)
+            return data, stored_at
+
+    def set(self, key: str, data: Any, stored_at: Optional[float] = None, size: Optional[int] = None):
+        """Insert or replace an entry, evicting LRU entries over budget."""
+        if size is None:
+            size = _estimate_size(data)
+        # A single oversized payload would flush the whole tier — keep it in L2 only
+        if self.max_entries <= 0 or size > self.max_bytes // 4:
+            self.delete(key)
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (data, stored_at or time.time(), size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._pop(oldest)
+                self._evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+            }
+
+    def _pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+
+# Shared by every CacheService instance in this process
+_l1 = LocalLRUCache()
+_stats_lock = threading.Lock()
+_stats = {
+    "l1": {"hits": 0, "misses": 0},
+    "l2": {"hits": 0, "misses": 0},
+}
+
+
+# Per-namespace counters: hits/stale/misses are lookups (lookup_seconds is
+# their total latency), fetches/fetch_errors are upstream calls (fetch_seconds)
+_ns_stats: Dict[str, dict] = {}
+
+
+def _record(tier: str, outcome: str):
+    with _stats_lock:
+        _stats[tier][outcome] += 1
+
+
+def _record_ns(key: str, outcome: str, seconds: float = 0.0):
+    namespace = namespace_of(key)
+    with _stats_lock:
+        counts = _ns_stats.get(namespace)
+        if counts is None:
+            counts = _ns_stats[namespace] = {
+                "hits": 0,
+                "stale": 0,
+                "misses": 0,
+                "negative": 0,
+                "backoff_skips": 0,
+                "fetches": 0,
+                "fetch_errors": 0,
+                "lookup_seconds": 0.0,
+                "fetch_seconds": 0.0,
+            }
+        counts[outcome] += 1
+        if outcome in ("fetches", "fetch_errors"):
+            counts["fetch_seconds"] += seconds
+        elif outcome in ("hits", "stale", "misses"):
+            counts["lookup_seconds"] += seconds
+
+
+def _namespace_report(counts: dict) -> dict:
+    lookups = counts["hits"] + counts["stale"] + counts["misses"]
+    fetches = counts["fetches"] + counts["fetch_errors"]
+    return {
+        "hits": counts["hits"],
+        "stale": counts["stale"],
+        "misses": counts["misses"],
+        "negative": counts["negative"],
+        "fetches": counts["fetches"],
+        "fetch_errors": counts["fetch_errors"],
+        "backoff_skips": counts["backoff_skips"],
+        "hit_rate": round(
+            (counts["hits"] + counts["stale"]) / lookups, 3
+        ) if lookups else 0.0,
+        "avg_lookup_ms": round(
+            counts["lookup_seconds"] * 1000 / lookups, 2
+        ) if lookups else 0.0,
+        "avg_fetch_ms": round(
+            counts["fetch_seconds"] * 1000 / fetches, 1
+        ) if fetches else 0.0,
+    }
+
+
+class _Flight:
+    """One in-progress fetch for a key; followers wait on `done`."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+
+
+_inflight: dict = {}
+_inflight_lock = threading.Lock()
+
+
+_refresh_pool = ThreadPoolExecutor(
+    max_workers=REFRESH_WORKERS, thread_name_prefix="cache-refresh"
+)
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+
+
+def _background_refresh(
+    key: str, fetcher_fn: Callable[[], Any], ttl_minutes: int, retention_minutes: int
+):
+    """Refresh one key on its own DB session (the request's is closed by now)."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        CacheService(db).refresh(
+            key, fetcher_fn, ttl_minutes, retention_minutes=retention_minutes
+        )
+    except Exception as e:
+        logger.error(f"Background refresh failed for '{key}': {e}")
+    finally:
+        db.close()
+        with _refreshing_lock:
+            _refreshing.discard(key)
 
 
 class CacheService:
-    """Centralized DB cache using MarketDataCache model."""
+    """Centralized two-tier cache (in-process LRU + shared storage backend)."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session], backend: Optional[CacheBackend] = None):
         self.db = db
+        if backend is None:
+            from services.service_factory import ServiceFactory
+
+            backend = ServiceFactory.get_cache_backend(db)
+        self.backend = backend
+
+    @staticmethod
+    def get_stats() -> dict:
+        """Hit/miss counts per tier and per namespace, plus L1 occupancy."""
+        from services.service_factory import ServiceFactory
+
+        with _stats_lock:
+            tiers = {tier: dict(counts) for tier, counts in _stats.items()}
+            namespaces = {
+                namespace: _namespace_report(counts)
+                for namespace, counts in sorted(_ns_stats.items())
+            }
+        for counts in tiers.values():
+            total = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = round(counts["hits"] / total, 3) if total else 0.0
+        tiers["l1"].update(_l1.stats())
+        tiers["l2"]["backend"] = ServiceFactory.get_cache_backend_name()
+        tiers["l2"]["codec"] = cache_codec.describe()
+        tiers["namespaces"] = namespaces
+        return tiers
 
     def get_cached(self, key: str, ttl_minutes: int = 15) -> Optional[Any]:
         """
         Get cached data if it exists and is not expired.
 
         Args:
-            key: Cache key (e.g. "US_INDICES", "BRIEFING_2026-02-11")
+            key: Cache key (e.g. "market:indices", "briefing:2026-02-11")
             ttl_minutes: Time-to-live in minutes
 
         Returns:
             Cached data dict/list or None if expired/missing
         """
-        try:
-            cache = (
-                self.db.query(MarketDataCache)
-                .filter(MarketDataCache.key == key)
-                .first()
-            )
-            if not cache:
-                return None
+        started = time.perf_counter()
+        data = self._lookup(key, ttl_minutes)
+        _record_ns(
+            key, "misses" if data is None else "hits", time.perf_counter() - started
+        )
+        return data
 
-            updated_at = cache.updated_at
-            if updated_at and updated_at.tzinfo is None:
-                updated_at = updated_at.replace(tzinfo=datetime.timezone.utc)
-
-            now = datetime.datetime.now(datetime.timezone.utc)
-            if updated_at and (now - updated_at) < datetime.timedelta(
-                minutes=ttl_minutes
-            ):
-                logger.info(
-                    f"Cache HIT for '{key}' (age: {(now - updated_at).seconds}s)"
-                )
-                return cache.data
-            else:
-                logger.info(f"Cache EXPIRED for '{key}'")
-                return None
+    def _lookup(self, key: str, ttl_minutes: float) -> Optional[Any]:
+        """get_cached without namespace metrics (used for internal re-checks)."""
+        # L1: in-process LRU
+        local = _l1.get(key, ttl_minutes)
+        if local is not None:
+            _record("l1", "hits")
+            self._touch(key)
+            return local[0]
+        _record("l1", "misses")
 
+        # L2: shared backend
+        try:
+            entry = self.backend.get(key)
         except Exception as e:
             logger.error(f"Cache read error for '{key}': {e}")
-            self.db.rollback()
+            _record("l2", "misses")
             return None
 
-    def save_cache(self, key: str, data: Any) -> bool:
+        if entry is None:
+            _record("l2", "misses")
+            return None
+
+        data, stored_at = entry
+        age = time.time() - stored_at
+        if age < ttl_minutes * 60:
+            logger.info(f"Cache HIT for '{key}' (age: {int(age)}s)")
+            _record("l2", "hits")
+            _l1.set(key, data, stored_at=stored_at)
+            return data
+
+        logger.info(f"Cache EXPIRED for '{key}'")
+        _record("l2", "misses")
+        return None
+
+    def get_many_cached(self, keys: Iterable[str], ttl_minutes: int = 15) -> Dict[str, Any]:
+        """
+        Batched get_cached: L1 first, then one backend round trip for the rest.
+
+        Returns:
+            {key: data} for keys that are present and fresh
+        """
+        started = time.perf_counter()
+        keys = list(keys)
+        results = {}
+        missing = []
+        for key in keys:
+            local = _l1.get(key, ttl_minutes)
+            if local is not None:
+                _record("l1", "hits")
+                self._touch(key)
+                results[key] = local[0]
+            else:
+                _record("l1", "misses")
+                missing.append(key)
+
+        entries = {}
+        if missing:
+            try:
+                entries = self.backend.get_many(missing)
+            except Exception as e:
+                logger.error(f"Cache multi-read error for {len(missing)} keys: {e}")
+
+        now = time.time()
+        for key in missing:
+            entry = entries.get(key)
+            if entry is not None and now - entry[1] < ttl_minutes * 60:
+                _record("l2", "hits")
+                _l1.set(key, entry[0], stored_at=entry[1])
+                results[key] = entry[0]
+            else:
+                _record("l2", "misses")
+
+        # One round trip serves every key — spread its latency across them
+        per_key = (time.perf_counter() - started) / len(keys) if keys else 0.0
+        for key in keys:
+            _record_ns(key, "hits" if key in results else "misses", per_key)
+        return results
+
+    def save_cache(
+        self, key: str, data: Any, retention_minutes: Optional[int] = None
+    ) -> bool:
         """
         Save data to cache. Upserts (update if exists, insert if not).
 
         Args:
             key: Cache key
             data: JSON-serializable data
+            retention_minutes: How long the backend keeps it (default 4 days)
 
         Returns:
             True if saved successfully
         """
+        # L1 is filled even if the L2 write fails, so this worker still benefits.
+        # Negative entries stay L2-only: another worker's successful fetch
+        # clears them there, and a local copy would outlive that
+        if not is_negative(key):
+            _l1.set(key, data)
+        retention = retention_minutes or DEFAULT_RETENTION_MINUTES
         try:
-            cache = (
-                self.db.query(MarketDataCache)
-                .filter(MarketDataCache.key == key)
-                .first()
-            )
-            if cache:
-                cache.data = data
-                cache.updated_at = func.now()
-            else:
-                new_cache = MarketDataCache(key=key, data=data)
-                self.db.add(new_cache)
-
-            self.db.commit()
+            self.backend.set(key, data, retention * 60)
             logger.info(f"Cache SAVED for '{key}'")
             return True
         except Exception as e:
             logger.error(f"Cache save error for '{key}': {e}")
-            self.db.rollback()
             return False
 
     def get_or_fetch(
@@ -107,63 +430,268 @@ class CacheService:
         key: str,
         fetcher_fn: Callable[[], Any],
         ttl_minutes: int = 15,
+        stale_ttl_minutes: Optional[int] = None,
     ) -> Optional[Any]:
         """
         Main method: get from cache or fetch fresh data.
+        Same as lookup(), returning only the data.
+        """
+        return self.lookup(key, fetcher_fn, ttl_minutes, stale_ttl_minutes).data
+
+    def lookup(
+        self,
+        key: str,
+        fetcher_fn: Callable[[], Any],
+        ttl_minutes: int = 15,
+        stale_ttl_minutes: Optional[int] = None,
+    ) -> CacheResult:
+        """
+        Get from cache or fetch fresh data, reporting where the data came from.
 
         If cache is valid, return cached data.
         If cache is expired/missing, call fetcher_fn, save result, return it.
         If fetcher_fn fails, return stale cache as fallback.
+        If fetcher_fn keeps failing (error or empty result), the key backs off:
+        further calls skip the upstream until the backoff window passes.
+
+        Concurrent misses for the same key are coalesced: one thread per
+        process fetches (others wait for its result) and a backend lock
+        (pg_advisory_lock / Redis SET NX) makes workers take turns,
+        re-checking the cache before fetching.
+
+        Stale-while-revalidate (opt-in via stale_ttl_minutes): an entry past
+        its TTL but younger than stale_ttl_minutes (the hard expiry) is
+        returned immediately and refreshed on a background thread. That
+        refresh calls fetcher_fn after this call has returned, so it must not
+        use the caller's DB session (open its own, e.g. with SessionLocal()).
 
         Args:
             key: Cache key
             fetcher_fn: Callable that returns fresh data
             ttl_minutes: TTL in minutes
+            stale_ttl_minutes: Hard expiry for stale serving (None = disabled)
 
         Returns:
-            Data (cached or fresh) or None if everything fails
+            CacheResult(data, source) — source is SOURCE_FRESH, SOURCE_STALE
+            or SOURCE_NEGATIVE (data is None)
         """
+        retention_minutes = max(
+            DEFAULT_RETENTION_MINUTES, ttl_minutes, stale_ttl_minutes or 0
+        )
+
         # 1. Try cache first
-        cached = self.get_cached(key, ttl_minutes)
+        started = time.perf_counter()
+        cached = self._lookup(key, ttl_minutes)
         if cached is not None:
-            return cached
+            _record_ns(key, "hits", time.perf_counter() - started)
+            return CacheResult(cached, SOURCE_FRESH)
 
-        # 2. Cache miss/expired — fetch fresh data
-        try:
-            logger.info(f"Fetching fresh data for '{key}'...")
-            fresh_data = fetcher_fn()
+        # 1b. Stale-while-revalidate: serve the expired entry, refresh later
+        if stale_ttl_minutes is not None:
+            entry = self._peek(key)
+            if entry is not None:
+                data, stored_at = entry
+                if time.time() - stored_at < stale_ttl_minutes * 60:
+                    logger.info(f"Cache STALE for '{key}', refreshing in background")
+                    _record_ns(key, "stale", time.perf_counter() - started)
+                    self._schedule_refresh(key, fetcher_fn, ttl_minutes, retention_minutes)
+                    return CacheResult(data, SOURCE_STALE)
+        _record_ns(key, "misses", time.perf_counter() - started)
 
-            if fresh_data is not None and fresh_data != {} and fresh_data != []:
-                self.save_cache(key, fresh_data)
-                return fresh_data
-            else:
-                logger.warning(f"Fetcher returned empty data for '{key}'")
+        # 2. Cache miss/expired — fetch now (unless backing off), then fall
+        #    back to stale data
+        result = self.refresh(
+            key, fetcher_fn, ttl_minutes, retention_minutes=retention_minutes
+        )
+        if result is not None:
+            return CacheResult(result, SOURCE_FRESH)
+        stale = self.get_stale(key)
+        if stale is not None:
+            return CacheResult(stale, SOURCE_STALE)
+        _record_ns(key, "negative")
+        return CacheResult(None, SOURCE_NEGATIVE)
 
-        except Exception as e:
-            logger.error(f"Fetcher failed for '{key}': {e}")
+    def refresh(
+        self,
+        key: str,
+        fetcher_fn: Callable[[], Any],
+        ttl_minutes: int = 15,
+        retention_minutes: Optional[int] = None,
+    ) -> Optional[Any]:
+        """
+        Fetch and store key unless it is already fresh, coalescing concurrent
+        callers into one fetch. Returns the data, or None if the fetch failed
+        or the key is in failure backoff.
+        """
+        with _inflight_lock:
+            flight = _inflight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                _inflight[key] = flight
+
+        if not is_leader:
+            logger.info(f"Waiting for in-flight fetch of '{key}'")
+            flight.done.wait(FETCH_WAIT_SECONDS)
+            return flight.result
 
-        # 3. Fallback: return stale cache if available
         try:
-            stale = (
-                self.db.query(MarketDataCache)
-                .filter(MarketDataCache.key == key)
-                .first()
+            flight.result = self._fetch_and_save(
+                key, fetcher_fn, ttl_minutes, retention_minutes
             )
-            if stale and stale.data:
-                logger.warning(f"Returning STALE cache for '{key}' as fallback")
-                return stale.data
-        except Exception:
-            pass
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+            flight.done.set()
 
-        return None
+        return flight.result
 
     def invalidate(self, key: str) -> bool:
-        """Remove a cache entry."""
+        """Remove a cache entry (L1 of this process and the shared backend)."""
+        _l1.delete(key)
         try:
-            self.db.query(MarketDataCache).filter(MarketDataCache.key == key).delete()
-            self.db.commit()
+            self.backend.delete(key)
             return True
         except Exception as e:
             logger.error(f"Cache invalidation error for '{key}': {e}")
-            self.db.rollback()
             return False
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Whatever is stored for key, ignoring TTL (fallback after a failed fetch)."""
+        entry = self._peek(key)
+        if entry is not None and entry[0]:
+            logger.warning(f"Returning STALE cache for '{key}' as fallback")
+            return entry[0]
+        return None
+
+    def _fetch_and_save(
+        self,
+        key: str,
+        fetcher_fn: Callable[[], Any],
+        ttl_minutes: int,
+        retention_minutes: Optional[int],
+    ) -> Optional[Any]:
+        """Run fetcher_fn under the cross-worker lock and cache its result."""
+        with self.backend.lock(key, FETCH_WAIT_SECONDS) as acquired:
+            if not acquired:
+                logger.warning(f"Cache lock timeout for '{key}', fetching anyway")
+
+            # Another worker may have refreshed the entry while we waited
+            cached = self._lookup(key, ttl_minutes)
+            if cached is not None:
+                return cached
+
+            failure = self._get_failure(key)
+            if self._backing_off(key, failure):
+                return None
+
+            started = time.perf_counter()
+            try:
+                logger.info(f"Fetching fresh data for '{key}'...")
+                fresh_data = fetcher_fn()
+            except Exception as e:
+                logger.error(f"Fetcher failed for '{key}': {e}")
+                self._fetch_failed(key, failure, str(e)[:200], started)
+                return None
+            return self._fetch_done(
+                key, fresh_data, failure, retention_minutes, started
+            )
+
+    def _backing_off(self, key: str, failure: Optional[dict]) -> bool:
+        """Recent failures: don't hit the upstream again until retry_at."""
+        if failure and failure.get("retry_at", 0) > time.time():
+            logger.info(
+                f"Cache NEGATIVE for '{key}' "
+                f"({failure.get('failures')} failures), skipping fetch"
+            )
+            _record_ns(key, "backoff_skips")
+            return True
+        return False
+
+    def _fetch_done(
+        self,
+        key: str,
+        fresh_data: Any,
+        failure: Optional[dict],
+        retention_minutes: Optional[int],
+        started: float,
+    ) -> Optional[Any]:
+        """Cache a fetcher's result, or back off if it came back empty."""
+        if fresh_data is None or fresh_data == {} or fresh_data == []:
+            logger.warning(f"Fetcher returned empty data for '{key}'")
+            self._fetch_failed(key, failure, "empty result", started)
+            return None
+        _record_ns(key, "fetches", time.perf_counter() - started)
+        self.save_cache(key, fresh_data, retention_minutes)
+        if failure:
+            self.invalidate(negative(key))
+        return fresh_data
+
+    def _fetch_failed(
+        self, key: str, failure: Optional[dict], reason: str, started: float
+    ):
+        _record_ns(key, "fetch_errors", time.perf_counter() - started)
+        self._record_failure(key, failure, reason)
+
+    def _get_failure(self, key: str) -> Optional[dict]:
+        """Negative entry for key: {"failures", "retry_at", "reason"} or None."""
+        entry = self._peek(negative(key))
+        return entry[0] if entry is not None else None
+
+    def _record_failure(self, key: str, previous: Optional[dict], reason: str):
+        """Store/extend the negative entry with exponential backoff."""
+        failures = (previous or {}).get("failures", 0) + 1
+        backoff = min(
+            NEGATIVE_TTL_SECONDS * 2 ** (failures - 1), NEGATIVE_MAX_BACKOFF_SECONDS
+        )
+        logger.warning(f"Backing off '{key}' for {backoff}s after {failures} failures")
+        # Kept past retry_at so the next failure escalates instead of resetting
+        self.save_cache(
+            negative(key),
+            {"failures": failures, "retry_at": time.time() + backoff, "reason": reason},
+            retention_minutes=max(2 * backoff, NEGATIVE_MAX_BACKOFF_SECONDS) // 60,
+        )
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        fetcher_fn: Callable[[], Any],
+        ttl_minutes: int,
+        retention_minutes: int,
+    ):
+        """Queue one background refresh per key (duplicates are dropped)."""
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+        try:
+            _refresh_pool.submit(
+                _background_refresh, key, fetcher_fn, ttl_minutes, retention_minutes
+            )
+        except RuntimeError:
+            # Pool is shut down (interpreter exiting)
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    def _touch(self, key: str):
+        """Tell the backend an L1 hit happened (feeds the janitor's LRU order)."""
+        try:
+            self.backend.touch(key)
+        except Exception as e:
+            logger.warning(f"Cache touch failed for '{key}': {e}")
+
+    def _peek(self, key: str) -> Optional[tuple]:
+        """(data, stored_at epoch) for key regardless of age, or None."""
+        local_ok = not is_negative(key)
+        local = _l1.get(key) if local_ok else None
+        if local is not None:
+            self._touch(key)
+            return local
+        try:
+            entry = self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Cache peek error for '{key}': {e}")
+            return None
+        if entry is not None and local_ok:
+            _l1.set(key, entry[0], stored_at=entry[1])
+        return entry
@@ -0,0 +1,272 @@
+"""
+Cache Warmer - Refreshes hot cache keys shortly before they expire,
+so the first user after a TTL boundary never pays the upstream fetch.
+
+Which keys are warmed, and how often, follows the KST session from
+SystemService.get_current_app_mode():
+  KR_MARKET:    indices + watchlist stock details
+  US_PRE:       indices + US movers + Fear & Greed
+  US_MARKET:    indices + US movers + Fear & Greed
+  GLOBAL_BRIEF: everything, including today's briefing
+
+Runs in-process (CACHE_WARMER=true starts it with the API) or standalone
+via `python warm_cache.py`. Multiple warmers are safe: refreshes go through
+CacheService's single-flight lock, which re-checks freshness before fetching.
+"""
+
+import logging
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, List, Optional, Tuple
+
+from services import cache_keys
+from services.cache_service import CacheService, TTL_BRIEFING
+from services.system_service import SystemService
+from services.ttl_policy import TTLPolicy
+
+logger = logging.getLogger(__name__)
+
+# (cache key, fetcher, TTL minutes minus the refresh lead)
+WarmTarget = Tuple[str, Callable[[], Any], float]
+
+
+class CacheWarmer:
+    """Background refresher for session-relevant cache keys."""
+
+    # Target groups per app mode
+    MODE_GROUPS = {
+        "KR_MARKET": ["indices", "watchlist"],
+        "US_PRE": ["indices", "movers", "fear_greed"],
+        "US_MARKET": ["indices", "movers", "fear_greed"],
+        "GLOBAL_BRIEF": ["indices", "movers", "fear_greed", "briefing", "watchlist"],
+    }
+
+    # Seconds between passes — tighter while a market is trading
+    PASS_INTERVAL_SECONDS = {
+        "KR_MARKET": 60,
+        "US_PRE": 120,
+        "US_MARKET": 60,
+        "GLOBAL_BRIEF": 120,
+    }
+
+    # Refresh once less than this much TTL remains (should exceed the pass interval)
+    REFRESH_LEAD_SECONDS = 180
+
+    # Pause after each upstream fetch so a pass never bursts (Yahoo throttles)
+    MIN_FETCH_GAP_SECONDS = 1.0
+
+    # Upper bound on watchlist tickers warmed per pass
+    MAX_WATCHLIST_TICKERS = 50
+
+    def __init__(self, session_factory=None, system_service: Optional[SystemService] = None):
+        if session_factory is None:
+            from database import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.system_service = system_service or SystemService()
+        self.ttl_policy = TTLPolicy(self.system_service)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> dict:
+        """
+        Warm every target for the current mode.
+
+        Returns:
+            Summary dict: mode, checked, refreshed, failed (list of keys)
+        """
+        mode = self.system_service.get_current_app_mode()["mode"]
+        summary = {"mode": mode, "checked": 0, "refreshed": 0, "failed": []}
+
+        db = self.session_factory()
+        try:
+            cache = CacheService(db)
+            for key, fetcher_fn, ttl_minutes in self.get_targets(db, mode):
+                summary["checked"] += 1
+                fetched = []
+
+                def tracked_fetch(fn=fetcher_fn):
+                    fetched.append(True)
+                    return fn()
+
+                try:
+                    # ttl_minutes already includes the lead window, so the
+                    # entry counts as expired shortly before users see it expire
+                    result = cache.refresh(key, tracked_fetch, ttl_minutes)
+                    if result is None:
+                        summary["failed"].append(key)
+                except Exception as e:
+                    logger.error(f"Warm failed for '{key}': {e}")
+                    summary["failed"].append(key)
+
+                if fetched:
+                    summary["refreshed"] += 1
+                    if self._stop.wait(self.MIN_FETCH_GAP_SECONDS):
+                        break
+        finally:
+            db.close()
+
+        logger.info(
+            f"Cache warm pass ({mode}): {summary['refreshed']}/{summary['checked']} "
+            f"refreshed, {len(summary['failed'])} failed"
+        )
+        return summary
+
+    def get_targets(self, db, mode: str) -> List[WarmTarget]:
+        """Cache keys (with the same fetchers/TTLs as the routers) for a mode."""
+        from services.service_factory import ServiceFactory
+
+        market_service = ServiceFactory.get_market_data_service(db)
+        groups = self.MODE_GROUPS.get(mode, ["indices"])
+        targets: List[WarmTarget] = []
+
+        lead = self.REFRESH_LEAD_SECONDS / 60
+
+        if "indices" in groups:
+            indices_ttl = self.ttl_policy.ttl_for("indices", lead_minutes=lead)
+            targets.append(
+                (
+                    cache_keys.MARKET_INDICES,
+                    market_service.get_market_indices,
+                    indices_ttl,
+                )
+            )
+
+        if "movers" in groups:
+            movers_ttl = self.ttl_policy.ttl_for("movers", lead_minutes=lead)
+            if hasattr(market_service, "get_top_gainers"):
+                targets.append(
+                    (
+                        cache_keys.MARKET_GAINERS,
+                        market_service.get_top_gainers,
+                        movers_ttl,
+                    )
+                )
+            if hasattr(market_service, "get_top_losers"):
+                targets.append(
+                    (
+                        cache_keys.MARKET_LOSERS,
+                        market_service.get_top_losers,
+                        movers_ttl,
+                    )
+                )
+
+        if "fear_greed" in groups:
+            from services.briefing_service import fetch_fear_greed
+
+            targets.append(
+                (
+                    cache_keys.FEAR_GREED,
+                    fetch_fear_greed,
+                    self.ttl_policy.ttl_for("fear_greed", lead_minutes=lead),
+                )
+            )
+
+        if "briefing" in groups:
+            targets.append(
+                (
+                    cache_keys.briefing(date.today()),
+                    lambda: self._build_briefing(),
+                    max(TTL_BRIEFING - lead, 0),
+                )
+            )
+
+        if "watchlist" in groups and hasattr(market_service, "get_stock_detail"):
+            tickers = self._watchlist_tickers(db)
+            fetch_detail = self._batched_details(market_service, tickers)
+            for ticker in tickers:
+                targets.append(
+                    (
+                        cache_keys.stock_detail(ticker),
+                        lambda t=ticker: fetch_detail(t),
+                        self.ttl_policy.ttl_for(
+                            "stock_detail", ticker=ticker, lead_minutes=lead
+                        ),
+                    )
+                )
+
+        return targets
+
+    @staticmethod
+    def _batched_details(market_service, tickers: List[str]):
+        """
+        Per-ticker stock detail fetcher that loads every watchlist ticker in
+        one batch (quotes + reference data) on the first call, if supported.
+        """
+        if not hasattr(market_service, "get_stock_details"):
+            return market_service.get_stock_detail
+        details: dict = {}
+        loaded = []
+
+        def fetch(ticker: str):
+            if not loaded:
+                loaded.append(True)
+                details.update(market_service.get_stock_details(tickers))
+            return details.pop(ticker, None)
+
+        return fetch
+
+    def start(self) -> threading.Thread:
+        """Run passes on a daemon thread until stop() is called."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever, name="cache-warmer", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self):
+        logger.info("Cache warmer started")
+        while not self._stop.is_set():
+            mode = "GLOBAL_BRIEF"
+            started = time.monotonic()
+            try:
+                mode = self.run_once()["mode"]
+            except Exception as e:
+                logger.error(f"Cache warm pass failed: {e}")
+            interval = self.PASS_INTERVAL_SECONDS.get(mode, 120)
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
+        logger.info("Cache warmer stopped")
+
+    def _build_briefing(self) -> dict:
+        """Regenerate today's DailyBriefing row; cached value records the run."""
+        from services.briefing_service import create_briefing_for_today
+
+        db = self.session_factory()
+        try:
+            briefing = create_briefing_for_today(db)
+            return {
+                "date": str(briefing.date),
+                "market_sentiment": briefing.market_sentiment,
+                "fear_greed_score": briefing.fear_greed_score,
+            }
+        finally:
+            db.close()
+
+    def _watchlist_tickers(self, db) -> List[str]:
+        """
+        Watchlist stocks as yfinance symbols (005930 -> 005930.KS), the
+        tickers clients request /market/stock/{ticker} with.
+        """
+        from models import Watchlist
+        from services.constituents import to_yahoo_symbol
+
+        try:
+            rows = (
+                db.query(Watchlist.stock_kr_ticker)
+                .distinct()
+                .limit(self.MAX_WATCHLIST_TICKERS)
+                .all()
+            )
+            return list(dict.fromkeys(to_yahoo_symbol(row[0]) for row in rows))
+        except Exception as e:
+            logger.warning(f"Watchlist lookup failed: {e}")
+            db.rollback()
+            return []
@@ -3,9 +3,11 @@ import json
 from datetime import date, datetime
 from typing import List, Dict, Optional
 
-import requests
 from bs4 import BeautifulSoup
 
+from services import upstream
+from services.http_client import HttpClient, get_http_client
+
 logger = logging.getLogger(__name__)
 
 # Major tickers for earnings calendar
@@ -22,6 +24,9 @@ class CalendarService:
     _fomc_cache_time: Optional[datetime] = None
     _earnings_cache: dict = {}  # {(year,month): (data, timestamp)}
 
+    def __init__(self, http: HttpClient = None):
+        self.http = http or get_http_client()
+
     def get_monthly_events(self, year: int, month: int) -> List[Dict]:
         """
         Get real economic events and earnings for a specific month.
@@ -63,12 +68,10 @@ class CalendarService:
             return []
 
         results = []
-        import time
         for ticker in EARNINGS_TICKERS:
             try:
-                tk = yf.Ticker(ticker)
-                cal = tk.calendar
-                time.sleep(0.3)  # Rate limit: ~3 req/sec
+                # Rate limited by the shared Yahoo bucket (services/upstream.py)
+                cal = upstream.call(upstream.YAHOO, lambda: yf.Ticker(ticker).calendar)
                 if not cal or "Earnings Date" not in cal:
                     continue
                 for ed in cal["Earnings Date"]:
@@ -120,7 +123,12 @@ class CalendarService:
         try:
             import re
             url = "https://www.federalreserve.gov/monetarypolicy/fomccalendars.htm"
-            r = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
+            r = upstream.get(
+                url,
+                client=self.http,
+                timeout=10,
+                headers={"User-Agent": "Mozilla/5.0"},
+            )
             if r.status_code != 200:
                 return []
 
@@ -0,0 +1,196 @@
+"""
+Index Constituents - Maintained S&P 500 / NASDAQ-100 membership.
+
+The market mover universe (top gainers/losers) is every member of the
+indexes in MOVER_INDEXES, read from the index_constituents table instead of
+a hard-coded list. sync_constituents() refreshes the table from the
+Wikipedia constituent lists: members are upserted and tickers that left an
+index are removed. Run it periodically via `python sync_constituents.py`;
+membership changes a few times a quarter.
+"""
+
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from io import StringIO
+from typing import Dict, Iterable, NamedTuple, Optional
+
+import pandas as pd
+
+from models import IndexConstituent
+from services import upstream
+from services.http_client import HttpClient
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSource(NamedTuple):
+    url: str
+    match: str  # text inside the constituents table (pd.read_html match=)
+    symbol: str  # column names in that table
+    name: str
+    sector: str
+
+
+INDEX_SOURCES = {
+    "SP500": IndexSource(
+        "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies",
+        "GICS Sector",
+        "Symbol",
+        "Security",
+        "GICS Sector",
+    ),
+    "NDX": IndexSource(
+        "https://en.wikipedia.org/wiki/Nasdaq-100",
+        "GICS Sector",
+        "Ticker",
+        "Company",
+        "GICS Sector",
+    ),
+}
+
+# Indexes whose members make up the mover universe (comma-separated)
+MOVER_INDEXES = tuple(
+    name.strip().upper()
+    for name in os.getenv("MOVER_INDEXES", "SP500,NDX").split(",")
+    if name.strip()
+)
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; TaragaBot/1.0)"}
+
+
+_KRX_CODE = re.compile(r"^\d{6}$")
+_KRX_SYMBOL = re.compile(r"^\d{6}\.(KS|KQ)$")
+
+
+def to_yahoo_symbol(symbol: str) -> str:
+    """
+    Exchange symbol -> yfinance symbol (BRK.B -> BRK-B).
+
+    Bare 6-digit KRX codes get the .KS suffix, as on the dashboard's stock
+    page; symbols already suffixed .KS/.KQ are kept as they are.
+    """
+    symbol = str(symbol).strip().upper()
+    if _KRX_CODE.match(symbol):
+        return f"{symbol}.KS"
+    if _KRX_SYMBOL.match(symbol):
+        return symbol
+    return symbol.replace(".", "-")
+
+
+def fetch_constituents(
+    index_name: str, http: Optional[HttpClient] = None
+) -> pd.DataFrame:
+    """
+    Current members of an index from its Wikipedia table.
+
+    Returns:
+        DataFrame with ticker / name / sector columns (raises on failure)
+    """
+    source = INDEX_SOURCES[index_name]
+    response = upstream.get(source.url, client=http, headers=HEADERS, timeout=15)
+    response.raise_for_status()
+    for table in pd.read_html(StringIO(response.text), match=source.match):
+        if source.symbol in table.columns:
+            df = table[[source.symbol, source.name, source.sector]].copy()
+            df.columns = ["ticker", "name", "sector"]
+            df["ticker"] = df["ticker"].map(to_yahoo_symbol)
+            return df.drop_duplicates("ticker")
+    raise ValueError(f"No constituents table found for {index_name}")
+
+
+def sync_constituents(
+    indexes: Optional[Iterable[str]] = None,
+    session_factory=None,
+    http: Optional[HttpClient] = None,
+) -> dict:
+    """
+    Refresh index_constituents for each index.
+
+    An index whose download fails (or looks truncated) keeps its stored
+    members, so a bad fetch never shrinks the universe.
+
+    Returns:
+        {index_name: {"members", "added", "removed"} or {"error"}}
+    """
+    if session_factory is None:
+        from database import SessionLocal
+
+        session_factory = SessionLocal
+
+    summary = {}
+    db = session_factory()
+    try:
+        for index_name in indexes or INDEX_SOURCES:
+            try:
+                df = fetch_constituents(index_name, http)
+                if len(df) < 50:
+                    raise ValueError(f"only {len(df)} members parsed")
+            except Exception as e:
+                logger.error(f"Constituent sync failed for {index_name}: {e}")
+                summary[index_name] = {"error": str(e)[:200]}
+                continue
+
+            now = datetime.now(timezone.utc)
+            stored = {
+                row.ticker: row
+                for row in db.query(IndexConstituent).filter(
+                    IndexConstituent.index_name == index_name
+                )
+            }
+            members = set(df["ticker"])
+            for item in df.itertuples(index=False):
+                row = stored.get(item.ticker)
+                if row is None:
+                    row = IndexConstituent(index_name=index_name, ticker=item.ticker)
+                    db.add(row)
+                row.name = item.name
+                row.sector = item.sector
+                row.updated_at = now
+            removed = [row for ticker, row in stored.items() if ticker not in members]
+            for row in removed:
+                db.delete(row)
+            db.commit()
+
+            summary[index_name] = {
+                "members": len(members),
+                "added": len(members - set(stored)),
+                "removed": len(removed),
+            }
+            logger.info(f"Constituents ({index_name}): {summary[index_name]}")
+    finally:
+        db.close()
+    return summary
+
+
+def load_universe(
+    indexes: Iterable[str] = MOVER_INDEXES, session_factory=None
+) -> Dict[str, dict]:
+    """
+    Members of the given indexes, deduplicated across them.
+
+    Returns:
+        {ticker: {"name", "sector"}}; empty if the table is empty or
+        unreadable, so callers can fall back to their own list
+    """
+    if session_factory is None:
+        from database import SessionLocal
+
+        session_factory = SessionLocal
+
+    try:
+        db = session_factory()
+        try:
+            rows = (
+                db.query(IndexConstituent)
+                .filter(IndexConstituent.index_name.in_(list(indexes)))
+                .order_by(IndexConstituent.ticker)
+                .all()
+            )
+        finally:
+            db.close()
+    except Exception as e:
+        logger.warning(f"Constituents unavailable: {e}")
+        return {}
+    return {row.ticker: {"name": row.name, "sector": row.sector} for row in rows}
@@ -0,0 +1,544 @@
+"""
+History Store - Local daily OHLCV bars shared by every yfinance consumer.
+
+Bars live in the price_history table keyed by (ticker, date), with per-ticker
+coverage in price_history_sync. A request for N days of history:
+  1. Backfills tickers never seen (or not covered that far back) once
+  2. Otherwise, if the ticker hasn't been synced within max_age_minutes,
+     downloads only the tail since its last stored bar (plus a few days of
+     overlap to pick up revisions and the still-forming bar)
+  3. Reads everything from the table
+
+If an overlapping bar's close moved (a split/dividend re-adjusted the
+series), that ticker is re-backfilled. Tickers are split into chunks per
+start date, downloaded on a bounded thread pool and retried per chunk. Bars
+are adjusted (auto_adjust=True), matching yf.Ticker.history(). The async
+market service runs the same plan/store steps (plan_sync, apply_sync) with
+its own chart-API downloads.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import pandas as pd
+import yfinance as yf
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from yfinance.exceptions import YFTickerMissingError
+
+from models import PriceHistory, PriceHistorySync
+from services import upstream
+
+logger = logging.getLogger(__name__)
+
+# Re-check a ticker's tail at most this often (minutes), across all workers
+SYNC_INTERVAL_MINUTES = int(os.getenv("HISTORY_SYNC_MINUTES", "5"))
+
+# Tail downloads start this many days before the last stored bar
+TAIL_OVERLAP_DAYS = 5
+
+# Tickers per download chunk, and chunks downloaded concurrently
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("HISTORY_DOWNLOAD_CHUNK", "25"))
+DOWNLOAD_THREADS = int(os.getenv("HISTORY_DOWNLOAD_THREADS", "16"))
+
+# Extra attempts for a chunk's failed tickers, and the first retry delay (doubles)
+DOWNLOAD_RETRIES = int(os.getenv("HISTORY_DOWNLOAD_RETRIES", "2"))
+DOWNLOAD_RETRY_SECONDS = 1.0
+
+# Relative close difference on an overlapping bar that means "re-adjusted"
+ADJUSTMENT_TOLERANCE = 0.002
+
+# yfinance period strings -> calendar days
+PERIOD_DAYS = {"5d": 10, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731}
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class SyncRequest(NamedTuple):
+    """One download a sync needs: these tickers' bars from start to today."""
+
+    tickers: List[str]
+    start: date
+    backfill: bool  # coverage extends back to start (else a tail refresh)
+    replace: bool = False  # drop the stored bars first (re-adjusted series)
+
+
+def period_to_days(period: str) -> int:
+    """Calendar days covering a yfinance period string (default 1mo)."""
+    return PERIOD_DAYS.get(period, 31)
+
+
+class HistoryStore:
+    """Incrementally synced daily bars, read back as yfinance-shaped DataFrames."""
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from database import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        # Per-ticker locks around the upsert; downloads run unlocked, so two
+        # callers may fetch the same tail, but their writes don't interleave
+        self._ticker_locks: Dict[str, threading.Lock] = {}
+        self._ticker_locks_guard = threading.Lock()
+
+    def get_history(
+        self,
+        tickers: Iterable[str],
+        days: int = 31,
+        max_age_minutes: float = SYNC_INTERVAL_MINUTES,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Daily bars for the last `days` calendar days.
+
+        Args:
+            tickers: yfinance symbols
+            days: Calendar days of history
+            max_age_minutes: Skip the upstream for tickers synced this recently
+
+        Returns:
+            {ticker: DataFrame indexed by Date with Open/High/Low/Close/Volume};
+            tickers with no data are omitted
+        """
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        if not tickers:
+            return {}
+        start = date.today() - timedelta(days=days)
+
+        with self._session() as db:
+            readjusted: List[str] = []
+            for request in self._plan(db, tickers, start, max_age_minutes):
+                frames = download_history(request.tickers, request.start)
+                readjusted += self._apply(db, request, frames)
+            for request in self._readjust_requests(db, readjusted):
+                frames = download_history(request.tickers, request.start)
+                if frames:
+                    self._apply(db, request, frames)
+            return self._read(db, tickers, start)
+
+    # The same steps on short-lived sessions, for callers that download
+    # elsewhere (services/async_market_service.py fetches on the event loop)
+
+    def plan_sync(
+        self,
+        tickers: Iterable[str],
+        days: int = 31,
+        max_age_minutes: float = SYNC_INTERVAL_MINUTES,
+    ) -> List[SyncRequest]:
+        """Downloads get_history() would make (start date -> tickers)."""
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        if not tickers:
+            return []
+        start = date.today() - timedelta(days=days)
+        with self._session() as db:
+            return self._plan(db, tickers, start, max_age_minutes)
+
+    def apply_sync(
+        self, request: SyncRequest, frames: Dict[str, pd.DataFrame]
+    ) -> List[str]:
+        """
+        Store one request's downloaded bars.
+
+        Returns:
+            Tickers whose series was re-adjusted upstream (pass them to
+            readjust_requests() and download again)
+        """
+        with self._session() as db:
+            return self._apply(db, request, frames)
+
+    def readjust_requests(self, tickers: List[str]) -> List[SyncRequest]:
+        """Full re-downloads that replace the tickers' stored bars."""
+        with self._session() as db:
+            return self._readjust_requests(db, tickers)
+
+    def read(self, tickers: Iterable[str], days: int = 31) -> Dict[str, pd.DataFrame]:
+        """Stored bars for the last `days` calendar days, without syncing."""
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        if not tickers:
+            return {}
+        with self._session() as db:
+            return self._read(db, tickers, date.today() - timedelta(days=days))
+
+    @contextmanager
+    def _session(self):
+        db = self.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def _plan(
+        self, db: Session, tickers: List[str], start: date, max_age_minutes: float
+    ) -> List[SyncRequest]:
+        now = datetime.now(timezone.utc)
+        metas = {
+            meta.ticker: meta
+            for meta in db.query(PriceHistorySync)
+            .filter(PriceHistorySync.ticker.in_(tickers))
+            .all()
+        }
+
+        # start date -> tickers to download from there
+        backfill: Dict[date, List[str]] = defaultdict(list)
+        tails: Dict[date, List[str]] = defaultdict(list)
+        for ticker in tickers:
+            meta = metas.get(ticker)
+            if meta is not None and meta.synced_at is not None:
+                synced_at = meta.synced_at
+                if synced_at.tzinfo is None:
+                    synced_at = synced_at.replace(tzinfo=timezone.utc)
+                fresh = now - synced_at < timedelta(minutes=max_age_minutes)
+            else:
+                fresh = False
+
+            if meta is None or meta.last_date is None:
+                if not fresh:
+                    backfill[start].append(ticker)
+            elif meta.first_date > start:
+                # Deeper than ever requested (e.g. a 30-day page after a
+                # 10-day quote): backfill even if the tail is fresh
+                backfill[start].append(ticker)
+            elif not fresh:
+                tails[meta.last_date - timedelta(days=TAIL_OVERLAP_DAYS)].append(ticker)
+
+        return [
+            SyncRequest(group, from_date, backfill=True)
+            for from_date, group in backfill.items()
+        ] + [
+            SyncRequest(group, from_date, backfill=False)
+            for from_date, group in tails.items()
+        ]
+
+    def _apply(
+        self, db: Session, request: SyncRequest, frames: Dict[str, pd.DataFrame]
+    ) -> List[str]:
+        readjusted = []
+        if not request.backfill:
+            last_dates = dict(
+                db.query(PriceHistorySync.ticker, PriceHistorySync.last_date)
+                .filter(PriceHistorySync.ticker.in_(list(frames)))
+                .all()
+            )
+            readjusted = [
+                ticker
+                for ticker, df in frames.items()
+                if last_dates.get(ticker)
+                and self._was_readjusted(db, ticker, df, last_dates[ticker])
+            ]
+        self._store(
+            db,
+            request.tickers,
+            frames,
+            request.start if request.backfill else None,
+            replace=request.replace,
+        )
+        return readjusted
+
+    def _readjust_requests(self, db: Session, tickers: List[str]) -> List[SyncRequest]:
+        """Split/dividend re-adjusted the whole series: replace it."""
+        if not tickers:
+            return []
+        first_dates = dict(
+            db.query(PriceHistorySync.ticker, PriceHistorySync.first_date)
+            .filter(PriceHistorySync.ticker.in_(tickers))
+            .all()
+        )
+        requests = []
+        for ticker in dict.fromkeys(tickers):
+            if first_dates.get(ticker) is None:
+                continue
+            logger.info(f"History for {ticker} was re-adjusted, re-backfilling")
+            requests.append(
+                SyncRequest([ticker], first_dates[ticker], backfill=True, replace=True)
+            )
+        return requests
+
+    def _was_readjusted(
+        self, db: Session, ticker: str, df: pd.DataFrame, last_date: date
+    ) -> bool:
+        """Compare the oldest completed overlapping bar with what's stored."""
+        overlap = [idx for idx in df.index if idx.date() < last_date]
+        if not overlap:
+            return False
+        bar_date = overlap[0].date()
+        stored = (
+            db.query(PriceHistory.close)
+            .filter(PriceHistory.ticker == ticker, PriceHistory.date == bar_date)
+            .scalar()
+        )
+        if not stored:
+            return False
+        fresh_close = float(df.loc[overlap[0], "Close"])
+        return abs(fresh_close - stored) / stored > ADJUSTMENT_TOLERANCE
+
+    def _store(
+        self,
+        db: Session,
+        tickers: List[str],
+        frames: Dict[str, pd.DataFrame],
+        backfilled_from: Optional[date],
+        replace: bool = False,
+    ):
+        """
+        Upsert bars and coverage under the tickers' locks; tickers without
+        data are marked synced too. replace=True drops their stored bars first.
+        """
+        rows = []
+        for ticker, df in frames.items():
+            for idx, bar in df.iterrows():
+                rows.append(
+                    {
+                        "ticker": ticker,
+                        "date": idx.date(),
+                        "open": _float_or_none(bar.get("Open")),
+                        "high": _float_or_none(bar.get("High")),
+                        "low": _float_or_none(bar.get("Low")),
+                        "close": _float_or_none(bar.get("Close")),
+                        "volume": _int_or_none(bar.get("Volume")),
+                    }
+                )
+        last_dates = {
+            ticker: df.index[-1].date() for ticker, df in frames.items() if len(df)
+        }
+
+        with self._locked(tickers):
+            try:
+                if replace:
+                    db.query(PriceHistory).filter(
+                        PriceHistory.ticker.in_(tickers)
+                    ).delete(synchronize_session=False)
+                if rows:
+                    if db.get_bind().dialect.name == "postgresql":
+                        stmt = pg_insert(PriceHistory).values(rows)
+                        stmt = stmt.on_conflict_do_update(
+                            index_elements=[PriceHistory.ticker, PriceHistory.date],
+                            set_={
+                                col: stmt.excluded[col]
+                                for col in ("open", "high", "low", "close", "volume")
+                            },
+                        )
+                        db.execute(stmt)
+                    else:
+                        for row in rows:
+                            db.merge(PriceHistory(**row))
+
+                # Read coverage under the lock: another caller may have synced
+                # these since they were planned
+                metas = {
+                    meta.ticker: meta
+                    for meta in db.query(PriceHistorySync)
+                    .filter(PriceHistorySync.ticker.in_(tickers))
+                    .populate_existing()
+                }
+                now = datetime.now(timezone.utc)
+                for ticker in tickers:
+                    last_date = last_dates.get(ticker)
+                    meta = metas.get(ticker)
+                    if meta is None:
+                        meta = PriceHistorySync(
+                            ticker=ticker, first_date=backfilled_from or date.today()
+                        )
+                        db.add(meta)
+                        metas[ticker] = meta
+                    elif backfilled_from is not None:
+                        meta.first_date = min(meta.first_date, backfilled_from)
+                    if last_date is not None:
+                        meta.last_date = max(meta.last_date or last_date, last_date)
+                    meta.synced_at = now
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+    @contextmanager
+    def _locked(self, tickers: Iterable[str]):
+        """Hold the tickers' locks (acquired in sorted order, so no deadlocks)."""
+        with self._ticker_locks_guard:
+            locks = [
+                self._ticker_locks.setdefault(ticker, threading.Lock())
+                for ticker in sorted(set(tickers))
+            ]
+        with ExitStack() as stack:
+            for lock in locks:
+                stack.enter_context(lock)
+            yield
+
+    def _read(
+        self, db: Session, tickers: List[str], start: date
+    ) -> Dict[str, pd.DataFrame]:
+        rows = (
+            db.query(
+                PriceHistory.ticker,
+                PriceHistory.date,
+                PriceHistory.open,
+                PriceHistory.high,
+                PriceHistory.low,
+                PriceHistory.close,
+                PriceHistory.volume,
+            )
+            .filter(PriceHistory.ticker.in_(tickers), PriceHistory.date >= start)
+            .order_by(PriceHistory.ticker, PriceHistory.date)
+            .all()
+        )
+        if not rows:
+            return {}
+
+        table = pd.DataFrame.from_records(rows, columns=["ticker", "Date"] + COLUMNS)
+        table["Date"] = pd.to_datetime(table["Date"])
+        return {
+            ticker: group.drop(columns="ticker").set_index("Date")
+            for ticker, group in table.groupby("ticker", sort=False)
+        }
+
+
+def download_history(tickers: List[str], start: date) -> Dict[str, pd.DataFrame]:
+    """
+    Daily bars from start to today, split per ticker.
+
+    Tickers go DOWNLOAD_CHUNK_SIZE per chunk, with at most DOWNLOAD_THREADS
+    chunks in flight. Chunks fetch per ticker through yf.Ticker.history()
+    (what yf.download does internally) because yf.download keeps its results
+    in module globals, so concurrent calls would mix up tickers. A ticker
+    Yahoo reports as missing is not retried; other failures are retried per
+    chunk, and a chunk that still fails only loses its tickers.
+
+    Returns:
+        {ticker: DataFrame} for tickers that returned bars
+    """
+    tickers = list(dict.fromkeys(tickers))
+    chunks = [
+        tickers[i : i + DOWNLOAD_CHUNK_SIZE]
+        for i in range(0, len(tickers), DOWNLOAD_CHUNK_SIZE)
+    ]
+    frames: Dict[str, pd.DataFrame] = {}
+    if len(chunks) > 1 and DOWNLOAD_THREADS > 1:
+        workers = min(DOWNLOAD_THREADS, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for chunk_frames in pool.map(lambda c: _download_chunk(c, start), chunks):
+                frames.update(chunk_frames)
+    else:
+        for chunk in chunks:
+            frames.update(_download_chunk(chunk, start))
+
+    missing = [t for t in tickers if t not in frames]
+    if missing:
+        logger.warning(
+            f"No bars since {start} for {len(missing)}/{len(tickers)} tickers: "
+            f"{', '.join(missing[:10])}"
+        )
+    return frames
+
+
+def _download_chunk(chunk: List[str], start: date) -> Dict[str, pd.DataFrame]:
+    """One chunk's bars; tickers that errored are retried with backoff."""
+    frames: Dict[str, pd.DataFrame] = {}
+    pending = chunk
+    errors: Dict[str, str] = {}
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        if attempt:
+            time.sleep(DOWNLOAD_RETRY_SECONDS * 2 ** (attempt - 1))
+        errors = {}
+        for ticker in pending:
+            try:
+                df = upstream.call(
+                    upstream.YAHOO,
+                    yf.Ticker(ticker).history,
+                    start=start.isoformat(),
+                    auto_adjust=True,
+                    raise_errors=True,
+                    passthrough=(YFTickerMissingError,),
+                )
+            except YFTickerMissingError:
+                continue
+            except Exception as e:
+                errors[ticker] = str(e)[:200]
+                continue
+            frames.update(split_download(_naive_index(df), [ticker]))
+        pending = list(errors)
+        if not pending:
+            break
+    if pending:
+        logger.error(
+            f"History download failed for {len(pending)}/{len(chunk)} tickers "
+            f"after {DOWNLOAD_RETRIES + 1} attempts: {errors[pending[0]]}"
+        )
+    return frames
+
+
+def _naive_index(df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """Daily bars indexed by exchange-local dates without a timezone."""
+    if df is not None and getattr(df.index, "tz", None) is not None:
+        df = df.copy()
+        df.index = df.index.tz_localize(None)
+    return df
+
+
+def split_download(
+    data: Optional[pd.DataFrame], tickers: List[str]
+) -> Dict[str, pd.DataFrame]:
+    """Per-ticker frames from a yf.download result (either column layout)."""
+    if data is None or data.empty:
+        return {}
+
+    frames = {}
+    for ticker in tickers:
+        df = None
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker in data.columns.get_level_values(0):
+                df = data[ticker]
+            elif ticker in data.columns.get_level_values(1):
+                df = data.xs(ticker, axis=1, level=1)
+        elif len(tickers) == 1:
+            df = data
+        if df is None or "Close" not in df.columns:
+            continue
+        df = df.dropna(subset=["Close"])
+        if len(df):
+            frames[ticker] = df[[c for c in COLUMNS if c in df.columns]]
+    return frames
+
+
+_store_lock = threading.Lock()
+_shared_store: Optional[HistoryStore] = None
+
+
+def get_history_store() -> HistoryStore:
+    """Process-wide HistoryStore (created lazily)."""
+    global _shared_store
+    with _store_lock:
+        if _shared_store is None:
+            _shared_store = HistoryStore()
+        return _shared_store
+
+
+def load_history(tickers: Iterable[str], days: int = 31) -> Dict[str, pd.DataFrame]:
+    """
+    Store-backed daily history, downloading directly if the store fails
+    (e.g. the database is unreachable).
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    try:
+        return get_history_store().get_history(tickers, days)
+    except Exception as e:
+        logger.warning(f"History store unavailable, downloading directly: {e}")
+        return download_history(tickers, date.today() - timedelta(days=days))
+
+
+def _float_or_none(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if pd.isna(value) else value
+
+
+def _int_or_none(value) -> Optional[int]:
+    value = _float_or_none(value)
+    return int(value) if value is not None else None
@@ -0,0 +1,190 @@
+"""
+HTTP Client - Pooled, keep-alive HTTP client shared by the requests-style
+services (KIS, NewsAPI, ApeWisdom, CNN, the Fed calendar, RSS feeds).
+
+Bare requests.get() opened a new TCP+TLS connection per call and several
+calls had no timeout. HttpClient wraps one httpx.Client:
+  - Connections are pooled per host and kept alive (HTTP_MAX_CONNECTIONS /
+    HTTP_MAX_KEEPALIVE, idle ones closed after HTTP_KEEPALIVE_SECONDS)
+  - Every request gets HTTP_TIMEOUT_SECONDS unless the caller passes one
+  - HTTP_HTTP2=true negotiates HTTP/2 where the server supports it (needs
+    the optional h2 package: pip install "httpx[http2]")
+
+Services take an optional `http` argument and default to the process-wide
+get_http_client(), so tests can pass HttpClient(transport=httpx.MockTransport(...))
+to serve canned responses without the network. Calls still go through
+services/upstream.py for rate limits, circuit breakers and retries.
+
+AsyncHttpClient is the httpx.AsyncClient twin used by the async market data
+service (services/async_market_service.py); get_async_http_client() returns
+one client per event loop, since an AsyncClient's pool is bound to its loop.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+HTTP2 = os.getenv("HTTP_HTTP2", "false").lower() == "true"
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; Taraga/1.0)"}
+
+
+def http2_available() -> bool:
+    """Whether the optional h2 package (HTTP/2 support) is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_options(
+    timeout: float,
+    max_connections: int,
+    max_keepalive: int,
+    http2: bool,
+    transport,
+    headers: Optional[dict],
+) -> dict:
+    """Keyword arguments shared by httpx.Client and httpx.AsyncClient."""
+    if http2 and not http2_available():
+        logger.warning("HTTP_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+        http2 = False
+    connect_timeout = min(timeout, CONNECT_TIMEOUT_SECONDS)
+    return {
+        "timeout": httpx.Timeout(timeout, connect=connect_timeout),
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=KEEPALIVE_SECONDS,
+        ),
+        "http2": http2,
+        "transport": transport,
+        "headers": headers or DEFAULT_HEADERS,
+        "follow_redirects": True,
+    }
+
+
+class HttpClient:
+    """Pooled keep-alive HTTP client with default timeouts."""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive: int = MAX_KEEPALIVE,
+        http2: bool = HTTP2,
+        transport: Optional[httpx.BaseTransport] = None,
+        headers: Optional[dict] = None,
+    ):
+        options = _client_options(
+            timeout, max_connections, max_keepalive, http2, transport, headers
+        )
+        self.http2 = options["http2"]
+        self._client = httpx.Client(**options)
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send one request on a pooled connection.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: httpx request options (params, headers, json, data,
+                content, timeout)
+        """
+        return self._client.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self._client.close()
+
+
+class AsyncHttpClient:
+    """HttpClient for coroutines (httpx.AsyncClient with the same pool limits)."""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive: int = MAX_KEEPALIVE,
+        http2: bool = HTTP2,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        headers: Optional[dict] = None,
+    ):
+        options = _client_options(
+            timeout, max_connections, max_keepalive, http2, transport, headers
+        )
+        self.http2 = options["http2"]
+        self._client = httpx.AsyncClient(**options)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send one request on a pooled connection (see HttpClient.request)."""
+        return await self._client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+_shared_client: Optional[HttpClient] = None
+_async_clients: Dict[asyncio.AbstractEventLoop, AsyncHttpClient] = {}
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Process-wide HttpClient (created lazily)."""
+    global _shared_client
+    with _client_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
+
+
+def set_http_client(client: Optional[HttpClient]) -> Optional[HttpClient]:
+    """Replace the process-wide client (None = recreate lazily); returns the old one."""
+    global _shared_client
+    with _client_lock:
+        previous, _shared_client = _shared_client, client
+        return previous
+
+
+def get_async_http_client() -> AsyncHttpClient:
+    """AsyncHttpClient for the running event loop (created lazily)."""
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            for stale in [known for known in _async_clients if known.is_closed()]:
+                del _async_clients[stale]
+            client = _async_clients[loop] = AsyncHttpClient()
+        return client
+
+
+async def close_async_http_client():
+    """Close and forget the running loop's client (app shutdown)."""
+    with _client_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -1,9 +1,11 @@
 import os
-import requests
 import json
 from datetime import datetime
 from dotenv import load_dotenv
 
+from services import upstream
+from services.http_client import HttpClient, get_http_client
+
 load_dotenv()
 
 KIS_APP_KEY = os.getenv("KIS_APP_KEY")
@@ -19,10 +21,13 @@ PRICE_URL = f"{BASE_URL}/uapi/domestic-stock/v1/quotations/inquire-price"
 class KISService:
     """Service to fetch Korean stock market data from Korea Investment & Securities API"""
 
-    def __init__(self, app_key: str = None, app_secret: str = None):
+    def __init__(
+        self, app_key: str = None, app_secret: str = None, http: HttpClient = None
+    ):
         self.app_key = app_key or KIS_APP_KEY
         self.app_secret = app_secret or KIS_APP_SECRET
         self.access_token = None
+        self.http = http or get_http_client()
 
         if not self.app_key or not self.app_secret:
             raise ValueError("KIS API credentials are required")
@@ -36,7 +41,9 @@ class KISService:
             "appsecret": self.app_secret,
         }
 
-        response = requests.post(TOKEN_URL, headers=headers, data=json.dumps(body))
+        response = upstream.post(
+            TOKEN_URL, client=self.http, headers=headers, content=json.dumps(body)
+        )
         response.raise_for_status()
 
         data = response.json()
@@ -61,7 +68,9 @@ class KISService:
             "FID_INPUT_ISCD": ticker,  # Stock code
         }
 
-        response = requests.get(PRICE_URL, headers=headers, params=params)
+        response = upstream.get(
+            PRICE_URL, client=self.http, headers=headers, params=params
+        )
         response.raise_for_status()
 
         data = response.json()
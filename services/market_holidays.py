@@ -0,0 +1,158 @@
+"""
+Market Holidays - Default exchange holiday calendars for SystemService.
+
+  - US (NYSE): computed from the exchange's holiday rules for any year
+    (fixed dates moved to the nearest weekday, Monday holidays, Good Friday,
+    Thanksgiving), plus one-off closures in US_SPECIAL_CLOSURES
+  - KR (KRX): lunar-calendar holidays can't be derived cheaply, so closures
+    are a checked-in table per year (KRX_HOLIDAYS); years outside it fall
+    back to weekends only, with a warning
+
+MARKET_HOLIDAYS_<MARKET> (comma-separated ISO dates) adds dates on top of
+these, e.g. an unscheduled closure or a year not yet in the table.
+"""
+
+import logging
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import FrozenSet
+
+logger = logging.getLogger(__name__)
+
+# NYSE closures outside the regular rules
+US_SPECIAL_CLOSURES = {
+    date(2025, 1, 9),  # National Day of Mourning (President Carter)
+}
+
+# KRX market closures (weekday dates only)
+KRX_HOLIDAYS = {
+    2025: [
+        date(2025, 1, 1),
+        date(2025, 1, 27),  # Temporary holiday
+        date(2025, 1, 28),  # Seollal
+        date(2025, 1, 29),
+        date(2025, 1, 30),
+        date(2025, 3, 3),  # Independence Movement Day (substitute)
+        date(2025, 5, 1),  # Labor Day
+        date(2025, 5, 5),  # Children's Day / Buddha's Birthday
+        date(2025, 5, 6),  # Substitute holiday
+        date(2025, 6, 3),  # Presidential election
+        date(2025, 6, 6),  # Memorial Day
+        date(2025, 8, 15),  # Liberation Day
+        date(2025, 10, 3),  # National Foundation Day
+        date(2025, 10, 6),  # Chuseok
+        date(2025, 10, 7),
+        date(2025, 10, 8),  # Substitute holiday
+        date(2025, 10, 9),  # Hangul Day
+        date(2025, 12, 25),
+        date(2025, 12, 31),  # Year-end closing
+    ],
+    2026: [
+        date(2026, 1, 1),
+        date(2026, 2, 16),  # Seollal
+        date(2026, 2, 17),
+        date(2026, 2, 18),
+        date(2026, 3, 2),  # Independence Movement Day (substitute)
+        date(2026, 5, 1),  # Labor Day
+        date(2026, 5, 5),  # Children's Day
+        date(2026, 5, 25),  # Buddha's Birthday (substitute)
+        date(2026, 6, 3),  # Local elections
+        date(2026, 8, 17),  # Liberation Day (substitute)
+        date(2026, 9, 24),  # Chuseok
+        date(2026, 9, 25),
+        date(2026, 10, 5),  # National Foundation Day (substitute)
+        date(2026, 10, 9),  # Hangul Day
+        date(2026, 12, 25),
+        date(2026, 12, 31),  # Year-end closing
+    ],
+    2027: [
+        date(2027, 1, 1),
+        date(2027, 2, 8),  # Seollal
+        date(2027, 2, 9),  # Substitute holiday
+        date(2027, 3, 1),  # Independence Movement Day
+        date(2027, 5, 5),  # Children's Day
+        date(2027, 5, 13),  # Buddha's Birthday
+        date(2027, 8, 16),  # Liberation Day (substitute)
+        date(2027, 9, 14),  # Chuseok
+        date(2027, 9, 15),
+        date(2027, 9, 16),
+        date(2027, 10, 4),  # National Foundation Day (substitute)
+        date(2027, 10, 11),  # Hangul Day (substitute)
+        date(2027, 12, 27),  # Christmas (substitute)
+        date(2027, 12, 31),  # Year-end closing
+    ],
+}
+
+
+def exchange_holidays(market: str, year: int) -> FrozenSet[date]:
+    """Built-in holidays of a market ("KR" or "US") for one year."""
+    if market == "US":
+        return _nyse_holidays(year)
+    if market == "KR":
+        return _krx_holidays(year)
+    return frozenset()
+
+
+@lru_cache(maxsize=None)
+def _krx_holidays(year: int) -> FrozenSet[date]:
+    if year not in KRX_HOLIDAYS:
+        logger.warning(
+            f"No built-in KRX holidays for {year}; set MARKET_HOLIDAYS_KR"
+        )
+    return frozenset(KRX_HOLIDAYS.get(year, ()))
+
+
+@lru_cache(maxsize=None)
+def _nyse_holidays(year: int) -> FrozenSet[date]:
+    days = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _last_weekday(year, 5, 0),  # Memorial Day
+        _observed(date(year, 7, 4)),  # Independence Day
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),  # Christmas
+    }
+    # New Year's Day: a Saturday holiday is not moved back into December
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.add(_observed(new_year))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))  # Juneteenth
+    days.update(d for d in US_SPECIAL_CLOSURES if d.year == year)
+    return frozenset(days)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays close the Friday before, Sunday ones the Monday after."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7  # noqa: E741
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
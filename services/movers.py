@@ -0,0 +1,132 @@
+"""
+Market Movers - Vectorized gainers/losers ranking over the mover universe.
+
+The universe (services/constituents.py) is 500+ tickers, so ranking avoids
+per-ticker Python loops: daily closes are combined into one dates x tickers
+array, each ticker's last and previous valid close are picked with array
+ops, and the top K come from np.argpartition (O(N)) with only those K
+sorted.
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class MoverBoard(NamedTuple):
+    tickers: np.ndarray  # (N,) object
+    price: np.ndarray  # (N,) latest close
+    previous_close: np.ndarray  # (N,) NaN if only one bar
+    change_percent: np.ndarray  # (N,) NaN if no usable previous close
+    volume: np.ndarray  # (N,) latest bar volume (0 if unknown)
+
+
+def build_board(frames: Dict[str, pd.DataFrame]) -> MoverBoard:
+    """MoverBoard from per-ticker daily bar frames (history_store layout)."""
+    frames = {t: df for t, df in frames.items() if df is not None and len(df)}
+    if not frames:
+        empty = np.empty(0)
+        return MoverBoard(np.empty(0, dtype=object), empty, empty, empty, empty)
+
+    close = pd.concat({t: df["Close"] for t, df in frames.items()}, axis=1)
+    volume = pd.concat(
+        {t: df.get("Volume", pd.Series(dtype=float)) for t, df in frames.items()},
+        axis=1,
+    ).reindex(index=close.index, columns=close.columns)
+    close_values = close.to_numpy(dtype=float)
+    volume_values = volume.to_numpy(dtype=float)
+
+    valid = ~np.isnan(close_values)
+    rows = np.arange(len(close_values))[:, None]
+    last = np.where(valid, rows, -1).max(axis=0)
+    prev = np.where(valid & (rows < last), rows, -1).max(axis=0)
+    has_bar = last >= 0
+    cols = np.arange(close_values.shape[1])
+
+    price = close_values[np.maximum(last, 0), cols]
+    previous_close = np.where(
+        prev >= 0, close_values[np.maximum(prev, 0), cols], np.nan
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = np.where(
+            previous_close > 0, (price / previous_close - 1.0) * 100, np.nan
+        )
+    last_volume = np.nan_to_num(volume_values[np.maximum(last, 0), cols])
+
+    return MoverBoard(
+        np.asarray(close.columns, dtype=object)[has_bar],
+        price[has_bar],
+        previous_close[has_bar],
+        change[has_bar],
+        last_volume[has_bar],
+    )
+
+
+def board_from_records(records: List[dict]) -> MoverBoard:
+    """MoverBoard from cached mover dicts (ticker/price/change_percent/volume)."""
+    return MoverBoard(
+        np.array([r["ticker"] for r in records], dtype=object),
+        np.array([r.get("price", np.nan) for r in records], dtype=float),
+        np.full(len(records), np.nan),
+        np.array([r.get("change_percent", np.nan) for r in records], dtype=float),
+        np.array([r.get("volume") or 0 for r in records], dtype=float),
+    )
+
+
+def top_movers(
+    board: MoverBoard,
+    k: int,
+    gainers: bool = True,
+    infos: Optional[Dict[str, dict]] = None,
+    require_direction: bool = True,
+) -> List[dict]:
+    """
+    The k biggest gainers (or losers), biggest move first.
+
+    Args:
+        board: build_board() / board_from_records() result
+        k: Number of movers
+        gainers: True for gainers, False for losers
+        infos: {ticker: {"name", "sector"}} for the result dicts
+        require_direction: Only up (gainers) / down (losers) tickers
+
+    Returns:
+        Mover dicts: ticker, name, price, change_percent, sector, volume
+    """
+    key = board.change_percent if gainers else -board.change_percent
+    eligible = np.isfinite(key)
+    if require_direction:
+        eligible &= key > 0
+    idx = np.flatnonzero(eligible)
+    if k <= 0 or not len(idx):
+        return []
+    if len(idx) > k:
+        idx = idx[np.argpartition(-key[idx], k - 1)[:k]]
+    idx = idx[np.argsort(-key[idx], kind="stable")]
+
+    infos = infos or {}
+    movers = []
+    for i in idx:
+        ticker = board.tickers[i]
+        info = infos.get(ticker, {})
+        movers.append(
+            {
+                "ticker": ticker,
+                "name": info.get("name") or ticker,
+                "price": float(board.price[i]),
+                "change_percent": round(float(board.change_percent[i]), 2),
+                "sector": info.get("sector") or "Unknown",
+                "volume": int(board.volume[i]),
+            }
+        )
+    return movers
+
+
+def to_records(board: MoverBoard, infos: Optional[Dict[str, dict]] = None) -> list:
+    """Every ticker with a change as mover dicts, biggest gain first (cacheable)."""
+    order = np.flatnonzero(np.isfinite(board.change_percent))
+    board = MoverBoard(*(field[order] for field in board))
+    return top_movers(
+        board, len(order), gainers=True, infos=infos, require_direction=False
+    )
@@ -1,8 +1,10 @@
 import os
-import requests
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from services import upstream
+from services.http_client import HttpClient, get_http_client
+
 load_dotenv()
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
@@ -12,8 +14,9 @@ BASE_URL = "https://newsapi.org/v2"
 class NewsService:
     """Service to fetch US financial news from NewsAPI"""
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, http: HttpClient = None):
         self.api_key = api_key or NEWS_API_KEY
+        self.http = http or get_http_client()
         if not self.api_key:
             raise ValueError("NewsAPI key is required")
 
@@ -27,7 +30,7 @@ class NewsService:
             "pageSize": 20,
         }
 
-        response = requests.get(url, params=params)
+        response = upstream.get(url, client=self.http, params=params)
         response.raise_for_status()
 
         data = response.json()
@@ -64,7 +67,7 @@ class NewsService:
             "pageSize": 20,
         }
 
-        response = requests.get(url, params=params)
+        response = upstream.get(url, client=self.http, params=params)
         response.raise_for_status()
 
         data = response.json()
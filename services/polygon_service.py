@@ -1,108 +1,83 @@
-import yfinance as yf
+import logging
+
 import pandas as pd
-import datetime
 import random
-from datetime import timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from models import MarketDataCache
+from services import cache_keys, upstream
+from services.cache_service import CacheService
+from services.constituents import load_universe
+from services.history_store import load_history
+from services.movers import board_from_records, build_board, to_records, top_movers
+from services.yahoo_finance_service import QUOTE_LOOKBACK_DAYS
+
+logger = logging.getLogger(__name__)
 
 
 class PolygonService:
     """
     Service to fetch market data using yfinance (Free, No API Key required).
     Replaces the original Polygon.io implementation.
-    Includes Server-side Caching to avoid Rate Limiting.
+    Public results are cached by the callers (routers/warmer) through
+    CacheService; internally it only caches the movers candidate pool and
+    reads the shared cache for partial-failure fallbacks.
     """
 
+    # Candidate pool shared by gainers and losers (minutes)
+    MOVERS_TTL_MINUTES = 15
+
+    # Mover universe until the constituents table is synced
+    FALLBACK_MOVER_TICKERS = [
+        "AAPL",
+        "MSFT",
+        "GOOGL",
+        "AMZN",
+        "NVDA",
+        "META",
+        "TSLA",
+        "AMD",
+        "INTC",
+        "QCOM",
+        "AVGO",
+        "MU",
+        "TSM",
+        "NFLX",
+        "ADBE",
+        "CRM",
+        "ORCL",
+        "CSCO",
+        "WMT",
+        "COST",
+        "TGT",
+        "HD",
+        "MCD",
+        "SBUX",
+        "KO",
+        "PEP",
+        "JPM",
+        "BAC",
+        "V",
+        "MA",
+        "GS",
+        "JNJ",
+        "PFE",
+        "MRK",
+        "CAT",
+        "BA",
+        "XOM",
+        "CVX",
+    ]
+
     def __init__(self, db: Session = None, api_key: str = None):
         self.db = db
+        self.cache = CacheService(db) if db else None
         # API Key is not needed for yfinance
 
-    def _get_from_cache(self, key: str, max_age_minutes: int = 15):
-        """Try to get valid cached data from DB"""
-        if not self.db:
-            return None
-
-        try:
-            cache = (
-                self.db.query(MarketDataCache)
-                .filter(MarketDataCache.key == key)
-                .first()
-            )
-            if cache:
-                # Check validity
-                now = datetime.datetime.now(datetime.timezone.utc)
-                updated_at = cache.updated_at
-                if updated_at.tzinfo is None:
-                    updated_at = updated_at.replace(tzinfo=datetime.timezone.utc)
-
-                if (now - updated_at) < timedelta(minutes=max_age_minutes):
-                    print(f"DEBUG: Cache HIT for {key}")
-                    return cache.data
-                else:
-                    print(f"DEBUG: Cache EXPIRED for {key}")
-            else:
-                print(f"DEBUG: Cache MISS for {key}")
-        except Exception as e:
-            print(f"Error checking cache: {e}")
-
-        return None
-
-    def _save_to_cache(self, key: str, data: dict):
-        """Save API result to DB Cache"""
-        if not self.db:
-            return
-
-        try:
-            # Upsert logic
-            cache = (
-                self.db.query(MarketDataCache)
-                .filter(MarketDataCache.key == key)
-                .first()
-            )
-            if cache:
-                cache.data = data
-                cache.updated_at = func.now()
-            else:
-                cache = MarketDataCache(key=key, data=data)
-                self.db.add(cache)
-
-            self.db.commit()
-            print(f"DEBUG: Saved cache for {key}")
-        except Exception as e:
-            print(f"Error saving cache: {e}")
-            self.db.rollback()
-
-    def _get_fallback_cache(self, key: str):
-        """Get whatever data is in cache, even if expired, as fallback"""
-        if not self.db:
-            return None
-        try:
-            cache = (
-                self.db.query(MarketDataCache)
-                .filter(MarketDataCache.key == key)
-                .first()
-            )
-            if cache:
-                print(f"DEBUG: Using STALE cache for {key} due to API failure")
-                return cache.data
-        except Exception as e:
-            print(f"Error retrieving fallback cache: {e}")
-        return None
-
     def get_market_indices(self):
         """
-        Get snapshot of US major indices using yfinance with Caching.
+        Get snapshot of US major indices using yfinance.
+        Callers cache the result under cache_keys.MARKET_INDICES.
         """
-        CACHE_KEY = "US_INDICES"
-
-        # 1. Try Cache
-        cached = self._get_from_cache(CACHE_KEY, max_age_minutes=15)
-        if cached:
-            return cached
-
-        # 2. Fetch from API
+        # 1. Fetch from API
         indices_map = {
             "^GSPC": {"proxy": "SPY", "name": "S&P 500"},
             "^IXIC": {"proxy": "QQQ", "name": "Nasdaq"},
@@ -113,8 +88,12 @@ class PolygonService:
 
         try:
             # Batch fetch
-            data = yf.download(
-                proxies, period="5d", group_by="ticker", threads=True, progress=False
+            data = upstream.download(
+                proxies,
+                period="5d",
+                group_by="ticker",
+                threads=True,
+                progress=False,
             )
 
             for index_key, info in indices_map.items():
@@ -145,21 +124,17 @@ class PolygonService:
                 except Exception as ex:
                     print(f"Error parsing {proxy_ticker} for {index_key}: {ex}")
 
-            # 3. Save to Cache if successful
-            if results:
-                self._save_to_cache(CACHE_KEY, results)
-
         except Exception as e:
             print(f"Error downloading indices: {e}")
 
-        # 4. Fallback Logic
+        # 2. Fallback Logic
         required_keys = ["^GSPC", "^IXIC", "^DJI"]
 
         # Check partial missing
         missing_keys = [k for k in required_keys if k not in results]
 
-        if missing_keys:
-            fallback_data = self._get_fallback_cache(CACHE_KEY)
+        if missing_keys and self.cache:
+            fallback_data = self.cache.get_stale(cache_keys.MARKET_INDICES)
             if fallback_data:
                 for k in missing_keys:
                     if k in fallback_data:
@@ -199,105 +174,46 @@ class PolygonService:
         return self.get_market_indices()
 
     def _get_top_movers_candidates(self):
-        CACHE_KEY = "US_TOP_MOVERS"
-
-        cached = self._get_from_cache(CACHE_KEY, max_age_minutes=15)
-        if cached:
-            return cached
-
-        tickers = [
-            "AAPL",
-            "MSFT",
-            "GOOGL",
-            "AMZN",
-            "NVDA",
-            "META",
-            "TSLA",
-            "AMD",
-            "INTC",
-            "QCOM",
-            "AVGO",
-            "MU",
-            "TSM",
-            "NFLX",
-            "ADBE",
-            "CRM",
-            "ORCL",
-            "CSCO",
-            "WMT",
-            "COST",
-            "TGT",
-            "HD",
-            "MCD",
-            "SBUX",
-            "KO",
-            "PEP",
-            "JPM",
-            "BAC",
-            "V",
-            "MA",
-            "GS",
-            "JNJ",
-            "PFE",
-            "MRK",
-            "CAT",
-            "BA",
-            "XOM",
-            "CVX",
-        ]
-
-        results = []
+        """Candidate pool for gainers/losers — cached once, ranked per call."""
+        if not self.cache:
+            return self._fetch_top_movers_candidates()
+        return self.cache.get_or_fetch(
+            cache_keys.MARKET_MOVERS,
+            self._fetch_top_movers_candidates,
+            ttl_minutes=self.MOVERS_TTL_MINUTES,
+        )
+
+    def _fetch_top_movers_candidates(self):
+        """Every mover-universe ticker with its latest change (one vectorized pass)."""
+        infos = load_universe()
+        tickers = list(infos) or self.FALLBACK_MOVER_TICKERS
         try:
-            data = yf.download(
-                tickers, period="2d", group_by="ticker", threads=True, progress=False
-            )
-
-            for t in tickers:
-                try:
-                    hist = data[t] if len(tickers) > 1 else data
-                    if not hist.empty and len(hist) >= 1:
-                        valid = hist.dropna(subset=["Close"])
-                        if len(valid) >= 1:
-                            current = valid["Close"].iloc[-1]
-                            prev = (
-                                valid["Close"].iloc[-2] if len(valid) > 1 else current
-                            )
-                            change_pct = ((current - prev) / prev) * 100
-
-                            results.append(
-                                {
-                                    "ticker": t,
-                                    "name": t,
-                                    "price": float(current),
-                                    "change_percent": float(change_pct),
-                                    "volume": 0,
-                                }
-                            )
-                except:
-                    pass
-
-            if results:
-                self._save_to_cache(CACHE_KEY, results)
-
+            frames = load_history(tickers, days=QUOTE_LOOKBACK_DAYS)
+            results = to_records(build_board(frames), infos)
         except Exception as e:
-            print(f"Error fetching movers: {e}")
-
-        if not results:
-            fallback = self._get_fallback_cache(CACHE_KEY)
-            if fallback:
-                return fallback
+            logger.error(f"Error fetching movers: {e}")
+            results = []
 
+        # Empty results are not cached; get_or_fetch falls back to stale data
         return results
 
     def get_top_gainers(self):
-        candidates = self._get_top_movers_candidates() or []
-        candidates.sort(key=lambda x: x["change_percent"], reverse=True)
-        return candidates[:10]
+        return self._rank_candidates(gainers=True)
 
     def get_top_losers(self):
+        return self._rank_candidates(gainers=False)
+
+    def _rank_candidates(self, gainers: bool):
+        # Top 10 of the shared candidate pool without sorting all of it
         candidates = self._get_top_movers_candidates() or []
-        candidates.sort(key=lambda x: x["change_percent"])
-        return candidates[:10]
+        infos = {c["ticker"]: c for c in candidates}
+        return top_movers(
+            board_from_records(candidates),
+            10,
+            gainers=gainers,
+            infos=infos,
+            require_direction=False,
+        )
 
     def get_sector_performance(self):
         return {}
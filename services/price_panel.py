@@ -0,0 +1,562 @@
+"""
+Price Panel - Memory-mapped tickers × dates × fields view of price_history.
+
+The panel is a directory of flat arrays built from the history store:
+  prices.f32   float32 [field, date, ticker], fields Open/High/Low/Close
+  volume.i64   int64   [date, ticker]
+  meta.json    tickers, dates, start, capacity, updated_at
+Each build writes a new version directory and atomically repoints the
+CURRENT file at it, so readers never see a half-written panel. Readers map
+the arrays read-only: every uvicorn worker and Streamlit process shares the
+same page cache, and field()/series() slices are views, not copies.
+
+Arrays are preallocated with spare date rows, so append_day() writes the
+next row in place and then atomically replaces meta.json (re-appending the
+last date revises it). Missing bars are NaN (volume 0).
+
+Build or update the panel with `python build_price_panel.py`; the
+analytics jobs (services/analytics_jobs.py) also refresh it. load_frames()
+reads from the panel when it is fresh and covers the tickers, and falls
+back to the history store otherwise.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: single builder assumed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PANEL_DIR = os.getenv(
+    "PRICE_PANEL_DIR", os.path.join(_PROJECT_ROOT, "data", "price_panel")
+)
+
+# Calendar days of history a full build covers
+PANEL_DAYS = int(os.getenv("PRICE_PANEL_DAYS", "400"))
+
+# Readers fall back to the history store when the panel is older than this
+MAX_AGE_MINUTES = int(os.getenv("PRICE_PANEL_MAX_AGE_MINUTES", "30"))
+
+# Spare date rows allocated per build for append_day()
+DATE_HEADROOM = 64
+
+# refresh() rebuilds instead of appending when more new dates than this
+MAX_APPEND_DAYS = 5
+
+PRICE_FIELDS = ["Open", "High", "Low", "Close"]
+FIELDS = PRICE_FIELDS + ["Volume"]
+
+_PRICES_FILE = "prices.f32"
+_VOLUME_FILE = "volume.i64"
+_META_FILE = "meta.json"
+_CURRENT_FILE = "CURRENT"
+_LOCK_FILE = ".lock"
+
+
+class PricePanel:
+    """Read-only view over one panel version."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.meta_mtime = os.path.getmtime(os.path.join(path, _META_FILE))
+        with open(os.path.join(path, _META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.tickers: List[str] = meta["tickers"]
+        self.capacity: int = meta["capacity"]
+        self.updated_at: float = meta["updated_at"]
+        self.dates = np.array(meta["dates"], dtype="datetime64[D]")
+        self.start = date.fromisoformat(meta["start"])
+        self.n_dates = len(self.dates)
+        self._columns = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+        n_tickers = max(len(self.tickers), 1)
+        self._prices = np.memmap(
+            os.path.join(path, _PRICES_FILE),
+            dtype=np.float32,
+            mode="r",
+            shape=(len(PRICE_FIELDS), self.capacity, n_tickers),
+        )
+        self._volume = np.memmap(
+            os.path.join(path, _VOLUME_FILE),
+            dtype=np.int64,
+            mode="r",
+            shape=(self.capacity, n_tickers),
+        )
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._columns
+
+    def column(self, ticker: str) -> Optional[int]:
+        """Ticker's column index, or None if it isn't in the panel."""
+        return self._columns.get(ticker)
+
+    def is_fresh(self, max_age_minutes: float = MAX_AGE_MINUTES) -> bool:
+        return time.time() - self.updated_at < max_age_minutes * 60
+
+    def covers(self, days: int) -> bool:
+        """True if the panel was built far enough back for `days` of history."""
+        return self.start <= date.today() - timedelta(days=days)
+
+    def start_row(self, days: Optional[int] = None) -> int:
+        """First date row within the last `days` calendar days (0 for all)."""
+        if not days:
+            return 0
+        start = np.datetime64(date.today() - timedelta(days=days), "D")
+        return int(np.searchsorted(self.dates, start))
+
+    def field(self, name: str, days: Optional[int] = None) -> np.ndarray:
+        """
+        One field for every ticker, as a [date, ticker] view (no copy).
+
+        Args:
+            name: Open/High/Low/Close/Volume
+            days: Only the last `days` calendar days (all dates if None)
+        """
+        start = self.start_row(days)
+        if name == "Volume":
+            return self._volume[start : self.n_dates]
+        return self._prices[PRICE_FIELDS.index(name), start : self.n_dates]
+
+    def field_rows(self, name: str, start: int, end: int) -> np.ndarray:
+        """Like field(), but for date rows [start, end) (view, no copy)."""
+        end = min(end, self.n_dates)
+        if name == "Volume":
+            return self._volume[start:end]
+        return self._prices[PRICE_FIELDS.index(name), start:end]
+
+    def series(
+        self, ticker: str, name: str = "Close", days: Optional[int] = None
+    ) -> Optional[np.ndarray]:
+        """One ticker's field over time (strided view), or None if unknown."""
+        col = self._columns.get(ticker)
+        if col is None:
+            return None
+        return self.field(name, days)[:, col]
+
+    def frame(self, ticker: str, days: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        yfinance-shaped DataFrame (Date index, Open..Volume) for one ticker.
+
+        Dates the ticker didn't trade on are dropped. Returns None if the
+        ticker is unknown or has no bars in range.
+        """
+        col = self._columns.get(ticker)
+        if col is None:
+            return None
+        start = self.start_row(days)
+        close = self._prices[3, start : self.n_dates, col]
+        rows = np.flatnonzero(~np.isnan(close))
+        if not len(rows):
+            return None
+
+        rows += start
+        data = {
+            name: self._prices[i, rows, col].astype(np.float64)
+            for i, name in enumerate(PRICE_FIELDS)
+        }
+        data["Volume"] = self._volume[rows, col]
+        index = pd.DatetimeIndex(self.dates[rows].astype("datetime64[ns]"), name="Date")
+        return pd.DataFrame(data, index=index)
+
+    def frames(
+        self, tickers: Iterable[str], days: Optional[int] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """frame() for each ticker; tickers without bars are omitted."""
+        result = {}
+        for ticker in tickers:
+            df = self.frame(ticker, days)
+            if df is not None:
+                result[ticker] = df
+        return result
+
+
+class PricePanelBuilder:
+    """Writes panel versions from the price_history table."""
+
+    def __init__(self, session_factory=None, panel_dir: str = PANEL_DIR):
+        if session_factory is None:
+            from database import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.panel_dir = panel_dir
+
+    def build(self, tickers: Optional[List[str]] = None, days: int = PANEL_DAYS) -> str:
+        """
+        Write a new panel version and make it current.
+
+        Args:
+            tickers: Tickers to include (every synced ticker if None)
+            days: Calendar days of history
+
+        Returns:
+            Path of the new version directory
+        """
+        start = date.today() - timedelta(days=days)
+        db = self.session_factory()
+        try:
+            if tickers is None:
+                tickers = _synced_tickers(db)
+            table = _read_bars(db, tickers, start)
+        finally:
+            db.close()
+
+        tickers = sorted(set(tickers))
+        dates = sorted(table["date"].unique()) if len(table) else []
+        capacity = len(dates) + DATE_HEADROOM
+
+        with self._locked():
+            version = os.path.join(self.panel_dir, f"v{time.time_ns()}")
+            os.makedirs(version)
+            prices, volume = _allocate(version, capacity, len(tickers))
+
+            if len(table):
+                rows = np.searchsorted(
+                    np.array(dates, dtype="datetime64[D]"),
+                    table["date"].to_numpy().astype("datetime64[D]"),
+                )
+                cols = np.searchsorted(np.array(tickers), table["ticker"].to_numpy())
+                for i, name in enumerate(PRICE_FIELDS):
+                    prices[i, rows, cols] = table[name.lower()].to_numpy(np.float32)
+                volume[rows, cols] = table["volume"].fillna(0).to_numpy(np.int64)
+            prices.flush()
+            volume.flush()
+            del prices, volume
+
+            _write_meta(
+                version, tickers, [d.isoformat() for d in dates], capacity, start
+            )
+            self._set_current(version)
+
+        logger.info(
+            f"Price panel built: {len(tickers)} tickers x {len(dates)} dates "
+            f"({version})"
+        )
+        return version
+
+    def append_day(self, day: date, bars: Dict[str, dict]) -> bool:
+        """
+        Write one date row into the current panel in place.
+
+        Args:
+            day: Bar date; must be the panel's last date (revises it) or later
+            bars: {ticker: {"open", "high", "low", "close", "volume"}};
+                tickers not in the panel are ignored
+
+        Returns:
+            False if there's no panel, the date is out of order, or the
+            preallocated rows are used up (rebuild instead)
+        """
+        with self._locked():
+            version = self._current_path()
+            if version is None:
+                return False
+            with open(os.path.join(version, _META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+
+            dates = meta["dates"]
+            day_str = day.isoformat()
+            if dates and day_str < dates[-1]:
+                return False
+            if dates and day_str == dates[-1]:
+                row = len(dates) - 1
+            elif len(dates) < meta["capacity"]:
+                row = len(dates)
+                dates.append(day_str)
+            else:
+                return False
+
+            columns = {ticker: i for i, ticker in enumerate(meta["tickers"])}
+            prices, volume = _open_arrays(version, meta, "r+")
+            prices[:, row, :] = np.nan
+            volume[row, :] = 0
+            for ticker, bar in bars.items():
+                col = columns.get(ticker)
+                if col is None:
+                    continue
+                for i, name in enumerate(PRICE_FIELDS):
+                    value = bar.get(name.lower())
+                    prices[i, row, col] = np.nan if value is None else value
+                shares = bar.get("volume")
+                volume[row, col] = 0 if shares is None or pd.isna(shares) else shares
+            prices.flush()
+            volume.flush()
+            del prices, volume
+
+            _write_meta(
+                version,
+                meta["tickers"],
+                dates,
+                meta["capacity"],
+                date.fromisoformat(meta["start"]),
+            )
+        return True
+
+    def refresh(self, max_append_days: int = MAX_APPEND_DAYS) -> str:
+        """
+        Bring the panel up to date with the history store.
+
+        Appends the new dates (re-writing the last one, which may have
+        been a still-forming bar) when possible; rebuilds when there's no
+        panel, the store has tickers the panel lacks, or too many dates
+        are missing.
+
+        Returns:
+            "built", "appended" or "unchanged"
+        """
+        panel = open_panel(self.panel_dir)
+        if panel is None or panel.n_dates == 0:
+            self.build()
+            return "built"
+
+        last_date = pd.Timestamp(panel.dates[-1]).date()
+        db = self.session_factory()
+        try:
+            synced = _synced_tickers(db)
+            table = _read_bars(db, panel.tickers, last_date)
+        finally:
+            db.close()
+
+        new_dates = sorted(table["date"].unique()) if len(table) else []
+        if (
+            any(ticker not in panel for ticker in synced)
+            or len(new_dates) > max_append_days + 1
+            or panel.n_dates + len(new_dates) > panel.capacity
+        ):
+            self.build()
+            return "built"
+        if not new_dates:
+            with self._locked():
+                _touch_meta(panel.path)
+            return "unchanged"
+
+        for day, group in table.groupby("date", sort=True):
+            bars = {
+                row.ticker: {
+                    "open": row.open,
+                    "high": row.high,
+                    "low": row.low,
+                    "close": row.close,
+                    "volume": row.volume,
+                }
+                for row in group.itertuples(index=False)
+            }
+            if not self.append_day(day, bars):
+                self.build()
+                return "built"
+        return "appended"
+
+    def _current_path(self) -> Optional[str]:
+        return _current_path(self.panel_dir)
+
+    def _set_current(self, version: str):
+        previous = self._current_path()
+        tmp = os.path.join(self.panel_dir, f"{_CURRENT_FILE}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(os.path.basename(version))
+        os.replace(tmp, os.path.join(self.panel_dir, _CURRENT_FILE))
+
+        # Keep the previous version for readers that still have it mapped
+        keep = {os.path.basename(version)}
+        if previous:
+            keep.add(os.path.basename(previous))
+        for name in os.listdir(self.panel_dir):
+            if name.startswith("v") and name not in keep:
+                shutil.rmtree(os.path.join(self.panel_dir, name), ignore_errors=True)
+
+    @contextmanager
+    def _locked(self):
+        """Serialize builders across processes (advisory file lock)."""
+        os.makedirs(self.panel_dir, exist_ok=True)
+        with open(os.path.join(self.panel_dir, _LOCK_FILE), "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def open_panel(panel_dir: str = PANEL_DIR) -> Optional[PricePanel]:
+    """Map the current panel version, or None if none has been built."""
+    path = _current_path(panel_dir)
+    if path is None:
+        return None
+    try:
+        return PricePanel(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Price panel at {path} unreadable: {e}")
+        return None
+
+
+_panel_lock = threading.Lock()
+_shared_panel: Optional[PricePanel] = None
+
+
+def get_price_panel() -> Optional[PricePanel]:
+    """
+    Process-wide panel, remapped when a builder switched versions or
+    appended a day since it was opened.
+    """
+    global _shared_panel
+    with _panel_lock:
+        path = _current_path(PANEL_DIR)
+        if path is None:
+            _shared_panel = None
+            return None
+        panel = _shared_panel
+        try:
+            stale = (
+                panel is None
+                or panel.path != path
+                or os.path.getmtime(os.path.join(path, _META_FILE)) != panel.meta_mtime
+            )
+        except OSError:
+            stale = True
+        if stale:
+            _shared_panel = open_panel(PANEL_DIR)
+        return _shared_panel
+
+
+def get_fresh_panel(tickers: Iterable[str], days: int = 31) -> Optional[PricePanel]:
+    """The shared panel if it's fresh, reaches back `days` and has every ticker."""
+    panel = get_price_panel()
+    if (
+        panel is not None
+        and panel.is_fresh()
+        and panel.covers(days)
+        and all(t in panel for t in tickers)
+    ):
+        return panel
+    return None
+
+
+def load_frames(tickers: Iterable[str], days: int = 31) -> Dict[str, pd.DataFrame]:
+    """
+    Daily bars per ticker from the shared panel when it's fresh and covers
+    every ticker; otherwise from the history store (which syncs as needed).
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    panel = get_fresh_panel(tickers, days)
+    if panel is not None:
+        return panel.frames(tickers, days)
+
+    from services.history_store import load_history
+
+    return load_history(tickers, days)
+
+
+def _current_path(panel_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(panel_dir, _CURRENT_FILE), encoding="utf-8") as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(panel_dir, name)
+    return path if name and os.path.isdir(path) else None
+
+
+def _synced_tickers(db) -> List[str]:
+    from models import PriceHistorySync
+
+    return [row[0] for row in db.query(PriceHistorySync.ticker).all()]
+
+
+def _read_bars(db, tickers: List[str], start: date) -> pd.DataFrame:
+    """price_history rows on/after start as a DataFrame (lowercase columns)."""
+    from models import PriceHistory
+
+    columns = ["ticker", "date", "open", "high", "low", "close", "volume"]
+    if not tickers:
+        return pd.DataFrame(columns=columns)
+    rows = (
+        db.query(*(getattr(PriceHistory, c) for c in columns))
+        .filter(PriceHistory.ticker.in_(tickers), PriceHistory.date >= start)
+        .all()
+    )
+    table = pd.DataFrame.from_records(rows, columns=columns)
+    for name in ("open", "high", "low", "close"):
+        table[name] = table[name].astype(float)
+    return table
+
+
+def _allocate(version: str, capacity: int, n_tickers: int):
+    n_tickers = max(n_tickers, 1)
+    prices = np.memmap(
+        os.path.join(version, _PRICES_FILE),
+        dtype=np.float32,
+        mode="w+",
+        shape=(len(PRICE_FIELDS), capacity, n_tickers),
+    )
+    prices[:] = np.nan
+    volume = np.memmap(
+        os.path.join(version, _VOLUME_FILE),
+        dtype=np.int64,
+        mode="w+",
+        shape=(capacity, n_tickers),
+    )
+    return prices, volume
+
+
+def _open_arrays(version: str, meta: dict, mode: str):
+    n_tickers = max(len(meta["tickers"]), 1)
+    prices = np.memmap(
+        os.path.join(version, _PRICES_FILE),
+        dtype=np.float32,
+        mode=mode,
+        shape=(len(PRICE_FIELDS), meta["capacity"], n_tickers),
+    )
+    volume = np.memmap(
+        os.path.join(version, _VOLUME_FILE),
+        dtype=np.int64,
+        mode=mode,
+        shape=(meta["capacity"], n_tickers),
+    )
+    return prices, volume
+
+
+def _write_meta(
+    version: str, tickers: List[str], dates: List[str], capacity: int, start: date
+):
+    meta = {
+        "tickers": tickers,
+        "dates": dates,
+        "fields": FIELDS,
+        "capacity": capacity,
+        "start": start.isoformat(),
+        "updated_at": time.time(),
+    }
+    tmp = os.path.join(version, f"{_META_FILE}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(version, _META_FILE))
+
+
+def _touch_meta(version: str):
+    """Mark the panel as checked against the store without changing data."""
+    with open(os.path.join(version, _META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    _write_meta(
+        version,
+        meta["tickers"],
+        meta["dates"],
+        meta["capacity"],
+        date.fromisoformat(meta["start"]),
+    )
@@ -8,6 +8,9 @@ from datetime import datetime
 from typing import List, Dict
 import logging
 
+from services import upstream
+from services.http_client import HttpClient, get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +31,9 @@ class RSSNewsService:
         {"url": "https://www.investing.com/rss/news.rss", "source": "Investing.com"},
     ]
 
+    def __init__(self, http: HttpClient = None):
+        self.http = http or get_http_client()
+
     def get_market_news(self, limit: int = 10) -> List[Dict]:
         """
         Fetch latest market news from multiple RSS feeds
@@ -45,7 +51,14 @@ class RSSNewsService:
 
             for feed_info in self.RSS_FEEDS:
                 try:
-                    feed = feedparser.parse(feed_info["url"])
+                    response = upstream.get(
+                        feed_info["url"],
+                        client=self.http,
+                        headers={"User-Agent": "Mozilla/5.0"},
+                        timeout=10,
+                    )
+                    response.raise_for_status()
+                    feed = feedparser.parse(response.content)
 
                     for entry in feed.entries[:5]:  # Get top 5 from each feed
                         article = {
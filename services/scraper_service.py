@@ -1,12 +1,11 @@
-import requests
 from bs4 import BeautifulSoup
-import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from models import MarketDataCache
-import json
 import logging
-import yfinance as yf
+
+from services import upstream
+from services.http_client import HttpClient, get_http_client
+from services.ticker_metadata import get_metadata
+from services.yahoo_finance_service import get_quotes
 
 logger = logging.getLogger(__name__)
 
@@ -14,15 +13,10 @@ logger = logging.getLogger(__name__)
 class ScraperService:
     """
     Service to scrape retail (WSB/Reddit) vs Institutional (Analyst) picks.
-    Includes caching to prevent blocking and rate limits.
+    Callers cache results through CacheService (cache_keys.retail_picks /
+    institutional_picks, TTL_SCRAPER) to prevent blocking and rate limits.
     """
 
-    CACHE_KEY_RETAIL = "RETAIL_PICKS"
-    CACHE_KEY_INSTITUTIONAL = "INSTITUTIONAL_PICKS"
-
-    # 6 hours cache for scraping
-    CACHE_DURATION_HOURS = 6
-
     # Common ETF patterns
     ETF_PATTERNS = [
         "SPY",
@@ -57,8 +51,9 @@ class ScraperService:
         "ARKK",
     ]
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, http: HttpClient = None):
         self.db = db
+        self.http = http or get_http_client()
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
@@ -78,87 +73,31 @@ class ScraperService:
 
     def _enrich_with_price_data(self, results):
         """Add real-time price change percentage and type to results"""
+        tickers = [item.get("ticker", "") for item in results]
+        try:
+            quotes = get_quotes(tickers)
+            references = get_metadata(list(quotes)).infos
+        except Exception as e:
+            logger.warning(f"Failed to get price data for {len(tickers)} picks: {e}")
+            quotes, references = {}, {}
+
         enriched = []
         for item in results:
             ticker = item.get("ticker", "")
-            try:
-                stock = yf.Ticker(ticker)
-                info = stock.info
-                hist = stock.history(period="1d")
-
-                # Get price change
-                change_percent = 0.0
-                if not hist.empty and "Close" in hist.columns:
-                    current_price = hist["Close"].iloc[-1]
-                    prev_close = info.get("previousClose", current_price)
-                    if prev_close and prev_close > 0:
-                        change_percent = (
-                            (current_price - prev_close) / prev_close
-                        ) * 100
-
-                # Determine type
-                quote_type = info.get("quoteType", "EQUITY")
-                is_etf = quote_type == "ETF" or self._is_etf(ticker)
-
-                item["change_percent"] = round(change_percent, 2)
-                item["type"] = "ETF" if is_etf else "STOCK"
-
-            except Exception as e:
-                logger.warning(f"Failed to get price data for {ticker}: {e}")
-                item["change_percent"] = 0.0
-                item["type"] = "ETF" if self._is_etf(ticker) else "STOCK"
+            quote = quotes.get(ticker)
+            if quote is None:
+                logger.warning(f"Failed to get price data for {ticker}")
+
+            # Determine type
+            quote_type = references.get(ticker, {}).get("quoteType", "EQUITY")
+            is_etf = quote_type == "ETF" or self._is_etf(ticker)
 
+            item["change_percent"] = quote["change_percent"] if quote else 0.0
+            item["type"] = "ETF" if is_etf else "STOCK"
             enriched.append(item)
 
         return enriched
 
-    def _get_from_cache(self, key):
-        if not self.db:
-            return None
-        try:
-            cache = (
-                self.db.query(MarketDataCache)
-                .filter(MarketDataCache.key == key)
-                .first()
-            )
-            if cache:
-                updated_at = cache.updated_at
-                if updated_at.tzinfo is None:
-                    updated_at = updated_at.replace(tzinfo=datetime.timezone.utc)
-
-                # Check expiry
-                now = datetime.datetime.now(datetime.timezone.utc)
-                if (now - updated_at) < datetime.timedelta(
-                    hours=self.CACHE_DURATION_HOURS
-                ):
-                    return cache.data
-                else:
-                    return None  # Expired
-        except Exception as e:
-            logger.error(f"Cache check failed: {e}")
-            self.db.rollback()
-            return None
-
-    def _save_to_cache(self, key, data):
-        if not self.db:
-            return
-        try:
-            cache = (
-                self.db.query(MarketDataCache)
-                .filter(MarketDataCache.key == key)
-                .first()
-            )
-            if cache:
-                cache.data = data
-                cache.updated_at = func.now()
-            else:
-                new_cache = MarketDataCache(key=key, data=data)
-                self.db.add(new_cache)
-            self.db.commit()
-        except Exception as e:
-            logger.error(f"Cache save failed: {e}")
-            self.db.rollback()
-
     def get_retail_picks(self, region: str = "US"):
         """
         Get trending retail picks. Only US supported (ApeWisdom).
@@ -167,17 +106,15 @@ class ScraperService:
         if region != "US":
             return []
 
-        cache_key = f"{self.CACHE_KEY_RETAIL}_{region}"
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-
         results = []
 
         # US: ApeWisdom (WSB/Reddit sentiment)
         try:
-            response = requests.get(
-                "https://apewisdom.io/all-stocks/", headers=self.headers, timeout=10
+            response = upstream.get(
+                "https://apewisdom.io/all-stocks/",
+                client=self.http,
+                headers=self.headers,
+                timeout=10,
             )
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, "html.parser")
@@ -208,7 +145,6 @@ class ScraperService:
                 {"ticker": "AAPL", "name": "Apple", "mentions": "950 mentions", "change_percent": 1.5, "type": "STOCK"},
             ]
 
-        self._save_to_cache(cache_key, results)
         return results
 
     def get_institutional_picks(self, region: str = "US"):
@@ -219,11 +155,6 @@ class ScraperService:
         if region != "US":
             return []
 
-        cache_key = f"{self.CACHE_KEY_INSTITUTIONAL}_{region}"
-        cached = self._get_from_cache(cache_key)
-        if cached:
-            return cached
-
         results = [
             {"ticker": "MSFT", "name": "Microsoft", "rating": "Upgrade to Buy", "change_percent": 2.1, "type": "STOCK"},
             {"ticker": "GOOGL", "name": "Alphabet", "rating": "Strong Buy", "change_percent": 1.8, "type": "STOCK"},
@@ -232,5 +163,4 @@ class ScraperService:
             {"ticker": "LLY", "name": "Eli Lilly", "rating": "Buy Target Raised", "change_percent": 4.3, "type": "STOCK"},
         ]
 
-        self._save_to_cache(cache_key, results)
         return results
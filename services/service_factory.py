@@ -8,6 +8,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Process-wide cache backends that hold connections/state (created lazily)
+_shared_cache_backends = {}
+
 
 class ServiceFactory:
     """Factory to manage free vs premium service implementations"""
@@ -60,6 +63,33 @@ class ServiceFactory:
 
         return YahooFinanceService()
 
+    @staticmethod
+    def get_async_market_data_service():
+        """
+        Get the async US market data service for async endpoints
+
+        Returns:
+            AsyncMarketDataService (free), or the premium service wrapped in
+            ThreadedMarketDataService
+        """
+        from .async_market_service import (
+            AsyncMarketDataService,
+            ThreadedMarketDataService,
+        )
+
+        if ServiceFactory.use_premium_apis():
+            try:
+                from .polygon_service import PolygonService
+
+                # Built per call on its own session (calls run on worker threads)
+                return ThreadedMarketDataService(PolygonService)
+            except ImportError:
+                logger.warning(
+                    "Polygon service not available, falling back to free service"
+                )
+
+        return AsyncMarketDataService()
+
     @staticmethod
     def get_news_service():
         """
@@ -124,6 +154,47 @@ class ServiceFactory:
             logger.warning(f"KIS service unavailable (missing credentials?): {e}")
             return None
 
+    @staticmethod
+    def get_cache_backend_name() -> str:
+        """Configured shared cache tier: "db" (default), "redis" or "memory"."""
+        return os.getenv("CACHE_BACKEND", "db").lower()
+
+    @staticmethod
+    def get_cache_backend(db=None):
+        """
+        Get the storage backend for CacheService's shared (L2) tier
+
+        Returns:
+            RedisCacheBackend, MemoryCacheBackend or DBCacheBackend (default,
+            also the fallback if Redis is unavailable)
+        """
+        from .cache_backends import DBCacheBackend, MemoryCacheBackend
+
+        name = ServiceFactory.get_cache_backend_name()
+
+        if name == "redis":
+            if "redis" not in _shared_cache_backends:
+                try:
+                    from .cache_backends import RedisCacheBackend
+
+                    url = os.getenv("REDIS_URL", "redis://localhost:6379")
+                    _shared_cache_backends["redis"] = RedisCacheBackend(url)
+                    logger.info("Using Redis cache backend")
+                except ImportError:
+                    logger.warning(
+                        "redis package not installed, falling back to DB cache"
+                    )
+                    _shared_cache_backends["redis"] = None
+            if _shared_cache_backends["redis"] is not None:
+                return _shared_cache_backends["redis"]
+
+        elif name == "memory":
+            if "memory" not in _shared_cache_backends:
+                _shared_cache_backends["memory"] = MemoryCacheBackend()
+            return _shared_cache_backends["memory"]
+
+        return DBCacheBackend(db)
+
     @staticmethod
     def get_service_status() -> dict:
         """
@@ -0,0 +1,282 @@
+"""
+Smart Score Store - Daily Smart Scores persisted in the smart_scores table.
+
+Rows are keyed by (date of the latest bar, ticker) and hold every factor
+sub-score, so clients read precomputed scores (routers/insight.py) instead
+of triggering scans. update() is incremental: a ticker is re-scored only if
+its latest bar is new or changed (a still-forming bar's close/volume moved);
+everything else keeps its stored row.
+
+Runs from the analytics jobs (services/analytics_jobs.py,
+SCORE_REFRESH_SECONDS) or standalone via `python update_smart_scores.py`.
+"""
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from logic.smart_score import (
+    DEFAULT_UNIVERSE,
+    ScanResult,
+    load_score_panel,
+    score_panel,
+)
+from models import SmartScore
+
+logger = logging.getLogger(__name__)
+
+_UPDATE_COLUMNS = (
+    "market",
+    "name",
+    "score",
+    "inst_score",
+    "momentum_score",
+    "volume_score",
+    "is_anomaly",
+    "anomaly_reason",
+    "price",
+    "change_percent",
+    "vwap",
+    "ma5",
+    "volume_ratio",
+    "history",
+    "bar_close",
+    "bar_volume",
+    "computed_at",
+)
+
+
+class SmartScoreStore:
+    """Incremental writer and query helpers for the smart_scores table."""
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from database import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    def update(self, market: str, tickers: Optional[List[str]] = None) -> dict:
+        """
+        Score tickers whose latest bar changed since the last run and store them.
+
+        Args:
+            market: "KR" / "US"
+            tickers: Universe to score (default DEFAULT_UNIVERSE[market])
+
+        Returns:
+            Summary dict: market, scored, unchanged, failed ({ticker: reason})
+        """
+        tickers = list(dict.fromkeys(tickers or DEFAULT_UNIVERSE[market]))
+        panel = load_score_panel(tickers)
+
+        latest = {}
+        for col, ticker in enumerate(panel.tickers):
+            if panel.lengths[col] == 0:
+                continue
+            latest[ticker] = (
+                pd.Timestamp(panel.dates[-1, col]).date(),
+                _float_or_none(panel.close[-1, col]),
+                _int_or_none(panel.volume[-1, col]),
+            )
+
+        db = self.session_factory()
+        try:
+            unchanged = self._unchanged(db, latest)
+            changed = [t for t in tickers if t not in unchanged]
+            if changed:
+                scan = score_panel(panel.subset(changed), changed, market)
+                self._store(db, scan.results, latest)
+            else:
+                scan = ScanResult([], {})
+        finally:
+            db.close()
+
+        summary = {
+            "market": market,
+            "scored": len(scan.results),
+            "unchanged": len(unchanged),
+            "failed": scan.failures,
+        }
+        logger.info(
+            f"Smart scores ({market}): {summary['scored']} scored, "
+            f"{summary['unchanged']} unchanged, {len(scan.failures)} failed"
+        )
+        return summary
+
+    def _unchanged(self, db: Session, latest: Dict[str, tuple]) -> set:
+        """Tickers whose stored row already covers their latest bar as-is."""
+        if not latest:
+            return set()
+        rows = (
+            db.query(
+                SmartScore.ticker,
+                SmartScore.date,
+                SmartScore.bar_close,
+                SmartScore.bar_volume,
+            )
+            .filter(
+                SmartScore.ticker.in_(list(latest)),
+                SmartScore.date >= min(bar[0] for bar in latest.values()),
+            )
+            .all()
+        )
+        return {
+            row.ticker
+            for row in rows
+            if latest[row.ticker] == (row.date, row.bar_close, row.bar_volume)
+        }
+
+    def _store(self, db: Session, results: List[dict], latest: Dict[str, tuple]):
+        if not results:
+            return
+        now = datetime.now(timezone.utc)
+        rows = []
+        for result in results:
+            history = {
+                "price": [_float_or_none(v) for v in result["price_history"]],
+                "volume": [_float_or_none(v) for v in result["volume_history"]],
+                "dates": result["dates"],
+            }
+            bar_date, bar_close, bar_volume = latest[result["ticker"]]
+            rows.append(
+                {
+                    "date": bar_date,
+                    "ticker": result["ticker"],
+                    "market": result["market"],
+                    "name": result["name"],
+                    "score": result["score"],
+                    "inst_score": result["inst_score"],
+                    "momentum_score": result["momentum_score"],
+                    "volume_score": result["volume_score"],
+                    "is_anomaly": result["is_anomaly"],
+                    "anomaly_reason": result["anomaly_reason"] or None,
+                    "price": _float_or_none(result["price"]),
+                    "change_percent": _float_or_none(result["change_percent"]),
+                    "vwap": _float_or_none(result["vwap"]),
+                    "ma5": _float_or_none(result["ma5"]),
+                    "volume_ratio": _float_or_none(result["volume_ratio"]),
+                    "history": history,
+                    "bar_close": bar_close,
+                    "bar_volume": bar_volume,
+                    "computed_at": now,
+                }
+            )
+
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                stmt = pg_insert(SmartScore).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[SmartScore.date, SmartScore.ticker],
+                    set_={col: stmt.excluded[col] for col in _UPDATE_COLUMNS},
+                )
+                db.execute(stmt)
+            else:
+                for row in rows:
+                    db.merge(SmartScore(**row))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+
+def latest_date(db: Session, market: str) -> Optional[date]:
+    """Most recent scored bar date for a market."""
+    return (
+        db.query(func.max(SmartScore.date)).filter(SmartScore.market == market).scalar()
+    )
+
+
+def top_scores(
+    db: Session, market: str, limit: int = 20, day: Optional[date] = None
+) -> tuple:
+    """(day, rows) — the day's highest scores (latest scored day by default)."""
+    day = day or latest_date(db, market)
+    if day is None:
+        return None, []
+    rows = (
+        db.query(SmartScore)
+        .filter(SmartScore.market == market, SmartScore.date == day)
+        .order_by(SmartScore.score.desc(), SmartScore.ticker)
+        .limit(limit)
+        .all()
+    )
+    return day, rows
+
+
+def anomalies(
+    db: Session, market: str, limit: int = 20, day: Optional[date] = None
+) -> tuple:
+    """(day, rows) — the day's anomaly-flagged tickers, highest score first."""
+    day = day or latest_date(db, market)
+    if day is None:
+        return None, []
+    rows = (
+        db.query(SmartScore)
+        .filter(
+            SmartScore.market == market,
+            SmartScore.date == day,
+            SmartScore.is_anomaly.is_(True),
+        )
+        .order_by(SmartScore.score.desc(), SmartScore.ticker)
+        .limit(limit)
+        .all()
+    )
+    return day, rows
+
+
+def ticker_history(db: Session, ticker: str, days: int = 60) -> List[SmartScore]:
+    """A ticker's daily scores over the last `days` calendar days, oldest first."""
+    return (
+        db.query(SmartScore)
+        .filter(
+            SmartScore.ticker == ticker,
+            SmartScore.date >= date.today() - timedelta(days=days),
+        )
+        .order_by(SmartScore.date)
+        .all()
+    )
+
+
+def to_dict(row: SmartScore) -> dict:
+    """Row in the shape scan_and_score() returns (plus date)."""
+    history = row.history or {}
+    return {
+        "date": row.date.isoformat(),
+        "ticker": row.ticker,
+        "market": row.market,
+        "name": row.name or row.ticker,
+        "score": row.score,
+        "inst_score": row.inst_score,
+        "momentum_score": row.momentum_score,
+        "volume_score": row.volume_score,
+        "is_anomaly": row.is_anomaly,
+        "anomaly_reason": row.anomaly_reason or "",
+        "price": row.price,
+        "change_percent": row.change_percent,
+        "vwap": row.vwap,
+        "ma5": row.ma5,
+        "volume_ratio": row.volume_ratio,
+        "volume_history": history.get("volume", []),
+        "price_history": history.get("price", []),
+        "dates": history.get("dates", []),
+    }
+
+
+def _float_or_none(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnan(value) else value
+
+
+def _int_or_none(value) -> Optional[int]:
+    value = _float_or_none(value)
+    return int(value) if value is not None else None
@@ -1,8 +1,36 @@
-from datetime import datetime, time
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Optional
 import pytz
 
+from services.market_holidays import exchange_holidays
+
 
 class SystemService:
+    # Regular trading hours per market, in the exchange's own timezone
+    # (US hours in New York time so DST is handled by pytz)
+    MARKET_HOURS = {
+        "KR": {
+            "tz": "Asia/Seoul",
+            "pre_open": time(8, 30),
+            "open": time(9, 0),
+            "close": time(15, 30),
+        },
+        "US": {
+            "tz": "America/New_York",
+            "pre_open": time(4, 0),
+            "open": time(9, 30),
+            "close": time(16, 0),
+        },
+    }
+
+    # Session states returned by get_market_session()
+    SESSION_OPEN = "OPEN"
+    SESSION_PRE_MARKET = "PRE_MARKET"
+    SESSION_CLOSED = "CLOSED"
+    SESSION_WEEKEND = "WEEKEND"
+    SESSION_HOLIDAY = "HOLIDAY"
+
     def get_current_app_mode(self):
         """
         Determine the current application mode based on KST time.
@@ -54,3 +82,80 @@ class SystemService:
                 "primary_color": "0xFF10B981",  # Green
                 "message": "밤사이 미국 증시 마감 상황입니다.",
             }
+
+    def get_market_session(self, market: str, now: Optional[datetime] = None) -> str:
+        """
+        Current session of a market ("KR" or "US").
+
+        Returns:
+            OPEN, PRE_MARKET, CLOSED, WEEKEND or HOLIDAY
+        """
+        hours = self.MARKET_HOURS[market]
+        local = self._local_now(market, now)
+        day = local.date()
+
+        if day.weekday() >= 5:
+            return self.SESSION_WEEKEND
+        if day in self._holidays(market, day.year):
+            return self.SESSION_HOLIDAY
+
+        t = local.time()
+        if hours["open"] <= t < hours["close"]:
+            return self.SESSION_OPEN
+        if hours["pre_open"] <= t < hours["open"]:
+            return self.SESSION_PRE_MARKET
+        return self.SESSION_CLOSED
+
+    def get_last_close(self, market: str, now: Optional[datetime] = None) -> datetime:
+        """Most recent regular-session close at or before now (tz-aware)."""
+        hours = self.MARKET_HOURS[market]
+        local = self._local_now(market, now)
+        tz = local.tzinfo
+
+        day = local.date()
+        if local.time() < hours["close"]:
+            day -= timedelta(days=1)
+        while not self.is_trading_day(market, day):
+            day -= timedelta(days=1)
+        return tz.localize(datetime.combine(day, hours["close"]))
+
+    def get_next_open(self, market: str, now: Optional[datetime] = None) -> datetime:
+        """Next regular-session open strictly after now (tz-aware)."""
+        hours = self.MARKET_HOURS[market]
+        local = self._local_now(market, now)
+        tz = local.tzinfo
+
+        day = local.date()
+        if local.time() >= hours["open"]:
+            day += timedelta(days=1)
+        while not self.is_trading_day(market, day):
+            day += timedelta(days=1)
+        return tz.localize(datetime.combine(day, hours["open"]))
+
+    def is_trading_day(self, market: str, day: date) -> bool:
+        return day.weekday() < 5 and day not in self._holidays(market, day.year)
+
+    def _local_now(self, market: str, now: Optional[datetime]) -> datetime:
+        tz = pytz.timezone(self.MARKET_HOURS[market]["tz"])
+        if now is None:
+            return datetime.now(tz)
+        if now.tzinfo is None:
+            now = pytz.utc.localize(now)
+        return now.astimezone(tz)
+
+    def _holidays(self, market: str, year: int) -> set:
+        """
+        Exchange holidays for a year: the built-in calendar
+        (services/market_holidays.py) plus MARKET_HOLIDAYS_<MARKET>
+        (comma-separated ISO dates).
+        """
+        raw = os.getenv(f"MARKET_HOLIDAYS_{market}", "")
+        holidays = set(exchange_holidays(market, year))
+        for item in raw.split(","):
+            item = item.strip()
+            if item:
+                try:
+                    holidays.add(date.fromisoformat(item))
+                except ValueError:
+                    continue
+        return holidays
@@ -0,0 +1,146 @@
+"""
+Ticker Metadata - Long-TTL cache for slow-changing reference data.
+
+Names, sectors, share counts and business summaries barely change, yet scans
+and stock pages used to call yf.Ticker(t).info (one slow, heavily throttled
+HTTP request each) for every ticker. Prices and changes come from batched
+quotes instead (YahooFinanceService.get_quotes); the reference fields live
+under meta:reference:<symbol> for TTL_METADATA (7 days) in the shared cache:
+  1. One get_many_cached() round trip serves every cached ticker
+  2. Misses are fetched on a small thread pool, each through
+     CacheService.lookup() so single-flight, stale fallback and failure
+     backoff apply per ticker
+A ticker that can't be fetched only affects itself; its reason is returned
+in MetadataResult.failures. Without a usable cache (e.g. the database is
+down) tickers are fetched directly.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, NamedTuple
+
+import yfinance as yf
+
+from services import upstream
+from services.cache_keys import ticker_metadata
+from services.cache_service import TTL_METADATA, CacheService
+
+logger = logging.getLogger(__name__)
+
+# yfinance info fields kept in the cache
+METADATA_FIELDS = (
+    "shortName",
+    "longName",
+    "sharesOutstanding",
+    "quoteType",
+    "sector",
+    "industry",
+    "currency",
+    "marketCap",
+    "trailingPE",
+    "longBusinessSummary",
+)
+
+# Concurrent info requests for cache misses (Yahoo throttles bursts)
+METADATA_WORKERS = int(os.getenv("METADATA_WORKERS", "4"))
+
+
+class MetadataResult(NamedTuple):
+    infos: Dict[str, dict]  # ticker -> {field: value}
+    failures: Dict[str, str]  # ticker -> reason
+
+
+def fetch_metadata(ticker: str) -> dict:
+    """METADATA_FIELDS from yfinance info (raises on upstream errors)."""
+    info = upstream.call(upstream.YAHOO, lambda: yf.Ticker(ticker).info) or {}
+    return {
+        field: info[field] for field in METADATA_FIELDS if info.get(field) is not None
+    }
+
+
+def get_metadata(tickers: Iterable[str], session_factory=None) -> MetadataResult:
+    """
+    Cached metadata for tickers.
+
+    Args:
+        tickers: yfinance symbols
+        session_factory: DB session factory for the cache (default SessionLocal)
+
+    Returns:
+        MetadataResult(infos, failures) — every ticker is in exactly one
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    if not tickers:
+        return MetadataResult({}, {})
+    if session_factory is None:
+        from database import SessionLocal
+
+        session_factory = SessionLocal
+
+    infos: Dict[str, dict] = {}
+    db = session_factory()
+    try:
+        cached = CacheService(db).get_many_cached(
+            [ticker_metadata(t) for t in tickers], TTL_METADATA
+        )
+        for ticker in tickers:
+            data = cached.get(ticker_metadata(ticker))
+            if data is not None:
+                infos[ticker] = data
+    except Exception as e:
+        logger.warning(f"Metadata cache read failed: {e}")
+    finally:
+        db.close()
+
+    missing = [t for t in tickers if t not in infos]
+    failures: Dict[str, str] = {}
+    if missing:
+        workers = max(1, min(METADATA_WORKERS, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = pool.map(lambda t: _lookup_one(t, session_factory), missing)
+            for ticker, (data, reason) in zip(missing, outcomes):
+                if data is not None:
+                    infos[ticker] = data
+                else:
+                    failures[ticker] = reason
+
+    if failures:
+        logger.warning(
+            f"Metadata unavailable for {len(failures)}/{len(tickers)} tickers: "
+            f"{', '.join(sorted(failures)[:10])}"
+        )
+    return MetadataResult(infos, failures)
+
+
+def _lookup_one(ticker: str, session_factory):
+    """(data, None) or (None, reason) for one ticker, on its own session."""
+    errors = []
+
+    def fetcher():
+        try:
+            return fetch_metadata(ticker)
+        except Exception as e:
+            errors.append(str(e)[:200])
+            raise
+
+    try:
+        db = session_factory()
+        try:
+            result = CacheService(db).lookup(
+                ticker_metadata(ticker), fetcher, TTL_METADATA
+            )
+        finally:
+            db.close()
+        if result.data is not None:
+            return result.data, None
+        return None, errors[-1] if errors else "no metadata (empty info or backing off)"
+    except Exception as e:
+        # Cache unusable: go straight to the upstream
+        logger.warning(f"Metadata cache unavailable for {ticker}: {e}")
+
+    try:
+        data = fetch_metadata(ticker)
+    except Exception as e:
+        return None, str(e)[:200]
+    return (data, None) if data else (None, "empty info")
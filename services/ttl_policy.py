@@ -0,0 +1,140 @@
+"""
+TTL Policy - Session-aware cache TTLs.
+
+Instead of one fixed TTL per data type, the effective TTL depends on the
+session of the market the data tracks (SystemService.get_market_session):
+  OPEN:        short TTL — prices are moving
+  PRE_MARKET:  medium TTL
+  CLOSED / WEEKEND / HOLIDAY: the entry stays fresh as long as it was
+      stored after the last close (+ settle delay), i.e. until the next open
+
+The closed-market TTL is "minutes since the last close settled", so an entry
+written before the close is stale while one written after it is fresh.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from services.cache_service import (
+    TTL_FEAR_GREED,
+    TTL_GAINERS_LOSERS,
+    TTL_MARKET_INDICES,
+    TTL_STOCK_DETAIL,
+)
+from services.system_service import SystemService
+
+logger = logging.getLogger(__name__)
+
+# Minutes after the close before the final prints are trusted
+CLOSE_SETTLE_MINUTES = 15
+
+# Per data type: markets it tracks, TTL (minutes) while open / pre-market,
+# optional cap while closed, and the fixed TTL used if session lookup fails
+TTL_RULES = {
+    "indices": {
+        "markets": ("US", "KR"),
+        "open": 5,
+        "pre_market": 15,
+        # Payload also carries BTC/ETH, which trade through weekends
+        "closed_max": 60,
+        "fallback": TTL_MARKET_INDICES,
+    },
+    "movers": {
+        "markets": ("US",),
+        "open": 10,
+        "pre_market": 30,
+        "closed_max": None,
+        "fallback": TTL_GAINERS_LOSERS,
+    },
+    "fear_greed": {
+        "markets": ("US",),
+        "open": 60,
+        "pre_market": 120,
+        "closed_max": None,
+        "fallback": TTL_FEAR_GREED,
+    },
+    "stock_detail": {
+        "markets": ("US",),  # replaced by the ticker's own market
+        "open": 5,
+        "pre_market": 15,
+        "closed_max": None,
+        "fallback": TTL_STOCK_DETAIL,
+    },
+}
+
+_KR_TICKER = re.compile(r"^\d{6}(\.(KS|KQ))?$", re.IGNORECASE)
+
+
+def market_for_ticker(ticker: str) -> str:
+    """KR for KRX codes (005930, 005930.KS, 035720.KQ), otherwise US."""
+    return "KR" if _KR_TICKER.match(ticker or "") else "US"
+
+
+class TTLPolicy:
+    """Computes effective TTLs (minutes) from the relevant market session."""
+
+    def __init__(self, system_service: Optional[SystemService] = None):
+        self.system_service = system_service or SystemService()
+
+    def ttl_for(
+        self,
+        kind: str,
+        ticker: Optional[str] = None,
+        now: Optional[datetime] = None,
+        lead_minutes: float = 0,
+    ) -> float:
+        """
+        Effective TTL in minutes for a data type.
+
+        Args:
+            kind: Key in TTL_RULES ("indices", "movers", "fear_greed", "stock_detail")
+            ticker: For per-ticker data, picks the ticker's market
+            now: Override current time (tz-aware or UTC)
+            lead_minutes: Shorten rolling TTLs by this much (for pre-warming).
+                Not applied to closed-market TTLs — those expire at the next
+                session change, not at a fixed age.
+
+        Returns:
+            TTL in minutes — the shortest across the tracked markets
+        """
+        rule = TTL_RULES[kind]
+        markets = (market_for_ticker(ticker),) if ticker else rule["markets"]
+        try:
+            ttls = []
+            for market in markets:
+                ttl, rolling = self._market_ttl(rule, market, now)
+                ttls.append(max(ttl - lead_minutes, 0) if rolling else ttl)
+            return min(ttls)
+        except Exception as e:
+            logger.warning(f"TTL policy failed for '{kind}', using fixed TTL: {e}")
+            return max(rule["fallback"] - lead_minutes, 0)
+
+    def _market_ttl(
+        self, rule: dict, market: str, now: Optional[datetime]
+    ) -> Tuple[float, bool]:
+        """(TTL minutes, whether it is a rolling age limit) for one market."""
+        session = self.system_service.get_market_session(market, now)
+        if session == SystemService.SESSION_OPEN:
+            return rule["open"], True
+        if session == SystemService.SESSION_PRE_MARKET:
+            return rule["pre_market"], True
+
+        # Closed: fresh iff stored after the last close settled
+        last_close = self.system_service.get_last_close(market, now)
+        settled = last_close + timedelta(minutes=CLOSE_SETTLE_MINUTES)
+        current = now or datetime.now(settled.tzinfo)
+        if current.tzinfo is None:
+            current = current.replace(tzinfo=timezone.utc)
+        since_settled = (current - settled).total_seconds() / 60
+        if since_settled <= rule["open"]:
+            return rule["open"], True
+
+        if rule["closed_max"] is not None and since_settled > rule["closed_max"]:
+            return rule["closed_max"], True
+        return since_settled, False
+
+
+# Shared instance for routers and background workers
+ttl_policy = TTLPolicy()
@@ -0,0 +1,561 @@
+"""
+Upstream - Shared outbound-call layer for every external data source.
+
+yfinance, CNN Fear & Greed, the Federal Reserve calendar, ApeWisdom, KIS,
+NewsAPI and the RSS feeds all go through call() / request() (acall() /
+arequest() from async code), which apply per host (HTTP requests are sent
+by services/http_client.py's pooled clients):
+  1. A token bucket (HostPolicy.rate calls/s, bursts up to .burst) — callers
+     wait for a token instead of tripping the free tiers' rate limits
+  2. A circuit breaker that opens after .failure_threshold consecutive
+     failures, rejects calls for .reset_seconds, then half-opens and lets a
+     single probe decide whether to close again
+  3. Retries with full-jitter exponential backoff (honouring Retry-After)
+     for connection errors, timeouts, 429s and 5xx responses
+
+yfinance does its own HTTP, so its calls are wrapped under the logical host
+"yahoo"; batched yf.download calls go through download(), which charges a
+token per ticker and reports the per-ticker errors yfinance swallows.
+get_stats() reports calls, latency, 429s, retries and breaker state
+per host (routers/system.py: /system/upstream-stats).
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+from urllib.parse import urlparse
+
+import httpx
+import requests
+import yfinance as yf
+from yfinance import shared as yf_shared
+
+from services.http_client import (
+    AsyncHttpClient,
+    HttpClient,
+    get_async_http_client,
+    get_http_client,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class HostPolicy(NamedTuple):
+    rate: float  # sustained calls per second
+    burst: int  # bucket capacity
+    failure_threshold: int = 5  # consecutive failures that open the breaker
+    reset_seconds: float = 30.0  # open -> half-open after this long
+    retries: int = 2  # extra attempts for retryable failures
+    backoff_seconds: float = 0.5  # first retry's backoff ceiling (doubles)
+    backoff_max: float = 10.0
+    max_wait: float = 30.0  # longest a caller waits for a token
+
+
+# Logical host for yfinance (query1/query2.finance.yahoo.com)
+YAHOO = "yahoo"
+
+DEFAULT_POLICY = HostPolicy(rate=5.0, burst=10)
+
+HOST_POLICIES: Dict[str, HostPolicy] = {
+    YAHOO: HostPolicy(
+        rate=float(os.getenv("UPSTREAM_YAHOO_RATE", "50")),
+        burst=int(os.getenv("UPSTREAM_YAHOO_BURST", "100")),
+        failure_threshold=20,
+        retries=0,  # history_store / ticker_metadata retry per chunk / ticker
+    ),
+    "production.dataviz.cnn.io": HostPolicy(rate=1.0, burst=2),
+    "www.federalreserve.gov": HostPolicy(rate=1.0, burst=2),
+    "apewisdom.io": HostPolicy(rate=1.0, burst=2),
+    "newsapi.org": HostPolicy(rate=1.0, burst=5),
+    # KIS open API allows ~20 calls/s per app key
+    "openapi.koreainvestment.com": HostPolicy(rate=15.0, burst=20),
+}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """Call refused by the upstream layer (not sent)."""
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+class RateLimitedError(UpstreamError):
+    pass
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is free."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float, tokens: float = 1.0) -> float:
+        """
+        Take tokens now, possibly borrowed from the future.
+
+        Returns:
+            Seconds the caller must wait before sending (raises
+            RateLimitedError if that would exceed max_wait)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # Reserve the token now (the balance may go negative) so
+            # concurrent callers queue up instead of all waking at once
+            wait = (
+                (tokens - self._tokens) / self.rate if self._tokens < tokens else 0.0
+            )
+            if wait > max_wait:
+                raise RateLimitedError(f"token wait {wait:.1f}s > {max_wait}s")
+            self._tokens -= tokens
+        return wait
+
+    def acquire(self, max_wait: float) -> float:
+        """reserve() and sleep until the token is due; returns seconds waited."""
+        wait = self.reserve(max_wait)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half-open probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the probe when half-open)."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def release(self):
+        """Give back a claimed half-open probe that was never sent."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; True if this opened the breaker."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+                return True
+            return False
+
+
+class _Host:
+    def __init__(self, name: str, policy: HostPolicy):
+        self.name = name
+        self.policy = policy
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_seconds)
+
+
+class _RetryableStatus(Exception):
+    """A 429/5xx response, raised inside the retry loop."""
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+_hosts: Dict[str, _Host] = {}
+_hosts_lock = threading.Lock()
+
+# yf.download keeps its results in module globals: one call at a time
+_yf_download_lock = threading.Lock()
+
+_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+_stats_lock = threading.Lock()
+_SECONDS_STATS = ("latency", "max_latency", "wait_seconds")
+
+
+def _host(name: str) -> _Host:
+    with _hosts_lock:
+        host = _hosts.get(name)
+        if host is None:
+            host = _Host(name, HOST_POLICIES.get(name, DEFAULT_POLICY))
+            _hosts[name] = host
+        return host
+
+
+def _record(host: str, **counts: float):
+    with _stats_lock:
+        stats = _stats[host]
+        for name, value in counts.items():
+            if name == "max_latency":
+                stats[name] = max(stats[name], value)
+            else:
+                stats[name] += value
+
+
+def call(
+    host: str,
+    fn: Callable[..., Any],
+    *args,
+    passthrough: Tuple[Type[BaseException], ...] = (),
+    retries: Optional[int] = None,
+    **kwargs,
+) -> Any:
+    """
+    fn(*args, **kwargs) under host's rate limit, circuit breaker and retries.
+
+    Args:
+        host: Hostname (or YAHOO) whose policy applies
+        fn: The outbound call
+        passthrough: Exceptions that are answers, not failures (e.g. yfinance's
+            YFTickerMissingError) — re-raised without retrying or tripping
+        retries: Override HostPolicy.retries
+
+    Raises:
+        CircuitOpenError / RateLimitedError without calling fn, or fn's last
+        exception once retries are exhausted
+    """
+    state = _host(host)
+    attempts = 1 + (state.policy.retries if retries is None else retries)
+
+    for attempt in range(attempts):
+        wait = _admit(state)
+        if wait > 0:
+            time.sleep(wait)
+
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except passthrough:
+            _on_answer(state, started)
+            raise
+        except Exception as e:
+            delay = _on_failure(state, e, started, attempt, attempts)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+
+        _on_success(state, started)
+        return result
+
+
+async def acall(
+    host: str,
+    fn: Callable[..., Awaitable[Any]],
+    *args,
+    passthrough: Tuple[Type[BaseException], ...] = (),
+    retries: Optional[int] = None,
+    **kwargs,
+) -> Any:
+    """
+    call() for coroutines: same buckets, breakers and metrics, but token
+    waits and backoff sleep with asyncio.sleep instead of blocking a thread.
+    """
+    state = _host(host)
+    attempts = 1 + (state.policy.retries if retries is None else retries)
+
+    for attempt in range(attempts):
+        wait = _admit(state)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        started = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except passthrough:
+            _on_answer(state, started)
+            raise
+        except Exception as e:
+            delay = _on_failure(state, e, started, attempt, attempts)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            continue
+
+        _on_success(state, started)
+        return result
+
+
+def download(tickers: List[str], **kwargs) -> Any:
+    """
+    yf.download(tickers, **kwargs) under the YAHOO policy.
+
+    yf.download requests every ticker separately, so each one costs a token
+    and counts as a call. It returns whatever succeeded and only logs the
+    per-ticker errors (yfinance.shared._ERRORS), which are reset by every
+    call, so calls are serialized process-wide and the errors are read back
+    under the same lock: rate-limited tickers count as failures (breaker and
+    rate_limited counter), other errors as answers.
+
+    Raises:
+        CircuitOpenError / RateLimitedError without downloading, or
+        yf.download's own exception
+    """
+    tickers = list(tickers)
+    state = _host(YAHOO)
+    wait = _admit(state, tokens=max(len(tickers), 1))
+    if wait > 0:
+        time.sleep(wait)
+
+    with _yf_download_lock:
+        started = time.perf_counter()
+        try:
+            data = yf.download(tickers, **kwargs)
+        except Exception as e:
+            _on_failure(state, e, started, 0, 1)
+            raise
+        errors = dict(yf_shared._ERRORS)
+
+    limited = []
+    for ticker in tickers:
+        error = errors.get(ticker.upper())
+        if error is None:
+            _on_success(state, started)
+        elif _is_rate_limited(UpstreamError(error)):
+            limited.append(error)
+        else:
+            _on_answer(state, started)
+    # Failures last, so they are what the breaker counts as consecutive
+    for error in limited:
+        _on_failure(state, UpstreamError(error), started, 0, 1)
+    return data
+
+
+def _admit(state: _Host, tokens: float = 1.0) -> float:
+    """Breaker check + token reservation; returns how long to wait before sending."""
+    host = state.name
+    if not state.breaker.allow():
+        _record(host, rejected=1)
+        raise CircuitOpenError(f"circuit open for {host}")
+    try:
+        wait = state.bucket.reserve(state.policy.max_wait, tokens)
+    except RateLimitedError:
+        state.breaker.release()
+        _record(host, rejected=1)
+        raise
+    if wait:
+        _record(host, throttled_waits=1, wait_seconds=wait)
+    return wait
+
+
+def _on_success(state: _Host, started: float):
+    state.breaker.record_success()
+    _record(state.name, calls=1, successes=1, **_latency(started))
+
+
+def _on_answer(state: _Host, started: float):
+    """A passthrough exception: the upstream answered, so it counts as healthy."""
+    state.breaker.record_success()
+    _record(state.name, calls=1, **_latency(started))
+
+
+def _on_failure(
+    state: _Host, exc: Exception, started: float, attempt: int, attempts: int
+) -> Optional[float]:
+    """Record a failed attempt; returns the backoff before retrying, or None."""
+    host, policy = state.name, state.policy
+    opened = state.breaker.record_failure()
+    _record(
+        host,
+        calls=1,
+        failures=1,
+        rate_limited=1 if _is_rate_limited(exc) else 0,
+        breaker_opens=1 if opened else 0,
+        **_latency(started),
+    )
+    if opened:
+        logger.warning(f"Circuit opened for {host} after: {exc}")
+    if attempt + 1 >= attempts or not _is_retryable(exc):
+        return None
+    delay = random.uniform(
+        0, min(policy.backoff_max, policy.backoff_seconds * 2**attempt)
+    )
+    if isinstance(exc, _RetryableStatus):
+        retry_after = _retry_after(exc.response)
+        if retry_after is not None:
+            delay = min(policy.backoff_max, max(delay, retry_after))
+    _record(host, retries=1)
+    return delay
+
+
+def request(
+    method: str, url: str, client: Optional[HttpClient] = None, **kwargs
+) -> httpx.Response:
+    """
+    One HTTP request through call() for url's host, sent on a pooled
+    keep-alive connection (client, default get_http_client()).
+
+    429/5xx responses are retried; once retries run out the last response
+    is returned as-is, so callers keep checking status_code /
+    raise_for_status() as before. Connection errors and timeouts raise.
+    """
+    client = client or get_http_client()
+
+    def send():
+        response = client.request(method, url, **kwargs)
+        if response.status_code in RETRYABLE_STATUS:
+            raise _RetryableStatus(response)
+        return response
+
+    try:
+        return call(urlparse(url).hostname or url, send)
+    except _RetryableStatus as e:
+        return e.response
+
+
+async def arequest(
+    method: str,
+    url: str,
+    client: Optional[AsyncHttpClient] = None,
+    host: Optional[str] = None,
+    **kwargs,
+) -> httpx.Response:
+    """
+    request() on the pooled async client (default get_async_http_client()).
+
+    Args:
+        host: Policy to apply instead of url's hostname (e.g. YAHOO for the
+            chart API, so it shares yfinance's budget)
+    """
+    client = client or get_async_http_client()
+
+    async def send():
+        response = await client.request(method, url, **kwargs)
+        if response.status_code in RETRYABLE_STATUS:
+            raise _RetryableStatus(response)
+        return response
+
+    try:
+        return await acall(host or urlparse(url).hostname or url, send)
+    except _RetryableStatus as e:
+        return e.response
+
+
+async def aget(
+    url: str, client: Optional[AsyncHttpClient] = None, **kwargs
+) -> httpx.Response:
+    return await arequest("GET", url, client, **kwargs)
+
+
+async def apost(
+    url: str, client: Optional[AsyncHttpClient] = None, **kwargs
+) -> httpx.Response:
+    return await arequest("POST", url, client, **kwargs)
+
+
+def get(url: str, client: Optional[HttpClient] = None, **kwargs) -> httpx.Response:
+    return request("GET", url, client, **kwargs)
+
+
+def post(url: str, client: Optional[HttpClient] = None, **kwargs) -> httpx.Response:
+    return request("POST", url, client, **kwargs)
+
+
+def get_stats() -> dict:
+    """Per-host call counters, 429s, retries, latency and breaker state."""
+    with _stats_lock:
+        report = {
+            host: {
+                name: value if name in _SECONDS_STATS else int(value)
+                for name, value in stats.items()
+            }
+            for host, stats in _stats.items()
+        }
+    with _hosts_lock:
+        hosts = dict(_hosts)
+    for name, host in hosts.items():
+        stats = report.setdefault(name, {})
+        calls = stats.get("calls", 0)
+        stats["avg_latency_ms"] = (
+            round(stats.get("latency", 0) / calls * 1000, 1) if calls else 0.0
+        )
+        stats["max_latency_ms"] = round(stats.pop("max_latency", 0) * 1000, 1)
+        stats.pop("latency", None)
+        stats["wait_seconds"] = round(stats.get("wait_seconds", 0), 3)
+        stats["breaker"] = host.breaker.state
+        stats["consecutive_failures"] = host.breaker.failures
+        stats["policy"] = host.policy._asdict()
+    return report
+
+
+def _latency(started: float) -> dict:
+    elapsed = time.perf_counter() - started
+    return {"latency": elapsed, "max_latency": elapsed}
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    if isinstance(exc, _RetryableStatus):
+        return exc.response.status_code == 429
+    text = f"{type(exc).__name__} {exc}"
+    return "RateLimit" in text or "429" in text or "Too Many Requests" in text
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    return isinstance(
+        exc,
+        (
+            _RetryableStatus,
+            httpx.TransportError,
+            requests.ConnectionError,
+            requests.Timeout,
+        ),
+    ) or _is_rate_limited(exc)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
@@ -3,19 +3,40 @@ Yahoo Finance Service - Free alternative to Polygon.io
 Provides US stock market data without API key requirements
 """
 
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import logging
 
+import pandas as pd
+
+from services.constituents import load_universe
+from services.history_store import _float_or_none, _int_or_none, load_history
+from services.movers import build_board, top_movers
+from services.ticker_metadata import get_metadata
+
 logger = logging.getLogger(__name__)
 
+# Calendar days of daily bars behind a quote (covers long weekends/holidays)
+QUOTE_LOOKBACK_DAYS = 10
+
 
 class YahooFinanceService:
     """Free US market data service using Yahoo Finance"""
 
-    # S&P 500 major components for top gainers analysis
+    # Indices for each market (symbol -> display name, market group)
+    INDICES_MAP = {
+        # US
+        "^GSPC": {"name": "S&P 500", "market": "US"},
+        "^DJI": {"name": "Dow Jones", "market": "US"},
+        "^IXIC": {"name": "Nasdaq", "market": "US"},
+        # KR
+        "^KS11": {"name": "KOSPI", "market": "KR"},
+        "^KQ11": {"name": "KOSDAQ", "market": "KR"},
+        # Coin
+        "BTC-USD": {"name": "Bitcoin", "market": "Coin"},
+        "ETH-USD": {"name": "Ethereum", "market": "Coin"},
+    }
+
+    # S&P 500 major components (mover universe until constituents are synced)
     SP500_MAJOR_TICKERS = [
         "AAPL",
         "MSFT",
@@ -220,69 +241,53 @@ class YahooFinanceService:
             ]
 
     def get_top_gainers(self, limit: int = 10) -> List[Dict]:
-        """Get top gaining stocks from major S&P 500 components (real data)."""
+        """Get top gaining stocks across the mover universe (real data)."""
         try:
-            all_stocks = self._fetch_all_movers()
-            if not all_stocks:
-                return self._get_mock_gainers_losers(is_gainer=True)[:limit]
-            # Sort descending (biggest gain first)
-            all_stocks.sort(key=lambda x: x["change_percent"], reverse=True)
-            gainers = [s for s in all_stocks if s["change_percent"] > 0]
-            return (gainers or self._get_mock_gainers_losers(is_gainer=True))[:limit]
+            board, infos = self._fetch_mover_board()
+            gainers = top_movers(board, limit, gainers=True, infos=infos)
+            return gainers or self._get_mock_gainers_losers(is_gainer=True)[:limit]
         except Exception as e:
             logger.error(f"Error fetching top gainers: {e}")
             return self._get_mock_gainers_losers(is_gainer=True)[:limit]
 
     def get_top_losers(self, limit: int = 10) -> List[Dict]:
-        """Get top losing stocks from major S&P 500 components (real data)."""
+        """Get top losing stocks across the mover universe (real data)."""
         try:
-            all_stocks = self._fetch_all_movers()
-            if not all_stocks:
-                return self._get_mock_gainers_losers(is_gainer=False)[:limit]
-            # Sort ascending (most negative first)
-            all_stocks.sort(key=lambda x: x["change_percent"])
-            losers = [s for s in all_stocks if s["change_percent"] < 0]
-            return (losers or self._get_mock_gainers_losers(is_gainer=False))[:limit]
+            board, infos = self._fetch_mover_board()
+            losers = top_movers(board, limit, gainers=False, infos=infos)
+            return losers or self._get_mock_gainers_losers(is_gainer=False)[:limit]
         except Exception as e:
             logger.error(f"Error fetching top losers: {e}")
             return self._get_mock_gainers_losers(is_gainer=False)[:limit]
 
-    def _fetch_all_movers(self) -> List[Dict]:
-        """Shared batch download for both gainers and losers."""
-        try:
-            tickers_str = " ".join(self.SP500_MAJOR_TICKERS[:30])
-            data = yf.download(
-                tickers_str, period="2d", group_by="ticker",
-                progress=False, threads=False,
-            )
-            if data is None or data.empty:
-                return []
+    def _fetch_mover_board(self):
+        """
+        Shared batch quotes for both gainers and losers: the S&P 500 /
+        NASDAQ-100 constituents (SP500_MAJOR_TICKERS until the constituents
+        table is synced), read from the history store in one pass.
 
-            results = []
-            for ticker in self.SP500_MAJOR_TICKERS[:30]:
-                try:
-                    if ticker in data.columns.levels[0]:
-                        df = data[ticker]
-                    else:
-                        continue
-                    if len(df) < 2:
-                        continue
-                    current_close = float(df["Close"].iloc[-1])
-                    prev_close = float(df["Close"].iloc[-2])
-                    if prev_close > 0:
-                        change_percent = ((current_close - prev_close) / prev_close) * 100
-                        results.append({
-                            "ticker": ticker, "name": ticker,
-                            "price": current_close,
-                            "change_percent": round(change_percent, 2),
-                            "sector": "Major US",
-                            "volume": int(df["Volume"].iloc[-1]),
-                        })
-                except Exception:
-                    continue
-            return results
-        except Exception:
-            return []
+        Returns:
+            (MoverBoard, {ticker: {"name", "sector"}})
+        """
+        infos = load_universe() or {
+            ticker: {"name": ticker, "sector": "Major US"}
+            for ticker in self.SP500_MAJOR_TICKERS
+        }
+        tickers = list(infos)
+        frames = load_history(tickers, days=QUOTE_LOOKBACK_DAYS)
+        return build_board(frames), infos
+
+    def get_quotes(self, tickers: List[str]) -> Dict[str, Dict]:
+        """
+        Latest price and change for many tickers in one batched request.
+
+        Args:
+            tickers: yfinance symbols
+
+        Returns:
+            {ticker: quote} (see get_quotes()); unknown tickers are omitted
+        """
+        return get_quotes(tickers)
 
     def get_stock_data(self, ticker: str) -> Optional[Dict]:
         """
@@ -295,107 +300,72 @@ class YahooFinanceService:
             Dictionary with stock data or None if error
         """
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            quote = self.get_quotes([ticker]).get(ticker)
+            if not quote:
+                return None
+            reference = get_metadata([ticker]).infos.get(ticker, {})
+            return _stock_payload(ticker, quote, reference)
+        except Exception as e:
+            logger.error(f"Error fetching data for {ticker}: {e}")
+            return None
 
-            current_price = info.get("currentPrice") or info.get("regularMarketPrice")
-            previous_close = info.get("previousClose")
+    def get_stock_detail(self, ticker: str, days: int = 30) -> Optional[Dict]:
+        """
+        Stock data plus recent daily history (payload of /market/stock/{ticker})
 
-            if not current_price:
-                return None
+        Returns:
+            get_stock_data() dict with a "history" list, or None if unknown
+        """
+        return self.get_stock_details([ticker], days=days).get(ticker)
 
-            change_percent = 0
-            if previous_close:
-                change_percent = (
-                    (current_price - previous_close) / previous_close
-                ) * 100
-
-            return {
-                "ticker": ticker,
-                "name": info.get("longName", ticker),
-                "price": current_price,
-                "change_percent": round(change_percent, 2),
-                "sector": info.get("sector", "Unknown"),
-                "volume": info.get("volume", 0),
-                "market_cap": info.get("marketCap", 0),
-                "pe_ratio": info.get("trailingPE"),
-                "currency": info.get("currency", "USD"),
-                "description": info.get(
-                    "longBusinessSummary", "No description available."
-                ),
-            }
+    def get_stock_details(self, tickers: List[str], days: int = 30) -> Dict[str, Dict]:
+        """
+        get_stock_detail() for many tickers: one batched history read for the
+        quotes and sparklines, one metadata lookup for the reference fields.
 
+        Returns:
+            {ticker: detail dict}; unknown tickers are omitted
+        """
+        try:
+            frames = load_history(tickers, days=days)
+            quotes = quotes_from_frames(frames)
+            references = get_metadata(list(quotes)).infos
         except Exception as e:
-            logger.error(f"Error fetching data for {ticker}: {e}")
-            return None
+            logger.error(f"Error fetching details for {len(tickers)} tickers: {e}")
+            return {}
+
+        details = {}
+        for ticker, quote in quotes.items():
+            detail = _stock_payload(ticker, quote, references.get(ticker, {}))
+            detail["history"] = _history_rows(frames[ticker])
+            details[ticker] = detail
+        return details
 
     def get_market_indices(self) -> Dict:
         """
         Get major market indices for US, KR, and Crypto.
-        Uses yf.download() batch method for reliability.
+        Reads daily bars from the history store (chunked downloads for
+        whatever tail is missing).
 
         Returns:
             Dictionary with index data keyed by symbol
         """
-        # Define indices for each market
-        indices_map = {
-            # US
-            "^GSPC": {"name": "S&P 500", "market": "US"},
-            "^DJI": {"name": "Dow Jones", "market": "US"},
-            "^IXIC": {"name": "Nasdaq", "market": "US"},
-            # KR
-            "^KS11": {"name": "KOSPI", "market": "KR"},
-            "^KQ11": {"name": "KOSDAQ", "market": "KR"},
-            # Coin
-            "BTC-USD": {"name": "Bitcoin", "market": "Coin"},
-            "ETH-USD": {"name": "Ethereum", "market": "Coin"},
-        }
-        tickers_str = " ".join(indices_map.keys())
-
         try:
-            logger.info(f"Downloading market indices: {tickers_str}")
-            # Fetch 1 month to ensure enough data points for sparkline (approx ~20 trading days)
-            data = yf.download(
-                tickers_str,
-                period="1mo",
-                group_by="ticker",
-                progress=False,
-                threads=False,
-            )
-
-            if data is None or data.empty:
-                logger.warning(
-                    "yfinance download returned empty for indices, using mock"
-                )
+            # 1 month of daily bars for the sparkline (~20 trading days), served
+            # from the local history store — only the missing tail is downloaded
+            frames = load_history(list(self.INDICES_MAP), days=31)
+
+            if not frames:
+                logger.warning("No history available for indices, using mock")
                 return self._get_mock_indices()
 
             results = {}
-            for symbol, info in indices_map.items():
+            for symbol, info in self.INDICES_MAP.items():
                 name = info["name"]
                 market = info["market"]
                 try:
-                    df = None
-                    if len(indices_map) == 1:
-                        df = data
-                    else:
-                        # Handle potential MultiIndex columns structure differences
-                        if isinstance(data.columns, pd.MultiIndex):
-                            if symbol in data.columns.get_level_values(
-                                1
-                            ):  # Ticker is level 1
-                                df = data.xs(symbol, axis=1, level=1)
-                            elif symbol in data.columns.get_level_values(
-                                0
-                            ):  # Ticker is level 0
-                                df = data[symbol]
-                        else:
-                            if symbol in data.columns:
-                                df = data[
-                                    symbol
-                                ]  # Should not happen with group_by='ticker' but safe check
-
+                    df = frames.get(symbol)
                     if df is None:
-                        # Fallback search if structure is unexpected
                         continue
 
                     # Drop NaN rows and get last 2 valid closes
@@ -493,27 +463,101 @@ class YahooFinanceService:
             List of daily price data
         """
         try:
-            stock = yf.Ticker(ticker)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-
-            hist = stock.history(start=start_date, end=end_date)
-
-            data = []
-            for date, row in hist.iterrows():
-                data.append(
-                    {
-                        "date": date.strftime("%Y-%m-%d"),
-                        "open": round(row["Open"], 2),
-                        "high": round(row["High"], 2),
-                        "low": round(row["Low"], 2),
-                        "close": round(row["Close"], 2),
-                        "volume": int(row["Volume"]),
-                    }
-                )
-
-            return data
+            hist = load_history([ticker], days=days).get(ticker)
+            if hist is None:
+                return []
+            return _history_rows(hist)
 
         except Exception as e:
             logger.error(f"Error fetching historical data for {ticker}: {e}")
             return []
+
+
+def get_quotes(tickers: List[str], days: int = QUOTE_LOOKBACK_DAYS) -> Dict[str, Dict]:
+    """
+    Latest price and change for many tickers from the history store.
+
+    Replaces per-ticker yf.Ticker(t).info calls: every ticker's recent bars
+    come from one read of the store, which syncs stale tails with chunked
+    downloads. Slow-moving fields (name, sector, market cap, ...)
+    come from the reference cache in services/ticker_metadata.py instead.
+
+    Returns:
+        {ticker: {"price", "previous_close", "change", "change_percent",
+        "volume", "date"}}; tickers without bars are omitted
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    if not tickers:
+        return {}
+    return quotes_from_frames(load_history(tickers, days=days))
+
+
+def quotes_from_frames(frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+    """Quote dicts (see get_quotes()) from per-ticker daily bar frames."""
+    quotes = {}
+    for ticker, df in frames.items():
+        closes = df["Close"].dropna()
+        if closes.empty:
+            continue
+        price = float(closes.iloc[-1])
+        previous_close = float(closes.iloc[-2]) if len(closes) > 1 else None
+        change = change_percent = 0.0
+        if previous_close:
+            change = price - previous_close
+            change_percent = change / previous_close * 100
+        volume = df["Volume"].get(closes.index[-1]) if "Volume" in df else None
+        quotes[ticker] = {
+            "price": price,
+            "previous_close": previous_close,
+            "change": round(change, 4),
+            "change_percent": round(change_percent, 2),
+            "volume": int(volume) if volume is not None and pd.notna(volume) else 0,
+            "date": closes.index[-1].strftime("%Y-%m-%d"),
+        }
+    return quotes
+
+
+def _stock_payload(ticker: str, quote: Dict, reference: Dict) -> Dict:
+    """get_stock_data() dict from a quote and the ticker's reference data."""
+    return {
+        "ticker": ticker,
+        "name": reference.get("longName") or reference.get("shortName") or ticker,
+        "price": quote["price"],
+        "change_percent": quote["change_percent"],
+        "sector": reference.get("sector", "Unknown"),
+        "volume": quote["volume"],
+        "market_cap": reference.get("marketCap", 0),
+        "pe_ratio": reference.get("trailingPE"),
+        "currency": reference.get("currency", "USD"),
+        "description": reference.get(
+            "longBusinessSummary", "No description available."
+        ),
+    }
+
+
+def _history_rows(hist: pd.DataFrame) -> List[Dict]:
+    """
+    Daily bar dicts (date/open/high/low/close/volume) for API payloads.
+    Missing (NaN/NULL) fields become None; bars without a close are skipped.
+    """
+    data = []
+    for date, row in hist.iterrows():
+        close = _float_or_none(row.get("Close"))
+        if close is None:
+            continue
+        data.append(
+            {
+                "date": date.strftime("%Y-%m-%d"),
+                "open": _round_or_none(row.get("Open")),
+                "high": _round_or_none(row.get("High")),
+                "low": _round_or_none(row.get("Low")),
+                "close": round(close, 2),
+                "volume": _int_or_none(row.get("Volume")),
+            }
+        )
+    return data
+
+
+def _round_or_none(value) -> Optional[float]:
+    value = _float_or_none(value)
+    return round(value, 2) if value is not None else None
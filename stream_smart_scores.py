@@ -0,0 +1,59 @@
+"""
+Stream intraday Smart Score updates (logic/smart_score_stream.py).
+Seeds every ticker from daily history, then re-scores each one as its bar
+changes:
+
+    python stream_smart_scores.py --market KR                  # poll yfinance
+    python stream_smart_scores.py --market US --record bars.jsonl
+    python stream_smart_scores.py --market US --replay bars.jsonl [--speed 10]
+"""
+
+import logging
+import sys
+
+from logic.smart_score import DEFAULT_UNIVERSE
+from logic.smart_score_stream import (
+    ReplayFeed,
+    StreamingScorer,
+    YahooBarFeed,
+    record_bars,
+)
+
+
+def _arg(name, default=None):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    market = _arg("--market", "KR").upper()
+    tickers = DEFAULT_UNIVERSE[market]
+
+    scorer = StreamingScorer(market)
+    failures = scorer.seed_history(tickers)
+    if failures:
+        print(f"⚠️ Not seeded: {failures}")
+
+    replay = _arg("--replay")
+    if replay:
+        feed = ReplayFeed(replay, speed=float(_arg("--speed", "0")))
+    else:
+        feed = YahooBarFeed(tickers, interval=float(_arg("--interval", "60")))
+    record = _arg("--record")
+    if record:
+        feed = record_bars(record, feed)
+
+    try:
+        for result in scorer.run(feed):
+            flag = " 🚨" if result["is_anomaly"] else ""
+            print(f"{result['ticker']:>10} {result['score']:5.1f} "
+                  f"(inst {result['inst_score']}, mom {result['momentum_score']}, "
+                  f"vol {result['volume_score']}) {result['price']}{flag}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
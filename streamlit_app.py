@@ -31,17 +31,27 @@ if "user_uuid" not in st.session_state:
 def _is_server_up():
     """서버 실행 여부 확인"""
     try:
-        resp = requests.get("http://localhost:8000/health", timeout=3)
+        resp = _http_session().get("http://localhost:8000/health", timeout=3)
         return resp.status_code == 200
     except Exception:
         return False
 
 
+@st.cache_resource
+def _http_session() -> requests.Session:
+    """API 서버용 공유 세션 — 호출마다 새 TCP 연결을 맺지 않도록 keep-alive 커넥션 풀 재사용"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 @st.cache_data(ttl=900)
 def fetch_api(endpoint: str):
     """API 호출 헬퍼"""
     try:
-        resp = requests.get(f"{API_BASE}{endpoint}", timeout=10)
+        resp = _http_session().get(f"{API_BASE}{endpoint}", timeout=10)
         resp.raise_for_status()
         return resp.json()
     except requests.exceptions.ConnectionError:
@@ -53,7 +63,7 @@ def fetch_api(endpoint: str):
 def post_api(endpoint: str, payload: dict):
     """API POST 헬퍼"""
     try:
-        resp = requests.post(f"{API_BASE}{endpoint}", json=payload, timeout=10)
+        resp = _http_session().post(f"{API_BASE}{endpoint}", json=payload, timeout=10)
         resp.raise_for_status()
         return resp.json()
     except Exception:
@@ -63,7 +73,7 @@ def post_api(endpoint: str, payload: dict):
 def delete_api(endpoint: str):
     """API DELETE 헬퍼"""
     try:
-        resp = requests.delete(f"{API_BASE}{endpoint}", timeout=10)
+        resp = _http_session().delete(f"{API_BASE}{endpoint}", timeout=10)
         resp.raise_for_status()
         return resp.json()
     except Exception:
@@ -291,13 +301,36 @@ def get_color(val):
     return "#FF5247" if val >= 0 else "#3182F6"
 
 
-@st.cache_data(ttl=1800)
-def fetch_sector_data(market="US"):
-    """섹터별 데이터로 히트맵용 데이터 생성 (US/KR 지원)"""
+def _load_daily_history(tickers, days=10):
+    """
+    종목별 일봉 {ticker: DataFrame} — API 서버와 같은 공유 가격 패널(메모리 맵)이나
+    로컬 히스토리 스토어를 사용하고 (누락 구간만 다운로드), 둘 다 없으면
+    yfinance에서 최근 5일을 직접 받는다.
+    """
     try:
+        from services.price_panel import load_frames
+
+        return load_frames(tickers, days=days)
+    except ImportError:
         import yfinance as yf
         import pandas as pd
 
+        data = yf.download(" ".join(tickers), period="5d", group_by="ticker", progress=False, threads=False)
+        if data is None or data.empty or not isinstance(data.columns, pd.MultiIndex):
+            return {}
+        frames = {}
+        for ticker in tickers:
+            if ticker in data.columns.get_level_values(0):
+                frames[ticker] = data[ticker]
+            elif ticker in data.columns.get_level_values(1):
+                frames[ticker] = data.xs(ticker, axis=1, level=1)
+        return frames
+
+
+@st.cache_data(ttl=1800)
+def fetch_sector_data(market="US"):
+    """섹터별 데이터로 히트맵용 데이터 생성 (US/KR 지원)"""
+    try:
         if market == "KR":
             # 한국: 대분류 섹터별 대표 종목으로 섹터 등락률 계산
             sector_stocks = {
@@ -352,9 +385,8 @@ def fetch_sector_data(market="US"):
             for sector_info in sector_stocks.values():
                 all_tickers.extend(sector_info["tickers"].keys())
 
-            tickers_str = " ".join(all_tickers)
-            data = yf.download(tickers_str, period="5d", group_by="ticker", progress=False, threads=False)
-            if data is None or data.empty:
+            frames = _load_daily_history(all_tickers)
+            if not frames:
                 return [], None
 
             results = []
@@ -364,14 +396,8 @@ def fetch_sector_data(market="US"):
                 changes = []
                 for ticker in sector_info["tickers"]:
                     try:
-                        if isinstance(data.columns, pd.MultiIndex):
-                            if ticker in data.columns.get_level_values(0):
-                                df = data[ticker]
-                            elif ticker in data.columns.get_level_values(1):
-                                df = data.xs(ticker, axis=1, level=1)
-                            else:
-                                continue
-                        else:
+                        df = frames.get(ticker)
+                        if df is None:
                             continue
 
                         df = df.dropna(subset=["Close"])
@@ -418,9 +444,8 @@ def fetch_sector_data(market="US"):
                 "XLC": ("통신서비스", "Comm. Services", 9),
             }
 
-            tickers_str = " ".join(sector_etfs.keys())
-            data = yf.download(tickers_str, period="5d", group_by="ticker", progress=False, threads=False)
-            if data is None or data.empty:
+            frames = _load_daily_history(list(sector_etfs.keys()))
+            if not frames:
                 return [], None
 
             results = []
@@ -428,14 +453,8 @@ def fetch_sector_data(market="US"):
 
             for ticker, (kr_name, en_name, weight) in sector_etfs.items():
                 try:
-                    if isinstance(data.columns, pd.MultiIndex):
-                        if ticker in data.columns.get_level_values(0):
-                            df = data[ticker]
-                        elif ticker in data.columns.get_level_values(1):
-                            df = data.xs(ticker, axis=1, level=1)
-                        else:
-                            continue
-                    else:
+                    df = frames.get(ticker)
+                    if df is None:
                         continue
 
                     df = df.dropna(subset=["Close"])
@@ -506,30 +525,21 @@ def _fetch_calendar_direct(year: int, month: int):
 
 @st.cache_data(ttl=1800, show_spinner="스마트 스코어 분석 중...")
 def fetch_smart_scores(market: str = "KR"):
-    """Smart Score 엔진으로 종목 스캔 및 스코어링"""
+    """
+    Smart Score 결과 → (결과 리스트, {실패 종목: 사유}).
+    API 서버에 미리 계산된 점수가 있으면 그것을 쓰고, 없으면 직접 스캔한다.
+    """
+    stored = fetch_api(f"/insight/smart-scores?market={market}&limit=100")
+    if stored and stored.get("status") == "success" and stored.get("data"):
+        return stored["data"], {}
+
     try:
-        from logic.smart_score import scan_and_score
+        from logic.smart_score import DEFAULT_UNIVERSE, scan_smart_scores
 
-        if market == "KR":
-            tickers = [
-                "005930.KS", "000660.KS", "373220.KS", "207940.KS",
-                "005380.KS", "006400.KS", "051910.KS", "035420.KS",
-                "035720.KS", "068270.KS", "105560.KS", "055550.KS",
-                "000270.KS", "012330.KS", "066570.KS", "003670.KS",
-                "015760.KS", "009150.KS", "247540.KS", "086520.KS",
-                "003550.KS", "028260.KS", "017670.KS", "030200.KS",
-            ]
-        else:
-            tickers = [
-                "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA",
-                "JPM", "V", "WMT", "UNH", "JNJ", "HD", "PG", "MA",
-                "XOM", "CVX", "KO", "PEP", "COST", "AVGO", "LLY",
-                "AMD", "NFLX", "INTC", "BA", "CRM", "ORCL", "QCOM", "ADBE",
-            ]
-
-        return scan_and_score(tickers, market=market)
-    except Exception:
-        return []
+        results, failures = scan_smart_scores(DEFAULT_UNIVERSE[market], market=market)
+        return results, failures
+    except Exception as e:
+        return [], {"전체": str(e)[:200]}
 
 
 # ─── Custom CSS ───
@@ -1350,7 +1360,7 @@ elif page == "⚙️ 시스템":
 
     for ep, name in endpoints:
         try:
-            resp = requests.get(f"{API_BASE}{ep}", timeout=5)
+            resp = _http_session().get(f"{API_BASE}{ep}", timeout=5)
             if resp.status_code == 200:
                 st.markdown(f"✅ **{name}** (`{ep}`) — 정상")
             else:
@@ -1463,10 +1473,15 @@ elif page == "📈 종목 상세":
                 actual_ticker = search_result[0]["ticker"]
                 st.caption(f"→ {search_result[0]['name']} ({actual_ticker})")
 
-        # For KR stocks (6-digit number), add .KS suffix for yfinance
-        yf_ticker = actual_ticker
-        if actual_ticker.isdigit() and len(actual_ticker) == 6:
-            yf_ticker = f"{actual_ticker}.KS"
+        # KR 종목(6자리 코드)은 .KS 접미사 — 캐시 워머와 같은 헬퍼로 변환
+        try:
+            from services.constituents import to_yahoo_symbol
+
+            yf_ticker = to_yahoo_symbol(actual_ticker)
+        except ImportError:
+            yf_ticker = actual_ticker
+            if actual_ticker.isdigit() and len(actual_ticker) == 6:
+                yf_ticker = f"{actual_ticker}.KS"
 
         # Fetch from backend
         stock_data = None
@@ -1475,8 +1490,16 @@ elif page == "📈 종목 상세":
             if stock_data_resp and isinstance(stock_data_resp, dict):
                 stock_data = stock_data_resp.get("data", stock_data_resp)
 
-        # Fallback: direct yfinance
+        # Fallback: 로컬 히스토리 스토어 + 참조 데이터 캐시, 서비스가 없으면 yfinance 직접 조회
+        standalone = False
         if not stock_data:
+            try:
+                from services.yahoo_finance_service import YahooFinanceService
+
+                stock_data = YahooFinanceService().get_stock_detail(yf_ticker)
+            except ImportError:
+                standalone = True
+        if standalone:
             try:
                 import yfinance as yf
                 stock = yf.Ticker(yf_ticker)
@@ -1604,7 +1627,12 @@ elif page == "🎯 스마트 스코어":
     ss_market = "KR" if "한국" in ss_market_label else "US"
 
     with st.spinner("종목 스캔 중... (20~30개 종목 분석)"):
-        scored = fetch_smart_scores(market=ss_market)
+        scored, failed = fetch_smart_scores(market=ss_market)
+
+    if failed:
+        with st.expander(f"⚠️ 분석에서 제외된 종목 {len(failed)}개"):
+            for ticker, reason in failed.items():
+                st.caption(f"{ticker} — {reason}")
 
     if not scored:
         st.warning("스코어 데이터를 불러올 수 없습니다. 잠시 후 다시 시도해 주세요.")
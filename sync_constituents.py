@@ -0,0 +1,32 @@
+"""
+Refresh the index_constituents table (services/constituents.py) that backs
+the gainers/losers universe:
+
+    python sync_constituents.py             # every index (SP500, NDX)
+    python sync_constituents.py --index NDX # one index
+"""
+
+import logging
+import sys
+
+from database import init_db
+from services.constituents import INDEX_SOURCES, sync_constituents
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    indexes = list(INDEX_SOURCES)
+    if "--index" in sys.argv:
+        indexes = [sys.argv[sys.argv.index("--index") + 1].upper()]
+
+    init_db()
+    for index_name, result in sync_constituents(indexes).items():
+        if "error" in result:
+            print(f"❌ {index_name}: {result['error']}")
+        else:
+            print(f"✅ {index_name}: {result['members']} members "
+                  f"(+{result['added']} / -{result['removed']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,14 +10,15 @@ def sync_krx_stocks():
     # KRX KIND Download URL
     url = "http://kind.krx.co.kr/corpgeneral/corpList.do?method=download&searchType=13"
 
-    import requests
     from io import StringIO
 
+    from services import upstream
+
     try:
         print(f"📥 Downloading data from {url}...")
 
         # Use requests to get content and decode manually
-        response = requests.get(url)
+        response = upstream.get(url, timeout=30)
         response.raise_for_status()
 
         # Convert bytes to string using euc-kr
@@ -0,0 +1,31 @@
+"""
+Incrementally update the smart_scores table (services/smart_score_store.py).
+Only tickers whose latest bar changed since the last run are re-scored:
+
+    python update_smart_scores.py              # every market
+    python update_smart_scores.py --market KR  # one market
+"""
+
+import logging
+import sys
+
+from logic.smart_score import DEFAULT_UNIVERSE
+from services.smart_score_store import SmartScoreStore
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    markets = list(DEFAULT_UNIVERSE)
+    if "--market" in sys.argv:
+        markets = [sys.argv[sys.argv.index("--market") + 1].upper()]
+
+    store = SmartScoreStore()
+    for market in markets:
+        summary = store.update(market)
+        print(f"✅ Smart scores ({market}): {summary['scored']} scored, "
+              f"{summary['unchanged']} unchanged, "
+              f"{len(summary['failed'])} failed {summary['failed'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Standalone cache warmer — keeps market cache keys fresh ahead of user traffic.
+Run alongside the API (instead of CACHE_WARMER=true) as a separate worker:
+
+    python warm_cache.py          # loop forever
+    python warm_cache.py --once   # single pass, then exit
+"""
+
+import logging
+import sys
+
+from services.cache_warmer import CacheWarmer
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    warmer = CacheWarmer()
+
+    if "--once" in sys.argv:
+        summary = warmer.run_once()
+        print(f"✅ Warm pass ({summary['mode']}): {summary['refreshed']} refreshed, "
+              f"{len(summary['failed'])} failed {summary['failed'] or ''}")
+        return
+
+    try:
+        warmer.run_forever()
+    except KeyboardInterrupt:
+        warmer.stop()
+
+
+if __name__ == "__main__":
+    main()